@@ -0,0 +1,79 @@
+"""
+Compare the ways of getting the galaxy table out of the galaxyContent responses: unescaping the quotes
+of the whole response and stripping it (previous versions), or decoding the JSON object and taking
+its galaxy field. Reports the CPU time per system to get and parse the html, the bytes copied before
+parsing and the planet names that each way gets wrong.
+
+Usage (from the root of the repository):
+    python -m benchmarks.bench_galaxy_content [session archive] [repetitions]
+"""
+import sys
+import time
+
+from benchmarks import galaxy_pages
+from ogbot.scraping import parsing
+from ogbot.scraping.galaxy import Galaxy
+
+
+def strip_text(text):
+    """Stripping of the previous versions"""
+    return text.replace("\\n", '').strip("u' [ ]")
+
+
+def get_html_by_replacing(content):
+    """:return: tuple with the html and the bytes copied to get it"""
+    unescaped = content.replace('\\"', '"')
+    html = strip_text(unescaped)
+    return html, len(unescaped) + len(html)
+
+
+def get_html_by_decoding(content):
+    """:return: tuple with the html and the bytes copied to get it"""
+    html = Galaxy.get_galaxy_html(content)
+    # The JSON decoder builds a unicode string that is encoded again, 4 bytes per character in this build
+    return html, len(content) * (4 if sys.maxunicode > 0xffff else 2) + len(html)
+
+
+def get_planet_names(document, strip):
+    return [strip(parsing.text(planet_name)) for planet_name in
+            parsing.Selector('.//table[@id="galaxytable"]//td[@class="planetname"]')(document)]
+
+
+def measure(get_html, pages, parser, repetitions):
+    """:return: tuple with the CPU time in ms per system and the bytes copied per system"""
+    copied = 0
+    start = time.clock()
+    for _ in range(repetitions):
+        for page in pages:
+            html, page_copied = get_html(page)
+            Galaxy.parse_planets(parser.parse(html), '1', '1')
+            copied += page_copied
+    elapsed = time.clock() - start
+    systems = repetitions * len(pages)
+    return elapsed * 1000 / systems, copied / systems
+
+
+def main():
+    archive_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    pages = galaxy_pages.load_pages(archive_path, 300)
+    parser = parsing.Parser()
+    print "%d systems, %d bytes per response" % (len(pages), sum(map(len, pages)) / len(pages))
+
+    for name, get_html in [('replace', get_html_by_replacing), ('json', get_html_by_decoding)]:
+        cpu_time, copied = measure(get_html, pages, parser, repetitions)
+        print "%-8s %6.2fms CPU per system, %7d bytes copied per system" % (name, cpu_time, copied)
+
+    wrong_names = set()
+    for page in pages:
+        replaced_names = get_planet_names(parser.parse(get_html_by_replacing(page)[0]), strip_text)
+        decoded_names = get_planet_names(parser.parse(get_html_by_decoding(page)[0]), lambda text: text.strip())
+        wrong_names.update((replaced, decoded) for replaced, decoded in zip(replaced_names, decoded_names)
+                           if replaced != decoded)
+    for replaced, decoded in sorted(wrong_names):
+        print "replace reads %r as %r" % (decoded, replaced)
+
+
+if __name__ == '__main__':
+    main()
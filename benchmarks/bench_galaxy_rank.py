@@ -0,0 +1,87 @@
+"""
+Compare the rank lookup that searched the whole page for every row of the galaxy table
+with the player rank map built in a single pass. The search runs on the BeautifulSoup tree it was
+written for, the map on the lxml tree the scrapers use.
+
+Usage (from the root of the repository):
+    python -m benchmarks.bench_galaxy_rank [session archive] [repetitions]
+"""
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks import galaxy_pages
+from ogbot.scraping import parsing
+from ogbot.scraping.galaxy import Galaxy
+
+
+def get_rank_by_search(soup, player_name):
+    """Rank lookup of the previous versions, kept as the baseline"""
+    rank_nodes = soup.findAll("li", {"class": "rank"})
+
+    player_rank_node_match = [rank_node
+                              for rank_node
+                              in rank_nodes
+                              if player_name in rank_node.parent.parent.text]
+
+    if len(player_rank_node_match) == 0:
+        return 0
+    else:
+        player_rank_node = player_rank_node_match[0]
+        player_rank_string = player_rank_node.find("a").text.strip()
+        s = re.findall('^\d*', player_rank_string)
+        return int(s[0] if s[0] else "-1")
+
+
+def get_ranks_by_map(document, player_names):
+    player_ranks = Galaxy.get_player_ranks(document)
+    return [player_ranks.get(player_name, 0) for player_name in player_names]
+
+
+def get_player_names(soup):
+    player_names = []
+    for table_row in soup.find("table", {"id": "galaxytable"}).findAll("tr", {"class": "row"}):
+        player_name_heading = table_row.find('h1')
+        if "empty_filter" not in table_row.get("class") and player_name_heading is not None:
+            player_names.append(player_name_heading.find('span').text)
+    return player_names
+
+
+def main():
+    archive_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    pages = galaxy_pages.load_pages(archive_path)
+    markups = [Galaxy.get_galaxy_html(page) for page in pages]
+    soups = [BeautifulSoup(markup, "lxml") for markup in markups]
+    documents = map(parsing.Parser().parse, markups)
+    pages_player_names = [get_player_names(soup) for soup in soups]
+    rows = sum(map(len, pages_player_names))
+    print "%d pages, %d rows with a player" % (len(pages), rows)
+
+    start = time.time()
+    for _ in range(repetitions):
+        search_ranks = [[get_rank_by_search(soup, player_name) for player_name in player_names]
+                        for soup, player_names in zip(soups, pages_player_names)]
+    search_time = (time.time() - start) / repetitions
+
+    start = time.time()
+    for _ in range(repetitions):
+        map_ranks = [get_ranks_by_map(document, player_names)
+                     for document, player_names in zip(documents, pages_player_names)]
+    map_time = (time.time() - start) / repetitions
+
+    mismatches = sum(search_rank != map_rank
+                     for search_page, map_page in zip(search_ranks, map_ranks)
+                     for search_rank, map_rank in zip(search_page, map_page))
+
+    print "%-8s %8.2fms per page" % ('search', search_time * 1000 / len(pages))
+    print "%-8s %8.2fms per page" % ('map', map_time * 1000 / len(pages))
+    print "speedup  %8.1fx" % (search_time / map_time)
+    print "%d of %d ranks differ, the search matches players whose name contains another name" % (mismatches, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Compare the parser backends on galaxyContent pages: the time to build the tree of each page and
+to read its planets, with and without the inactive planets filter.
+
+Usage (from the root of the repository):
+    python -m benchmarks.bench_parser [session archive] [repetitions]
+"""
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks import galaxy_pages
+from ogbot.scraping import parsing, scraper
+from ogbot.scraping.galaxy import Galaxy, PlanetFilter
+
+
+def measure(function, items, repetitions):
+    start = time.time()
+    for _ in range(repetitions):
+        for item in items:
+            function(item)
+    return (time.time() - start) * 1000 / repetitions / len(items)
+
+
+def main():
+    archive_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    markups = [Galaxy.get_galaxy_html(page) for page in galaxy_pages.load_pages(archive_path)]
+    inactive_filter = PlanetFilter([scraper.PlayerState.Inactive], 1, 1000)
+    print "%d pages" % len(markups)
+
+    print "%-32s %8.2fms per page" % ('BeautifulSoup(lxml) tree',
+                                      measure(lambda markup: BeautifulSoup(markup, "lxml"), markups, repetitions))
+    for backend in sorted(parsing.BACKENDS):
+        parser = parsing.Parser(backend)
+        documents = map(parser.parse, markups)
+        print "%-32s %8.2fms per page" % ('%s tree' % backend, measure(parser.parse, markups, repetitions))
+        print "%-32s %8.2fms per page" % ('%s planets' % backend, measure(
+            lambda document: Galaxy.parse_planets(document, '1', '1'), documents, repetitions))
+        print "%-32s %8.2fms per page" % ('%s inactive planets' % backend, measure(
+            lambda document: Galaxy.parse_planets(document, '1', '1', inactive_filter), documents, repetitions))
+
+
+if __name__ == '__main__':
+    main()
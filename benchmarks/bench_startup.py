@@ -0,0 +1,108 @@
+"""
+Compare the startup of a check_hostile_activity run, up to its first request, when every bot of the
+core package is built at start, as OgameBot did before the bots were built on first use, with the
+startup that only builds the movement bot. The browser and the config are stubs and the planets are
+given, so no request is sent. The stubs are made before the timer starts, with the scraper modules
+both startups import. Every sample runs in a fresh interpreter, so nothing is cached.
+
+Usage (from the root of the repository):
+    python -m benchmarks.bench_startup [samples]
+"""
+import os
+import subprocess
+import sys
+
+OGBOT_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ogbot')
+
+# Browser, config and planets of the session. The messages flag is read from the example user.cfg
+# the way Config reads it, the lazy startup sends a message through it
+STUBS = """
+import ConfigParser
+
+from scraping.scraper import Planet
+
+example_config = ConfigParser.ConfigParser()
+example_config.read('../user-example.cfg')
+
+
+class StubBrowser(object):
+    addheaders = []
+
+
+class StubConfig(object):
+    universe = '1'
+    country = 'en'
+    default_origin_planet_name = None
+    planet_name = None
+    excluded_planets = []
+    enable_twilio_messaging = example_config.getboolean('Twilio', 'EnableTwilioMessaging')
+    parser_backend = 'lxml'
+    http_transport = 'mechanize'
+    http_pool_size = 4
+    page_cache_ttl = {}
+    game_clock_ttl = 3600
+    retry_attempts = 5
+    retry_base_delay = 1.0
+    retry_max_delay = 60.0
+    circuit_breaker_threshold = 5
+    circuit_breaker_cooldown = 60.0
+    request_rates = {'total': (2.0, 5)}
+    engine_workers = 2
+    universe_map_path = ':memory:'
+    universe_map_staleness = 24
+    galaxy_refresh_budget = 50
+
+
+browser = StubBrowser()
+config = StubConfig()
+planets = [Planet('Homeworld', '/game/index.php?cp=1', '1:100:4')]
+"""
+
+# Python code of each startup, it runs after the stubs and prints the seconds it took
+STARTUPS = [
+    # The bots of every mode with their scraper clients, sms imported twilio at start when it is installed
+    ('eager', """
+from core import *
+try:
+    import twilio.rest
+except ImportError:
+    pass
+
+for bot_class in [attacker.AttackerBot, defender.DefenderBot, spy.SpyBot, expeditionary.ExpeditionaryBot,
+                  logger.LoggerBot, transporter.TransporterBot, builder.BuilderBot, messages.MessagesBot,
+                  researcher.ResearcherBot, movement.MovementBot]:
+    bot_class(browser, config, planets)
+"""),
+    ('lazy', """
+import bot
+
+ogame_bot = bot.OgameBot(browser, config)
+ogame_bot._planets = planets
+ogame_bot.movement_bot.sms_sender.send_sms('benchmark')
+"""),
+]
+
+TIMED_CODE = """
+import time
+%s
+start = time.time()
+%s
+print time.time() - start
+"""
+
+
+def measure(code):
+    output = subprocess.check_output([sys.executable, '-c', TIMED_CODE % (STUBS, code)], cwd=OGBOT_DIRECTORY)
+    return float(output.split()[-1])
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print "Median startup time of %d fresh interpreters" % samples
+    for name, code in STARTUPS:
+        times = sorted(measure(code) for _ in range(samples))
+        print "%-6s %7.1fms" % (name, times[len(times) // 2] * 1000)
+
+
+if __name__ == '__main__':
+    main()
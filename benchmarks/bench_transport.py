@@ -0,0 +1,93 @@
+"""
+Compare the mechanize transport with the pooled keep-alive transport against a local stand-in
+for the game server, that serves a galaxyContent sized ajax payload and supports gzip.
+
+Usage (from the root of the repository):
+    python -m benchmarks.bench_transport [requests]
+"""
+import BaseHTTPServer
+import SocketServer
+import cookielib
+import gzip
+import sys
+import threading
+import time
+from StringIO import StringIO
+
+from ogbot.scraping import authentication, transport
+
+PAYLOAD = '{"galaxy":"%s"}' % ('<tr class=\\"row\\"><td class=\\"planetname\\">Planet</td></tr>' * 400)
+
+
+class StandInServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    connections = 0
+    bytes_sent = 0
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Buffer the response so it is sent in a single write, as a real server would
+    wbufsize = -1
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = PAYLOAD
+        encoding = None
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            buf = StringIO()
+            with gzip.GzipFile(fileobj=buf, mode='wb') as gzip_file:
+                gzip_file.write(body)
+            body = buf.getvalue()
+            encoding = 'gzip'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def run(name, open_url, server, url, requests):
+    server.connections = 0
+    server.bytes_sent = 0
+    start = time.time()
+    for _ in range(requests):
+        open_url(url).read()
+    elapsed = time.time() - start
+    print "%-10s %6.3fs  %4d connections  %9d bytes on the wire" % (name, elapsed, server.connections,
+                                                                     server.bytes_sent)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    server = StandInServer(('127.0.0.1', 0), StandInHandler)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    url = 'http://127.0.0.1:%d/game/index.php?page=galaxyContent&ajax=1' % server.server_address[1]
+
+    print "%d requests of a %d bytes payload" % (requests, len(PAYLOAD))
+    browser = authentication.create_browser(cookielib.LWPCookieJar())
+    mechanize_transport = transport.MechanizeTransport(browser)
+    run('mechanize', lambda u: mechanize_transport.open(u, timeout=30.0), server, url, requests)
+
+    pooled_transport = transport.PooledTransport(cookielib.LWPCookieJar(), authentication.HEADERS)
+    run('pooled', lambda u: pooled_transport.open(u, timeout=30.0), server, url, requests)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
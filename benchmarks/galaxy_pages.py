@@ -0,0 +1,98 @@
+"""
+galaxyContent responses for the benchmarks, either captured ones read from a session archive
+recorded with --record, or generated ones that follow the markup of the game
+"""
+import gzip
+import json
+import random
+
+PLAYER_NAMES = ['Ann', 'Anna', 'Annabel', 'Bob', 'Bobby', 'Commander', 'Commander Vega', 'Dax', 'Vega', 'Zed']
+PLAYER_STATES = ['', 'inactive', 'longinactive', 'vacation']
+PLANET_NAMES = ['Colony', 'Homeworld', 'Timbuktu', 'Base "Alpha"', "Miner's Rest", u'K\xf6nigsberg']
+
+ROW = '''<tr class="row">
+    <td class="position js_no_action">%(position)d</td>
+    <td class="microplanet colonized js_planet%(position)d" data-planet-id="%(planet_id)d">
+        <div class="ListImage"><a class="tooltipRel" href="javascript:void(0);" rel="planet%(position)d">
+        <img src="/cdn/img/planets/planet_%(image)d.gif" height="30" width="30" alt=""/></a></div>
+        <div id="planet%(position)d" style="display: none;" class="htmlTooltip galaxyTooltip">
+            <ul class="ListLinks">
+                <li><a href="javascript:void(0);" class="espionage" onclick="sendShipsWithPopup(6,%(galaxy)d,%(system)d,%(position)d,1,1); return false;">Espionage</a></li>
+                <li><a href="index.php?page=fleet1&amp;galaxy=%(galaxy)d&amp;system=%(system)d&amp;position=%(position)d&amp;type=1&amp;mission=1">Attack</a></li>
+                <li><a href="index.php?page=fleet1&amp;galaxy=%(galaxy)d&amp;system=%(system)d&amp;position=%(position)d&amp;type=1&amp;mission=3">Transport</a></li>
+            </ul>
+        </div>
+    </td>
+    <td class="moon js_no_action"></td>
+    <td class="debris js_no_action"></td>
+    <td class="planetname">%(planet_name)s</td>
+    <td class="playername %(state)s js_no_action tooltipRel tooltipClose">
+        <a href="javascript:void(0);" class="tooltipRel tooltipClose tooltipRight js_hideTipOnMobile" rel="player%(player_id)d">
+            <span class="status_abbr_%(state)s">%(player_name)s</span>
+        </a>
+        <span class="status">(<span class="status_abbr_%(state)s">i</span>)</span>
+        <div id="player%(player_id)d" style="display: none;" class="htmlTooltip">
+            <h1>Player: <span>%(player_name)s</span></h1>
+            <div class="splitLine"></div>
+            <ul class="ListLinks">
+                <li class="rank">Ranking: <a href="index.php?page=highscore&amp;searchRelId=%(player_id)d&amp;category=1&amp;type=0">%(rank)d</a></li>
+                <li><a href="javascript:void(0);" class="sendMail js_openChat" data-playerid="%(player_id)d">Write message</a></li>
+                <li><a href="index.php?page=buddies&amp;action=7&amp;id=%(player_id)d" class="overlay">Buddy request</a></li>
+            </ul>
+        </div>
+    </td>
+    <td class="allytag js_no_action"></td>
+    <td class="action">
+        <a href="javascript:void(0);" class="tooltip js_hideTipOnMobile espionage" title="Espionage"
+           onclick="sendShipsWithPopup(6,%(galaxy)d,%(system)d,%(position)d,1,1); return false;"><span class="icon icon_eye"></span></a>
+        <a href="javascript:void(0);" class="sendMail js_openChat tooltip" data-playerid="%(player_id)d" title="Write message">
+           <span class="icon icon_chat"></span></a>
+    </td>
+</tr>
+'''
+
+EMPTY_ROW = '''<tr class="row empty_filter">
+    <td class="position js_no_action">%(position)d</td>
+    <td class="microplanet"></td><td class="moon"></td><td class="debris"></td><td class="planetname"></td>
+    <td class="playername"></td><td class="allytag"></td><td class="action"></td>
+</tr>
+'''
+
+
+def generate_page(galaxy, system, random_generator):
+    """:return: galaxyContent response of a system with planets in most of the positions"""
+    rows = []
+    for position in range(1, 16):
+        if random_generator.random() < 0.2:
+            rows.append(EMPTY_ROW % {'position': position})
+            continue
+        player_index = random_generator.randrange(len(PLAYER_NAMES))
+        rows.append(ROW % {'position': position, 'galaxy': galaxy, 'system': system,
+                           'planet_id': random_generator.randrange(10 ** 8), 'image': random_generator.randrange(10),
+                           'planet_name': random_generator.choice(PLANET_NAMES), 'player_id': 100000 + player_index,
+                           'player_name': PLAYER_NAMES[player_index],
+                           'state': random_generator.choice(PLAYER_STATES), 'rank': 100 + player_index * 37})
+
+    html = '<table id="galaxytable" class="galaxyTable" data-galaxy="%d" data-system="%d"><tbody>\n%s</tbody></table>' \
+           % (galaxy, system, ''.join(rows))
+    return json.dumps({'galaxy': html, 'success': True, 'newToken': '0' * 32}, separators=(',', ':'))
+
+
+def load_pages(archive_path=None, count=100):
+    """
+    :param archive_path: Session archive to read the captured galaxyContent responses from,
+    pages are generated if None
+    :param count: Number of pages to generate
+    :return: list of galaxyContent responses
+    """
+    if archive_path is None:
+        random_generator = random.Random(42)
+        return [generate_page(1, system, random_generator) for system in range(1, count + 1)]
+
+    pages = []
+    with gzip.open(archive_path, 'rb') as archive_file:
+        for line in archive_file:
+            record = json.loads(line)
+            if 'page=galaxyContent' in record['url']:
+                pages.append(record['body'].encode('latin-1'))
+    return pages
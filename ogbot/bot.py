@@ -1,33 +1,54 @@
-import time
 import logging
 
-from scraping import general
-from core import *
+from scraping import general, metrics, scraper
 import sms
 
 
+def bot_property(module_name, class_name):
+    """
+    Bot of the core package built on first use, a run only builds the bots of its modes and
+    only imports their modules
+    """
+    def get_bot(self):
+        bot = self.bots.get(class_name)
+        if bot is None:
+            # Same as 'from core.<module_name> import <class_name>'
+            bot_class = getattr(__import__('core.' + module_name, globals(), fromlist=[class_name]), class_name)
+            bot = self.bots[class_name] = bot_class(self.browser, self.config, self.planets)
+        return bot
+
+    return property(get_bot)
+
+
 class OgameBot(object):
+    attacker_bot = bot_property('attacker', 'AttackerBot')
+    defender_bot = bot_property('defender', 'DefenderBot')
+    spy_bot = bot_property('spy', 'SpyBot')
+    expeditionary_bot = bot_property('expeditionary', 'ExpeditionaryBot')
+    logger_bot = bot_property('logger', 'LoggerBot')
+    transporter_bot = bot_property('transporter', 'TransporterBot')
+    builder_bot = bot_property('builder', 'BuilderBot')
+    messages_bot = bot_property('messages', 'MessagesBot')
+    researcher_bot = bot_property('researcher', 'ResearcherBot')
+    movement_bot = bot_property('movement', 'MovementBot')
+
     def __init__(self, browser, config):
         # Authenticate and get browser instance
+        self.browser = browser
         self.config = config
         self.logger = logging.getLogger('OGBot')
-
-        # Get planets and remove excluded planets in the config file
-        planets = general.General(browser, config).get_planets()
-        planets = filter(lambda x: x.name.lower() not in config.excluded_planets, planets)
-
-        self.attacker_bot = attacker.AttackerBot(browser, config, planets)
-        self.defender_bot = defender.DefenderBot(browser, config, planets)
-        self.spy_bot = spy.SpyBot(browser, config, planets)
-        self.expeditionary_bot = expeditionary.ExpeditionaryBot(browser, config, planets)
-        self.logger_bot = logger.LoggerBot(browser, config, planets)
-        self.transporter_bot = transporter.TransporterBot(browser, config, planets)
-        self.builder_bot = builder.BuilderBot(browser, config, planets)
-        self.messages_bot = messages.MessagesBot(browser, config, planets)
-        self.researcher_bot = researcher.ResearcherBot(browser, config, planets)
-        self.movement_bot = movement.MovementBot(browser, config, planets)
+        self.bots = {}
+        self._planets = None
         self.sms_sender = sms.SMSSender(config)
 
+    @property
+    def planets(self):
+        """Planets of the player without the excluded ones in the config file, read on first use"""
+        if self._planets is None:
+            planets = scraper.get_client(general.General, self.browser, self.config).get_planets()
+            self._planets = filter(lambda x: x.name.lower() not in self.config.excluded_planets, planets)
+        return self._planets
+
     def explore(self):
         self.expeditionary_bot.auto_send_expeditions()
         self.attack_inactive_planets()
@@ -40,7 +61,7 @@ class OgameBot(object):
             self.logger.info("Scanning for new targets")
             self.spy_bot.auto_spy_inactive_planets(self.config.attack_range)
             self.logger.info("Waiting %f seconds for probes to return" % self.config.time_to_wait_for_probes)
-            time.sleep(self.config.time_to_wait_for_probes)
+            metrics.sleep(self.config.time_to_wait_for_probes, 'spy_probes')
             reports = self.messages_bot.get_valid_spy_reports_from_inactive_targets()
             self.attacker_bot.attack_inactive_planets_from_spy_reports(reports)
         else:
@@ -88,4 +109,7 @@ class OgameBot(object):
     def check_hostile_activity(self):
         self.movement_bot.check_hostile_activity()
 
+    def watch_hostile_activity(self):
+        self.movement_bot.watch_hostile_activity()
+
 
@@ -1,8 +1,11 @@
 import ConfigParser
 import logging
+import math
 import os
 import re
 
+PROFILE_SECTION_PREFIX = 'Profile '
+
 
 class Config(object):
     def __init__(self, args):
@@ -41,17 +44,38 @@ class Config(object):
 
             self.logger.info('Getting user info from config file')
 
+            # Profiles, the accounts run by the supervisor. Each one is a [Profile <name>] section with the
+            # UserInfo options of the account, the ones that are missing are taken from [UserInfo]
+            self.profiles = [section[len(PROFILE_SECTION_PREFIX):].strip() for section in config.sections()
+                             if section.startswith(PROFILE_SECTION_PREFIX)]
+            self.profile = parameters.get('profile')
+            profile_section = PROFILE_SECTION_PREFIX + self.profile if self.profile is not None else 'UserInfo'
+            if not config.has_section(profile_section):
+                self.logger.error("There is no section [%s] in user.cfg" % profile_section)
+                exit()
+
             # User config options
-            self.username = config.get('UserInfo', 'Username')
-            self.password = config.get('UserInfo', 'Password')
-            self.universe = config.get('UserInfo', 'Universe')
-            self.country = config.get('UserInfo', 'Country')
+            self.username = self.get_profile_config(config, profile_section, 'Username')
+            self.password = self.get_profile_config(config, profile_section, 'Password')
+            self.universe = self.get_profile_config(config, profile_section, 'Universe')
+            self.country = self.get_profile_config(config, profile_section, 'Country')
+
+            # Directory of the files of the account: cookies and databases
+            self.state_directory = self.get_optional_config(
+                config.get, profile_section, 'StateDirectory',
+                os.path.join('profiles', self.profile) if self.profile is not None else '.')
+            if not os.path.isdir(self.state_directory):
+                os.makedirs(self.state_directory)
+            self.cookies_path = os.path.join(self.state_directory, 'cookies.tmp')
 
             # General config options
-            self.mode = self.parse_multiple_value_config(config.get('General', 'DefaultMode'))
-            self.default_origin_planet_name = config.get('General', 'DefaultOriginPlanet')
+            self.mode = self.parse_multiple_value_config(
+                self.get_profile_config(config, profile_section, 'DefaultMode', 'General'))
+            self.default_origin_planet_name = self.get_profile_config(config, profile_section,
+                                                                      'DefaultOriginPlanet', 'General')
             self.excluded_planets = map(lambda x: x.strip().lower(),
-                                        config.get('General', 'ExcludedPlanets').split(','))
+                                        self.get_profile_config(config, profile_section,
+                                                                'ExcludedPlanets', 'General').split(','))
             self.log_level = config.get('General', 'LogLevel')  # Get loglevel
 
             # Development config options
@@ -87,17 +111,89 @@ class Config(object):
             self.spy_probes_count = config.getint('Exploration', 'SpyProbesCount')  # Amount of spy probes to send
             self.min_res_to_attack = config.getint('Exploration', 'MinResToSendAttack')  # Min resources to send attack
             self.expedition_range = config.getint('Exploration', 'ExpeditionRange')  # range to send expeditions
+            # Amount of systems to fetch at the same time when scanning the galaxy
+            self.galaxy_scan_concurrency = self.get_optional_config(config.getint, 'Exploration',
+                                                                    'GalaxyScanConcurrency', 4)
+            # Amount of spy report pages to fetch at the same time
+            self.spy_report_fetch_concurrency = self.get_optional_config(config.getint, 'Exploration',
+                                                                         'SpyReportFetchConcurrency', 4)
+            # Database that keeps the spy reports seen before, so only the new messages are downloaded
+            self.spy_report_database_path = os.path.join(self.state_directory, self.get_optional_config(
+                config.get, 'Exploration', 'SpyReportDatabase', 'spy_reports.db'))
+            # Database of the universe map, the planets of the systems scanned before
+            self.universe_map_path = os.path.join(self.state_directory, self.get_optional_config(
+                config.get, 'Exploration', 'UniverseMapDatabase', 'universe.db'))
+            # Hours after which a system of the universe map is scanned again
+            self.universe_map_staleness = self.get_optional_config(config.getint, 'Exploration',
+                                                                   'UniverseMapStaleness', 24)
+            # Maximum number of systems scanned on each run, 0 for no limit
+            self.galaxy_refresh_budget = self.get_optional_config(config.getint, 'Exploration',
+                                                                  'GalaxyRefreshBudget', 50)
 
-            self.enable_twilio_messaging = config.get('Twilio', 'EnableTwilioMessaging')
+            self.enable_twilio_messaging = config.getboolean('Twilio', 'EnableTwilioMessaging')
             self.twilio_account_sid = config.get('Twilio', 'AccountSid')
             self.twilio_account_token = config.get('Twilio', 'AccountToken')
             self.twilio_from_number = config.get('Twilio', 'FromNumber')
             self.twilio_to_number = config.get('Twilio', 'ToNumber')
 
+            # Backend used to parse the pages, 'lxml' or 'soup' (BeautifulSoup)
+            self.parser_backend = self.get_optional_config(config.get, 'General', 'ParserBackend', 'lxml')
+            # Threads that run the independent work of the modes, like scanning the galaxy while spying
+            self.engine_workers = self.get_optional_config(config.getint, 'General', 'EngineWorkers', 2)
+            # Seconds after which the offset between the game clock and the local clock is measured again
+            self.game_clock_ttl = self.get_optional_config(config.getint, 'General', 'GameClockTTL', 3600)
+
+            # Hostile activity watch config options, the section is optional
+            self.watch_min_interval = self.get_optional_config(config.getint, 'Watch', 'MinInterval', 15)
+            self.watch_max_interval = self.get_optional_config(config.getint, 'Watch', 'MaxInterval', 600)
+            # Hostile fleets that arrive in less than these seconds are checked on every minimum interval
+            self.watch_imminent_time = self.get_optional_config(config.getint, 'Watch', 'ImminentTime', 900)
+
+            # Daemon config options, the schedule of each mode, the section is optional
+            self.daemon_schedules = dict(config.items('Daemon')) if config.has_section('Daemon') else {}
+            self.daemon_default_schedule = self.daemon_schedules.pop('defaultschedule', '10m')
+
+            # Network config options, the section is optional
+            self.page_cache_ttl = self.parse_page_ttl_config(
+                self.get_optional_config(config.get, 'Network', 'PageCacheTTL', ''))
+            self.http_transport = self.get_optional_config(config.get, 'Network', 'HttpTransport', 'pooled')
+            self.http_pool_size = self.get_optional_config(config.getint, 'Network', 'HttpPoolSize', 4)
+            self.retry_attempts = self.get_optional_config(config.getint, 'Network', 'RetryAttempts', 5)
+            self.retry_base_delay = self.get_optional_config(config.getfloat, 'Network', 'RetryBaseDelay', 1.0)
+            self.retry_max_delay = self.get_optional_config(config.getfloat, 'Network', 'RetryMaxDelay', 60.0)
+            self.circuit_breaker_threshold = self.get_optional_config(config.getint, 'Network',
+                                                                      'CircuitBreakerThreshold', 5)
+            self.circuit_breaker_cooldown = self.get_optional_config(config.getfloat, 'Network',
+                                                                     'CircuitBreakerCooldown', 60.0)
+            self.request_rates = {
+                'total': self.parse_rate_config(
+                    self.get_optional_config(config.get, 'Network', 'TotalRequestRate', '4 8')),
+                'galaxy': self.parse_rate_config(
+                    self.get_optional_config(config.get, 'Network', 'GalaxyRequestRate', '3 6')),
+                'messages': self.parse_rate_config(
+                    self.get_optional_config(config.get, 'Network', 'MessagesRequestRate', '2 4')),
+                'fleet': self.parse_rate_config(
+                    self.get_optional_config(config.get, 'Network', 'FleetRequestRate', '1 3')),
+                'other': self.parse_rate_config(
+                    self.get_optional_config(config.get, 'Network', 'OtherRequestRate', '2 4'))
+            }
+
+            # Share of the request rates of this process, the supervisor splits them between its workers
+            rate_share = parameters.get('rate_share')
+            if rate_share is not None:
+                self.request_rates = dict((name, (rate * rate_share, max(int(round(burst * rate_share)), 1)))
+                                          for name, (rate, burst) in self.request_rates.items())
+
             # read values from parameters
             mode = parameters.get('m')
             attack_range = parameters.get('r')
             planet_name = parameters.get('p')
+            self.record_path = parameters.get('record')
+            self.replay_path = parameters.get('replay')
+            self.daemon = parameters.get('daemon', False)
+            self.supervise = parameters.get('supervise', False)
+            # File where the worker of a profile adds its metrics for the supervisor
+            self.metrics_path = parameters.get('metrics')
 
             # Override default mode if the user has specified a mode by parameters
             if mode is not None:
@@ -108,6 +204,52 @@ class Config(object):
 
             self.planet_name = planet_name
 
+    @staticmethod
+    def get_profile_config(config, profile_section, option, default_section='UserInfo'):
+        """Read an option of the profile, taking it from the default section if the profile doesn't have it"""
+        if config.has_option(profile_section, option):
+            return config.get(profile_section, option)
+        return config.get(default_section, option)
+
+    @staticmethod
+    def get_optional_config(getter, section, option, default):
+        """
+        Read an option that may be missing from older config files
+        :param getter: ConfigParser getter to use (i.e.: config.getint)
+        :param section: section of the option
+        :param option: name of the option
+        :param default: value returned if the option is missing
+        """
+        try:
+            return getter(section, option)
+        except (ConfigParser.NoSectionError, ConfigParser.NoOptionError):
+            return default
+
+    @classmethod
+    def parse_page_ttl_config(cls, str):
+        """
+        :param str: string to parse, i.e.: 'overview:30 resources:60'
+        :return: dict with the time in seconds for each page
+        """
+        page_ttl = {}
+        for value in cls.parse_multiple_value_config(str):
+            page, ttl = value.split(':')
+            page_ttl[page] = int(ttl)
+
+        return page_ttl
+
+    @classmethod
+    def parse_rate_config(cls, str):
+        """
+        :param str: string to parse, i.e.: '2 5' (2 requests per second with bursts of 5). The burst can be
+        left out, then it is the requests of one second. A rate of 0 disables the limit
+        :return: tuple with the rate and the burst
+        """
+        values = cls.parse_multiple_value_config(str)
+        rate = float(values[0])
+        burst = int(values[1]) if len(values) > 1 else max(int(math.ceil(rate)), 1)
+        return rate, burst
+
     @staticmethod
     def parse_multiple_value_config(str):
         """
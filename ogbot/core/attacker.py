@@ -1,16 +1,18 @@
 from base import *
-from scraping import fleet, movement, general, scraper, hangar
+from scraping import fleet, movement, general, scraper, hangar, retry, metrics, engine, slots
 import random
-import time
 
 class AttackerBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.fleet_client = fleet.Fleet(browser, config)
-        self.general_client = general.General(browser, config)
-        self.movement_client = movement.Movement(browser, config)
-        self.hangar_client = hangar.Hangar(browser, config)
+        self.fleet_client = scraper.get_client(fleet.Fleet, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
+        self.movement_client = scraper.get_client(movement.Movement, browser, config)
+        self.hangar_client = scraper.get_client(hangar.Hangar, browser, config)
+        self.slot_allocator = slots.get_slot_allocator(browser)
+        self.engine = engine.get_engine(browser, config)
+        self.prefetcher = engine.Prefetcher(self.engine)
 
         super(AttackerBot, self).__init__(browser, config, planets)
 
@@ -19,6 +21,17 @@ class AttackerBot(BaseBot):
 
         return self.get_nearest_planet_to_coordinates(target_planet.coordinates, self.planets)
 
+    def get_origin_planet(self, target_planet):
+        """Get the planet the attack to the target is sent from"""
+        if self.planet is None:
+            return self.get_nearest_planet_to_target(target_planet)
+        return self.planet
+
+    def prefetch_origin_ships(self, target_planet):
+        """Load the shipyard of the origin of the target in the page cache, attack_inactive_planet reads it"""
+        origin_planet = self.get_origin_planet(target_planet)
+        self.prefetcher.add(hangar.Hangar, lambda hangar_client: hangar_client.get_ships(origin_planet))
+
     def attack_inactive_planet(self, origin_planet, target_planet):
         ships = self.hangar_client.get_ships(origin_planet)
         origin_planet.ships = ships
@@ -27,62 +40,74 @@ class AttackerBot(BaseBot):
 
     def attack_inactive_planets_from_spy_reports(self, reports):
 
-        # Stop if there is no fleet slot available
-        slot_usage = self.fleet_client.get_fleet_slots_usage()
-
-        used_slots = slot_usage[0]
-        available_slots = slot_usage[1]
+        # Stop if there is no fleet slot available, the slot allocator keeps the count from here
+        self.fleet_client.get_fleet_slots_usage()
 
-        if used_slots >= available_slots:
+        if not self.slot_allocator.has_free_slot():
             self.logger.warning("There is no fleet slot available")
             return True
 
-        movements = [fleet_movement.destination_coords for fleet_movement
-                     in self.movement_client.get_fleet_movement()]
+        # The event list is read in the background while the shipyard of the first target is read
+        fleet_movement_task = self.engine.submit_scraper(movement.Movement,
+                                                         lambda movement_client: movement_client.get_fleet_movement())
 
         self.logger.info("Got %d reports" % len(reports))
 
+        # There is a single report per planet, the newest one
         inactive_planets = [report for report
-                            in set(reports)
+                            in reports
                             # Get reports from inactive players only
                             if report.player_state == scraper.PlayerState.Inactive
-                            # Don't attack planets that are already being attacked
-                            and report.coordinates not in movements
                             # Don't attack defended planets
                             # and report.defenses == 0
                             and report.fleet == 0]
 
-        self.logger.info("Found %d recent spy reports of inactive players" % len(inactive_planets))
-
-        distinct_inactive_planets = get_distinct_targets(inactive_planets)
-
         # Attack high value targets first
-        targets = sorted(distinct_inactive_planets, key=get_target_value, reverse=True)
+        targets = sorted(inactive_planets, key=get_target_value, reverse=True)
+
+        # The ships of the origin of the first target are read meanwhile, attack_inactive_planet finds them in the
+        # page cache
+        first_target = next((target for target in targets if target.defenses == 0), None)
+        if first_target is not None:
+            try:
+                self.hangar_client.get_ships(self.get_origin_planet(first_target))
+            except retry.RequestError as e:
+                self.logger.warning("Unable to read the ships of the origin of %s: %s" % (first_target.planet_name, e))
+
+        # Don't attack planets that are already being attacked
+        movements = [fleet_movement.destination_coords for fleet_movement
+                     in fleet_movement_task.result()]
+        targets = [target for target in targets if target.coordinates not in movements]
+
+        self.logger.info("Found %d recent spy reports of inactive players" % len(targets))
 
         predicted_loot = 0
         assault_fleets_count = 0
 
-        for target in targets:
+        for index, target in enumerate(targets):
             if target.defenses != 0:
                 self.logger.warning("Found a inactive defended planet %s(%s) with %s" % (target.planet_name, target.coordinates, target.resources))
                 continue
-            if used_slots < available_slots:
-                self.logger.info("Slot usage: %d/%d" % (used_slots, slot_usage[1]))
+            if self.slot_allocator.has_free_slot():
+                self.logger.info("Free fleet slots: %s" % self.slot_allocator.get_free_slots())
                 # Get the nearest planet from target
-                if self.planet is None:
-                    origin_planet = self.get_nearest_planet_to_target(target)
-                else:
-                    origin_planet = self.planet
+                origin_planet = self.get_origin_planet(target)
 
-                result = self.attack_inactive_planet(origin_planet, target)
+                try:
+                    result = self.attack_inactive_planet(origin_planet, target)
+                except retry.RequestError as e:
+                    self.logger.error("Unable to attack planet %s: %s" % (target.planet_name, e))
+                    continue
                 if result == fleet.FleetResult.Success:
                     predicted_loot += target.get_loot()
-                    used_slots += 1
                     assault_fleets_count += 1
+                    # The ships of the origin of the next target are read during the delay
+                    if index + 1 < len(targets):
+                        self.prefetch_origin_ships(targets[index + 1])
                     # Delay - wait a random time before sending fleet, this makes the bot less detectable
                     delay = random.randint(self.config.attack_fleet_min_delay, self.config.attack_fleet_max_delay)
                     self.logger.info("Waiting for %s seconds" % delay)
-                    time.sleep(delay)
+                    self.prefetcher.sleep(delay, 'attack_delay')
                 if result == fleet.FleetResult.NoAvailableSlots:
                     self.logger.warning("There is no fleet slot available")
                     self.logger.info("Predicted loot is %s" % predicted_loot)
@@ -101,19 +126,10 @@ class AttackerBot(BaseBot):
         if not result:
             self.auto_spy_inactive_planets(self.config.attack_range)
             self.logger.info("Waiting %f seconds for probes to return" % self.config.time_to_wait_for_probes)
-            time.sleep(self.config.time_to_wait_for_probes)
+            metrics.sleep(self.config.time_to_wait_for_probes, 'spy_probes')
             self.attack_inactive_planets_from_spy_reports()
 
 
-def get_distinct_targets(targets):
-    """Given an list that possibly contains repeated targets, returns a list of distinct targets"""
-    dict_targets = {}
-    for obj in targets:
-        dict_targets[obj.coordinates] = obj
-    distinct_targets = dict_targets.values()
-    return distinct_targets
-
-
 def get_target_value(target):
     """Get the value of a target by its resources"""
     return target.resources.total() * target.loot
@@ -1,14 +1,14 @@
 from base import BaseBot
-from scraping import buildings, defense, general
+from scraping import buildings, defense, general, catalog, scraper
 
 
 class BuilderBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.defense_client = defense.Defense(browser, config)
-        self.buildings_client = buildings.Buildings(browser, config)
-        self.general_client = general.General(browser, config)
+        self.defense_client = scraper.get_client(defense.Defense, browser, config)
+        self.buildings_client = scraper.get_client(buildings.Buildings, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
         self.planets = planets
         super(BuilderBot, self).__init__(browser, config, planets)
 
@@ -65,8 +65,8 @@ class BuilderBot(BaseBot):
             if resources.energy < 0:
                 self.logger.info("Planet has not enough energy, building solar plant or fusion reactor")
 
-                id_energy_buildings = [buildings.BUILDINGS_DATA.get("sp").id,
-                                       buildings.BUILDINGS_DATA.get("fr").id]
+                id_energy_buildings = [catalog.BUILDINGS.get("sp").id,
+                                       catalog.BUILDINGS.get("fr").id]
 
                 energy_buildings = filter(lambda value: value.id in id_energy_buildings, available_buildings)
 
@@ -95,17 +95,17 @@ class BuilderBot(BaseBot):
 
         if not config.build_solar_plant:
             self.logger.info("Ignoring solar plant")
-            excluded_buildings.append(buildings.BUILDINGS_DATA.get("sp").id)
+            excluded_buildings.append(catalog.BUILDINGS.get("sp").id)
 
         if not config.build_fusion_reactor:
             self.logger.info("Ignoring fusion reactor")
-            excluded_buildings.append(buildings.BUILDINGS_DATA.get("fr").id)
+            excluded_buildings.append(catalog.BUILDINGS.get("fr").id)
 
         if not config.build_storage:
             self.logger.info("Ignoring storage buildings")
-            excluded_buildings.append(buildings.BUILDINGS_DATA.get("ms").id)
-            excluded_buildings.append(buildings.BUILDINGS_DATA.get("cs").id)
-            excluded_buildings.append(buildings.BUILDINGS_DATA.get("dt").id)
+            excluded_buildings.append(catalog.BUILDINGS.get("ms").id)
+            excluded_buildings.append(catalog.BUILDINGS.get("cs").id)
+            excluded_buildings.append(catalog.BUILDINGS.get("dt").id)
 
         return excluded_buildings
 
@@ -1,13 +1,13 @@
 from base import BaseBot
-from scraping import general, defense, scraper
+from scraping import general, defense, catalog, scraper
 
 import sys
 
 
 class DefenderBot(BaseBot):
     def __init__(self, browser, config, planets):
-        self.defense_client = defense.Defense(browser, config)
-        self.general_client = general.General(browser, config)
+        self.defense_client = scraper.get_client(defense.Defense, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
         self.planets = planets
         super(DefenderBot, self).__init__(browser, config, planets)
 
@@ -83,7 +83,7 @@ class DefenderBot(BaseBot):
                                                       available_defenses_proportion_list,
                                                       planet_resources):
         if len(available_defenses_proportion_list) == 1 \
-                and available_defenses_proportion_list[0].item.id == defense.ROCKET_LAUNCHER.id \
+                and available_defenses_proportion_list[0].item.id == catalog.DEFENSES.get("rl").id \
                 and len(defense_proportion_list) > 1:
             if self.config.spend_excess_metal_on_rl is False:
                 self.logger.info("Can only build rocket launchers, and SpendExcessMetalOnRL is False")
@@ -106,7 +106,7 @@ class DefenderBot(BaseBot):
     def get_defense_points_for_planet(self, planet):
         defenses = self.defense_client.get_defenses(planet)
         defense_points = sum(
-            [defense.DEFENSES_DATA.get(str(x.item.id)).cost.times(x.amount).get_points() for x in defenses])
+            [catalog.DEFENSES.get(x.item.id).cost.times(x.amount).get_points() for x in defenses])
         return defense_points
 
     def get_defenses_proportion_comparison_table(self, defenses_proportion_list, planet_defenses):
@@ -125,7 +125,7 @@ class DefenderBot(BaseBot):
 
     @staticmethod
     def parse_defense_proportion(defense_proportion_str):
-        parsed_defense_proportion = map(lambda x: scraper.ItemAction(defense.DEFENSES_DATA.get(filter(str.isalpha, x)),
+        parsed_defense_proportion = map(lambda x: scraper.ItemAction(catalog.DEFENSES.get(filter(str.isalpha, x)),
                                                                      int(filter(str.isdigit, x))),
                                         defense_proportion_str)
 
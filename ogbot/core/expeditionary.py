@@ -1,15 +1,15 @@
 import random
-import time
 
 from base import BaseBot
-from scraping import fleet
+from scraping import fleet, engine, scraper
 
 
 class ExpeditionaryBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.fleet_client = fleet.Fleet(browser, config)
+        self.fleet_client = scraper.get_client(fleet.Fleet, browser, config)
+        self.prefetcher = engine.Prefetcher(engine.get_engine(browser, config))
 
         super(ExpeditionaryBot, self).__init__(browser, config, planets)
 
@@ -36,7 +36,7 @@ class ExpeditionaryBot(BaseBot):
                 # Delay - wait a random time before sending fleet, this makes the bot less detectable
                 delay = random.randint(self.config.expedition_fleet_min_delay, self.config.expedition_fleet_max_delay)
                 self.logger.info("Waiting for %s seconds" % delay)
-                time.sleep(delay)
+                self.prefetcher.sleep(delay, 'expedition_delay')
 
             target_planet = self.get_random_player_planet()
             res = self.send_expedition(target_planet)
@@ -7,13 +7,13 @@ class LoggerBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.fleet_client = fleet.Fleet(browser, config)
-        self.movement_client = movement.Movement(browser, config)
-        self.defense_client = defense.Defense(browser, config)
-        self.hangar_client = hangar.Hangar(browser, config)
-        self.general_client = general.General(browser, config)
-        self.buildings_client = buildings.Buildings(browser, config)
-        self.research_client = research.Research(browser, config)
+        self.fleet_client = scraper.get_client(fleet.Fleet, browser, config)
+        self.movement_client = scraper.get_client(movement.Movement, browser, config)
+        self.defense_client = scraper.get_client(defense.Defense, browser, config)
+        self.hangar_client = scraper.get_client(hangar.Hangar, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
+        self.buildings_client = scraper.get_client(buildings.Buildings, browser, config)
+        self.research_client = scraper.get_client(research.Research, browser, config)
 
         super(LoggerBot, self).__init__(browser, config, planets)
 
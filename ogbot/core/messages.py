@@ -8,31 +8,25 @@ class MessagesBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.messages_client = messages.Messages(browser, config)
-        self.general_client = general.General(browser, config)
+        self.messages_client = scraper.get_client(messages.Messages, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
 
         super(MessagesBot, self).__init__(browser, config, planets)
 
     def clear_spy_reports(self):
         self.messages_client.clear_spy_reports()
 
-    def get_spy_reports(self):
-        """Get spy reports from the messages"""
-        spy_reports = set(self.messages_client.get_spy_reports())
+    def get_spy_reports(self, oldest_datetime=None, inactive_only=False):
+        """Get the newest spy report of each planet"""
+        spy_reports = self.messages_client.get_spy_reports(oldest_datetime, inactive_only)
         return spy_reports
 
     def get_valid_spy_reports(self):
         game_date = self.general_client.get_game_datetime()
+        oldest_datetime = game_date - timedelta(minutes=self.config.spy_report_life)
 
-        reports = self.get_spy_reports()
-        valid_reports = [report for report
-                         in reports
-                         # Get reports from inactive players only
-                         if report.player_state == scraper.PlayerState.Inactive
-                         # Get reports from last n minutes
-                         and report.report_datetime >= (game_date - timedelta(minutes=self.config.spy_report_life))
-                         ]
-
+        # Get reports of inactive players from last n minutes
+        valid_reports = self.get_spy_reports(oldest_datetime, inactive_only=True)
         return valid_reports
 
     def get_valid_spy_reports_from_inactive_targets(self):
@@ -1,12 +1,14 @@
 from base import BaseBot
-from scraping import movement
+from datetime import timedelta
+from scraping import movement, retry, metrics, scraper
+import random
 
 
 class MovementBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.movement_scraper = movement.Movement(browser, config)
+        self.movement_scraper = scraper.get_client(movement.Movement, browser, config)
 
         super(MovementBot, self).__init__(browser, config, planets)
 
@@ -18,3 +20,57 @@ class MovementBot(BaseBot):
         for hostile_movement in hostile_movements:
             self.logger.warning(hostile_movement)
             self.sms_sender.send_sms(hostile_movement)
+
+    def watch_hostile_activity(self, polls=None):
+        """
+        Keep polling the event list and alert about the hostile movements that are new or have changed.
+        The event list is polled often while there are hostile fleets on the way and less and less
+        often while there are not
+        :param polls: Number of times the event list is polled, forever if None
+        """
+        tracker = movement.MovementTracker()
+        interval = self.config.watch_min_interval
+        poll_count = 0
+
+        self.logger.info("Watching the hostile activity")
+        while polls is None or poll_count < polls:
+            poll_count += 1
+            try:
+                hostile_movements = [fleet_movement for fleet_movement in self.movement_scraper.get_fleet_movement()
+                                     if not fleet_movement.friendly]
+            except retry.RequestError as e:
+                self.logger.error("Unable to get the fleet movement: %s" % e)
+                hostile_movements = None
+
+            if hostile_movements is not None:
+                for hostile_movement in tracker.update(hostile_movements):
+                    self.logger.warning(hostile_movement)
+                    self.sms_sender.send_sms(hostile_movement)
+
+            interval = self.get_watch_interval(hostile_movements, interval)
+            if polls is None or poll_count < polls:
+                self.logger.debug("Checking the hostile activity again in %.0f seconds" % interval)
+                metrics.sleep(interval, 'watch_interval')
+
+    def get_watch_interval(self, hostile_movements, interval):
+        """
+        :param hostile_movements: Hostile movements of the last poll, None if it failed
+        :param interval: Seconds waited after the last poll
+        :return: Seconds to wait until the next poll
+        """
+        min_interval, max_interval = self.config.watch_min_interval, self.config.watch_max_interval
+        if hostile_movements:
+            imminent_time = timedelta(seconds=self.config.watch_imminent_time)
+            next_arrival = min(hostile_movement.countdown_time for hostile_movement in hostile_movements)
+            if next_arrival <= imminent_time:
+                interval = min_interval
+            else:
+                # Poll again before the fleet gets imminent
+                interval = min(max_interval, (next_arrival - imminent_time).total_seconds())
+        else:
+            # Back off while it is quiet, or while the server is failing
+            interval = interval * 2
+
+        interval = max(min_interval, min(max_interval, interval))
+        # Polling at a fixed pace is easy to spot
+        return interval * random.uniform(0.9, 1.1)
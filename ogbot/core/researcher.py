@@ -1,13 +1,13 @@
 from base import BaseBot
 
-from scraping import research, general
+from scraping import research, general, scraper
 
 
 class ResearcherBot(BaseBot):
 
     def __init__(self, browser, config, planets):
-        self.research_client = research.Research(browser, config)
-        self.general_client = general.General(browser, config)
+        self.research_client = scraper.get_client(research.Research, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
         self.planets = planets
         super(ResearcherBot, self).__init__(browser, config, planets)
 
@@ -1,37 +1,47 @@
 from base import BaseBot
-from scraping import galaxy, fleet
+from scraping import galaxy, fleet, retry, universe, engine, movement, slots, scraper
 import random
-import time
 
 
 class SpyBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.fleet_client = fleet.Fleet(browser, config)
-        self.galaxy_client = galaxy.Galaxy(browser, config)
+        self.fleet_client = scraper.get_client(fleet.Fleet, browser, config)
+        self.movement_client = scraper.get_client(movement.Movement, browser, config)
+        self.slot_allocator = slots.get_slot_allocator(browser)
+        self.galaxy_client = scraper.get_client(galaxy.Galaxy, browser, config)
+        # Systems are scanned only when their data in the universe map is stale
+        self.galaxy_scanner = universe.GalaxyScanner(self.galaxy_client,
+                                                     universe.get_universe_map(config.universe_map_path),
+                                                     config.universe_map_staleness * 3600,
+                                                     config.galaxy_refresh_budget or None)
+        self.engine = engine.get_engine(browser, config)
+        self.prefetcher = engine.Prefetcher(self.engine)
 
         super(SpyBot, self).__init__(browser, config, planets)
 
-    def get_planets_in_systems(self, systems):
+    def get_planets_in_systems(self, systems, planet_filter=None):
         """Get planets in the given systems"""
         planets_in_systems = []
-        for system_coordinates in systems:
-            planets = self.galaxy_client.get_planets(system_coordinates.split(':')[0], system_coordinates.split(':')[1])
+        systems_coordinates = [tuple(system.split(':')[:2]) for system in systems]
+        for planets in self.galaxy_scanner.get_planets_in_systems(systems_coordinates, planet_filter):
             planets_in_systems.extend(planets)
         return planets_in_systems
 
     def get_inactive_planets_in_systems(self, systems):
         """Get nearest inactive planets in the given systems"""
 
-        planets = [planet for planet
-                   in self.get_planets_in_systems(systems)
-                   if planet.player_state == galaxy.PlayerState.Inactive
-                   if planet.player_rank >= self.config.minimum_inactive_target_rank
-                   if planet.player_rank <= self.config.maximum_inactive_target_rank]
-        return planets
+        return self.get_planets_in_systems(systems, self.get_inactive_planet_filter())
+
+    def get_inactive_planet_filter(self):
+        """Filter of the inactive planets that are within the target rank range"""
+
+        return galaxy.PlanetFilter([galaxy.PlayerState.Inactive],
+                                   self.config.minimum_inactive_target_rank,
+                                   self.config.maximum_inactive_target_rank)
 
-    def get_nearest_planets(self, origin_planet=None, nr_range=3):
+    def get_nearest_planets(self, origin_planet=None, nr_range=3, planet_filter=None):
         """Get nearest planets from origin planet"""
 
         if origin_planet is None:
@@ -39,17 +49,18 @@ class SpyBot(BaseBot):
 
         self.logger.info("Getting nearest planets from %s", origin_planet.name)
 
-        planets = []
         galaxy = origin_planet.coordinates.split(':')[0]
         system = origin_planet.coordinates.split(':')[1]
-        planets.extend(self.galaxy_client.get_planets(galaxy, system))
+        systems = [(galaxy, system)]
         for i in range(1, nr_range):
             target_previous_system = str(int(system) - i)
             target_later_system = str(int(system) + i)
-            previous_planets = self.galaxy_client.get_planets(galaxy, target_previous_system)
-            later_planets = self.galaxy_client.get_planets(galaxy, target_later_system)
-            planets.extend(previous_planets)
-            planets.extend(later_planets)
+            systems.append((galaxy, target_previous_system))
+            systems.append((galaxy, target_later_system))
+
+        planets = []
+        for system_planets in self.galaxy_scanner.get_planets_in_systems(systems, planet_filter):
+            planets.extend(system_planets)
         return planets
 
     def get_nearest_inactive_planets(self, origin_planet=None, nr_range=3):
@@ -60,12 +71,9 @@ class SpyBot(BaseBot):
 
         self.logger.info("Getting nearest inactive planets from %s", origin_planet.name)
 
-        nearest_planets = self.get_nearest_planets(origin_planet, nr_range)
-        planets = [planet for planet
-                   in nearest_planets
-                   if planet.player_state == galaxy.PlayerState.Inactive
-                   if planet.player_rank >= self.config.minimum_inactive_target_rank]
-        return planets
+        planet_filter = galaxy.PlanetFilter([galaxy.PlayerState.Inactive],
+                                            minimum_rank=self.config.minimum_inactive_target_rank)
+        return self.get_nearest_planets(origin_planet, nr_range, planet_filter)
 
     def spy_nearest_planets(self, origin_planet=None, nr_range=3):
         """Spy the nearest planets from origin"""
@@ -129,32 +137,54 @@ class SpyBot(BaseBot):
         if nr_range is None:
             nr_range = self.config.attack_range
 
+        # The daemon keeps the bot between runs, every run gets the whole refresh budget
+        self.galaxy_scanner.start_run()
         self.logger.info("Getting systems in range")
         systems = self.get_systems_in_range(nr_range, self.planet)
         self.logger.info("there is a total of %d systems in the range %d" % (len(systems), self.config.attack_range))
         associated_systems = self.associate_systems_to_origin_planet(systems);
 
+        # The systems of every planet are scanned in the background, the probes of a planet are sent
+        # while the systems of the next ones are being scanned
+        scans = []
         for planet in self.planets:
-            systems = [system[0] for system in associated_systems if system[1] == planet]
+            systems = [tuple(system[0].split(':')[:2]) for system in associated_systems if system[1] == planet]
             self.logger.info("Getting inactive planets in range(%d) from %s" % (len(systems), planet.name))
-
-            for system in systems:
-                target_planets = self.get_inactive_planets_in_systems([system])
-
+            scans.append(self.prefetcher.add(
+                galaxy.Galaxy, lambda galaxy_client, systems: self.galaxy_scanner.get_planets_in_systems(
+                    systems, self.get_inactive_planet_filter(), galaxy_client), systems))
+
+        for planet_index, (planet, scan) in enumerate(zip(self.planets, scans)):
+            # The scans of the planets after the next one start during the delays between the probes
+            if planet_index + 1 < len(scans):
+                self.prefetcher.start(scans[planet_index + 1])
+            try:
+                systems_planets = scan.result()
+            except retry.RequestError as e:
+                self.logger.error("Unable to scan the systems in range of %s: %s" % (planet.name, e))
+                continue
+
+            for target_planets in systems_planets:
                 for index, target_planet in enumerate(target_planets):
                     # delay before sending mission
                     if index > 1:
                         # Delay - wait a random time before sending fleet, this makes the bot less detectable
                         delay = random.randint(self.config.spy_fleet_min_delay, self.config.spy_fleet_max_delay)
                         self.logger.info("Waiting for random time(%s seconds) before sending fleet " % delay)
-                        time.sleep(delay)
+                        self.prefetcher.sleep(delay, 'spy_delay')
 
                     while True:
-                        result = self.fleet_client.spy_planet(planet, target_planet, self.config.spy_probes_count)
+                        try:
+                            result = self.fleet_client.spy_planet(planet, target_planet,
+                                                                  self.config.spy_probes_count)
+                        except retry.RequestError as e:
+                            self.logger.error("Unable to spy planet %s: %s" % (target_planet.name, e))
+                            break
                         if result == fleet.FleetResult.NoAvailableSlots:
-                            delay = int(self.config.time_to_wait_for_probes / 8)
-                            self.logger.info(
-                                "Waiting %d seconds for spy probes to return and free up some slots" % delay)
-                            time.sleep(delay)
+                            # Wait until the next fleet returns, instead of checking the fleet page again and again
+                            self.slot_allocator.wait_for_free_slot(
+                                self.movement_client.get_fleet_movement,
+                                int(self.config.time_to_wait_for_probes / 8),
+                                lambda delay: self.prefetcher.sleep(delay, 'fleet_slots'))
                         else:
                             break
@@ -1,5 +1,5 @@
 from base import BaseBot
-from scraping import fleet, general, hangar
+from scraping import fleet, general, hangar, scraper
 from copy import copy
 
 
@@ -7,9 +7,9 @@ class TransporterBot(BaseBot):
     """Logging functions for the bot"""
 
     def __init__(self, browser, config, planets):
-        self.fleet_client = fleet.Fleet(browser, config)
-        self.hangar_client = hangar.Hangar(browser, config)
-        self.general_client = general.General(browser, config)
+        self.fleet_client = scraper.get_client(fleet.Fleet, browser, config)
+        self.hangar_client = scraper.get_client(hangar.Hangar, browser, config)
+        self.general_client = scraper.get_client(general.General, browser, config)
 
         super(TransporterBot, self).__init__(browser, config, planets)
 
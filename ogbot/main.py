@@ -1,17 +1,33 @@
 import argparse
 import logging
+import os
+import signal
 import sys
 import traceback
 
 from bot import OgameBot
 from config import Config
+from scheduler import Scheduler, parse_schedule
 from ogbot.sms import SMSSender
-from scraping import authentication
+from scraping import authentication, metrics, recorder
+from supervisor import Supervisor
+
+# Config changes the working directory, the supervisor starts the workers with the absolute path
+MAIN_PATH = os.path.abspath(__file__)
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-m', help='Mode in which to run the bot', nargs='+')
 parser.add_argument('-r', help='Range of the bot')
 parser.add_argument('-p', help='Origin planet')
+parser.add_argument('--record', metavar='ARCHIVE', help='Record the requests of the run in the archive file')
+parser.add_argument('--replay', metavar='ARCHIVE', help='Run offline, serving the requests from a recorded archive')
+parser.add_argument('--daemon', action='store_true',
+                    help='Keep running, each mode runs on the schedule set in the Daemon section of user.cfg')
+parser.add_argument('--profile', help='Run the account of the [Profile <name>] section of user.cfg')
+parser.add_argument('--supervise', action='store_true',
+                    help='Run every profile of user.cfg, each one in its own process')
+parser.add_argument('--rate-share', type=float, dest='rate_share', help=argparse.SUPPRESS)
+parser.add_argument('--metrics', help=argparse.SUPPRESS)
 
 args = parser.parse_args()
 config = Config(args)
@@ -20,12 +36,30 @@ config = Config(args)
 logger = logging.getLogger('OGBot')
 logger.setLevel(config.log_level)
 ch = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+if config.profile is not None:
+    formatter = logging.Formatter('%(asctime)s - %(name)s - [' + config.profile + '] - %(levelname)s - %(message)s')
+else:
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 ch.setFormatter(formatter)
 logger.addHandler(ch)
 
+if config.supervise:
+    supervisor = Supervisor(config, MAIN_PATH, args)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        succeeded = supervisor.run()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Stopping the supervisor")
+        succeeded = True
+    sys.exit(0 if succeeded else 1)
+
 logger.info('Starting the bot')
 
+# Log the performance summary of the current mode on demand, with kill -USR1 <pid>
+if hasattr(signal, 'SIGUSR1'):
+    signal.signal(signal.SIGUSR1, lambda signum, frame: metrics.log_summary())
+
 auth_client = authentication.AuthenticationProvider(config)
 browser = auth_client.get_browser()
 
@@ -45,11 +79,12 @@ switcher = {
         bot.transport_resources_to_least_defended_planet,
     'auto_build_structures': bot.auto_build_structures,
     'auto_research': bot.auto_research,
-    'check_hostile_activity': bot.check_hostile_activity
+    'check_hostile_activity': bot.check_hostile_activity,
+    'watch_hostile_activity': bot.watch_hostile_activity
 }
 
 
-for mode in config.mode:
+def run_mode(mode):
     function = switcher.get(mode)
     if function is None:
         logger.warning("There is no mode named %s" % mode)
@@ -64,6 +99,8 @@ for mode in config.mode:
         logger.warning("\ttransport_resources_to_least_defended_planet")
         logger.warning("\tauto_build_structures")
         logger.warning("\tauto_research")
+        logger.warning("\tcheck_hostile_activity")
+        logger.warning("\twatch_hostile_activity")
     else:
         logger.info("Bot running in %s mode" % mode)
         try:
@@ -73,5 +110,35 @@ for mode in config.mode:
             logger.error(exception_message)
             sms_sender = SMSSender(config)
             sms_sender.send_sms(exception_message)
+        finally:
+            metrics.log_summary()
+            if config.metrics_path is not None:
+                metrics.save(config.metrics_path)
+            metrics.reset()
+
+
+if config.daemon:
+    # The session, the bot and its caches are kept between the runs of the modes
+    scheduler = Scheduler()
+    for mode in config.mode:
+        scheduler.add_job(mode, lambda mode=mode: run_mode(mode),
+                          parse_schedule(config.daemon_schedules.get(mode.lower(), config.daemon_default_schedule)))
+
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        scheduler.run()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Stopping the daemon")
+else:
+    for mode in config.mode:
+        run_mode(mode)
+
+auth_client.retry_policy.log_retries()
+
+session_archive = recorder.get_session_archive(browser)
+if session_archive is not None:
+    session_archive.log_summary()
+    session_archive.close()
 
 logger.info("Quiting bot")
@@ -0,0 +1,173 @@
+"""
+In-process scheduler of the daemon mode. Each mode runs on its own schedule, an interval like '10m'
+or a cron expression like '*/5 * * * *', on the same session and bot, so the login, the planets and
+the caches are kept between runs
+"""
+import datetime
+import logging
+import re
+import time
+
+INTERVAL_PATTERN = re.compile(r'^(\d+)\s*([smhd]?)$')
+INTERVAL_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Range of each field of the cron expressions: minute, hour, day of month, month and day of week
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+class IntervalSchedule(object):
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def get_next_time(self, after):
+        """:return: The time in seconds of the next run after the given one"""
+        return after + self.seconds
+
+    def __str__(self):
+        return "every %d seconds" % self.seconds
+
+
+class CronSchedule(object):
+    def __init__(self, expression):
+        """
+        :param expression: minute hour day-of-month month day-of-week, each field can be *, a number,
+        a range (1-5), a list (1,15) and have a step (*/10). Sunday is day 0
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("Cron expressions must have 5 fields: %s" % expression)
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self.parse_field(field, minimum, maximum) for field, (minimum, maximum) in zip(fields, CRON_FIELD_RANGES)]
+        # Like cron, if both days are restricted the runs happen when any of them matches
+        self.any_day = fields[2] != '*' and fields[4] != '*'
+
+    @staticmethod
+    def parse_field(field, minimum, maximum):
+        """:return: set with the values the field matches"""
+        values = set()
+        for part in field.split(','):
+            range_part, _, step = part.partition('/')
+            if range_part == '*':
+                start, end = minimum, maximum
+            elif '-' in range_part:
+                start, end = [int(value) for value in range_part.split('-')]
+            else:
+                start = end = int(range_part)
+            if start < minimum or end > maximum or start > end:
+                raise ValueError("Invalid cron field %s" % field)
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def matches_day(self, moment):
+        # Python weekdays start on monday, cron ones on sunday
+        day_matches = moment.day in self.days
+        weekday_matches = (moment.weekday() + 1) % 7 in self.weekdays
+        return day_matches or weekday_matches if self.any_day else day_matches and weekday_matches
+
+    def get_next_time(self, after):
+        """:return: The time in seconds of the first minute after the given time that matches the expression"""
+        moment = datetime.datetime.fromtimestamp(after).replace(second=0, microsecond=0) \
+            + datetime.timedelta(minutes=1)
+        # Skip whole days and hours that don't match, there is a match within 4 years at most
+        limit = moment + datetime.timedelta(days=4 * 366)
+        while moment < limit:
+            if moment.month not in self.months or not self.matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return time.mktime(moment.timetuple())
+        raise ValueError("The cron expression %s never matches" % self.expression)
+
+    def __str__(self):
+        return "at '%s'" % self.expression
+
+
+def parse_schedule(text):
+    """
+    :param text: Interval ('90', '30s', '10m', '2h', '1d') or cron expression ('*/5 * * * *')
+    :return: IntervalSchedule or CronSchedule
+    """
+    text = text.strip()
+    match = INTERVAL_PATTERN.match(text)
+    if match is not None:
+        return IntervalSchedule(int(match.group(1)) * INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(text)
+
+
+class Job(object):
+    def __init__(self, name, function, schedule):
+        self.name = name
+        self.function = function
+        self.schedule = schedule
+        self.next_time = None
+        self.runs = 0
+        self.skipped_runs = 0
+
+
+class Scheduler(object):
+    """
+    Runs the jobs one at a time, the session can't be shared by two modes at once.
+    The runs that are due while another run is in progress are not queued up, a job that missed
+    several runs only runs once and then goes back to its schedule
+    """
+
+    def __init__(self, clock=time.time, sleep=time.sleep):
+        self.logger = logging.getLogger('OGBot')
+        self.clock = clock
+        self.sleep = sleep
+        self.jobs = []
+        self.running = False
+
+    def add_job(self, name, function, schedule):
+        """
+        :param function: Function without arguments that runs the job
+        :param schedule: IntervalSchedule or CronSchedule
+        """
+        job = Job(name, function, schedule)
+        # The interval jobs run as soon as the daemon starts
+        job.next_time = self.clock() if isinstance(schedule, IntervalSchedule) else schedule.get_next_time(self.clock())
+        self.jobs.append(job)
+        self.logger.info("Scheduled %s %s" % (name, schedule))
+        return job
+
+    def run_pending(self):
+        """Run the jobs that are due, in the order they were due"""
+        for job in sorted(self.jobs, key=lambda job: job.next_time):
+            if job.next_time > self.clock():
+                continue
+
+            self.logger.info("Running %s" % job.name)
+            job.runs += 1
+            try:
+                job.function()
+            finally:
+                self.reschedule(job)
+
+    def reschedule(self, job):
+        now = self.clock()
+        next_time = job.schedule.get_next_time(job.next_time)
+        skipped_runs = 0
+        while next_time <= now:
+            skipped_runs += 1
+            next_time = job.schedule.get_next_time(next_time)
+        if skipped_runs:
+            job.skipped_runs += skipped_runs
+            self.logger.warning("Skipped %d runs of %s that overlapped with the last run" % (skipped_runs, job.name))
+        job.next_time = next_time
+
+    def run(self):
+        """Run the jobs until stop is called"""
+        self.running = True
+        while self.running and self.jobs:
+            self.run_pending()
+            delay = min(job.next_time for job in self.jobs) - self.clock()
+            if delay > 0 and self.running:
+                self.logger.debug("Next job in %.0f seconds" % delay)
+                self.sleep(delay)
+
+    def stop(self):
+        self.running = False
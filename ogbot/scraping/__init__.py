@@ -1,14 +1,30 @@
 __all__ = [
     "authentication",
     "buildings",
+    "cache",
+    "catalog",
+    "clock",
     "general",
     "defense",
+    "engine",
     "fleet",
     "galaxy",
     "general",
     "hangar",
     "messages",
+    "metrics",
     "movement",
+    "pool",
+    "transport",
+    "universe",
     "util",
+    "parsing",
+    "ratelimit",
+    "recorder",
+    "reportstore",
     "research",
-    "scraper"]
+    "retry",
+    "scraper",
+    "session",
+    "slots",
+    "snapshot"]
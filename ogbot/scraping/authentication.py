@@ -1,18 +1,49 @@
 import logging
 from mechanize import Browser
-from bs4 import BeautifulSoup
 import cookielib
-import os
+import parsing
+import recorder
+import session
+import util
 from scraper import Scraper
 
+PLAYER_META = dict((name, parsing.Selector('.//meta[@name="ogame-%s"]' % name))
+                   for name in ['player-name', 'language', 'version'])
+
+HEADERS = [('User-agent', 'Mozilla/5.0 (Windows NT 10.0; WOW64) \
+        AppleWebKit/537.36 (KHTML, like Gecko) Chrome/46.0.2490.80 Safari/537.36')]
+
+
+def create_browser(cookie_jar):
+    """Create a browser that stores its cookies in the cookie jar"""
+    br = Browser()
+    br.set_cookiejar(cookie_jar)
+    br.set_handle_robots(False)
+    br.addheaders = HEADERS
+    util.set_shared_object(br, 'cookie_jar', cookie_jar)
+    return br
+
+
+def clone_browser(browser):
+    """
+    Create a new browser for the same game session, it shares the cookies and the
+    objects shared by the scrapers(see util.get_shared_object) with the original browser
+    """
+    cookie_jar = util.get_shared_object(browser, 'cookie_jar', cookielib.LWPCookieJar)
+    br = create_browser(cookie_jar)
+    util.share_objects(browser, br)
+
+    archive = recorder.get_session_archive(browser)
+    if archive is not None:
+        br.add_handler(recorder.ArchiveHandler(archive))
+    return br
+
 
 class AuthenticationProvider(Scraper):
     def __init__(self, config):
         self.login_url = 'http://%s.ogame.gameforge.com/' % config.country
         # http://s114-br.ogame.gameforge.com/game/index.php?page=overview
         self.index_url = 'http://s%s-%s.ogame.gameforge.com' % (config.universe, config.country) + '/game/index.php'
-        headers = [('User-agent', 'Mozilla/5.0 (Windows NT 10.0; WOW64) \
-        AppleWebKit/537.36 (KHTML, like Gecko) Chrome/46.0.2490.80 Safari/537.36')]
         # Authentication data
         self.username = config.username
         self.password = config.password
@@ -22,33 +53,35 @@ class AuthenticationProvider(Scraper):
         self.logger = logging.getLogger('ogame-bot')
         # Setting up the browser
         self.cj = cookielib.LWPCookieJar()
+        br = create_browser(self.cj)
 
-        br = Browser()
-        br.set_cookiejar(self.cj)
-        br.set_handle_robots(False)
-        br.addheaders = headers
-        # self.path = os.path.dirname(os.path.realpath(__file__))
-        # name of the cookies file
-        # self.cookies_file_name = os.path.join(self.path, 'cookies.tmp')
-        self.cookies_file_name = 'cookies.tmp'
+        # Record the session or replay a recorded one
+        if config.replay_path is not None:
+            recorder.install(br, recorder.SessionArchive(config.replay_path, 'replay'))
+        elif config.record_path is not None:
+            recorder.install(br, recorder.SessionArchive(config.record_path, 'record'))
+        # name of the cookies file, in the state directory of the profile
+        self.cookies_file_name = config.cookies_path
+        self.session = session.Session(session.CookieStore(self.cj, self.cookies_file_name), self.login)
+        util.set_shared_object(br, 'session', self.session)
         super(AuthenticationProvider, self).__init__(br, config)
 
     def verify_connection(self):
         res = self.open_url(self.index_url)
-        soup = BeautifulSoup(res.get_data(), "lxml")
-        if soup.find("meta", {"name": "ogame-player-name"}) is None:
+        document = self.parse(res.get_data(), 'index')
+        if PLAYER_META['player-name'].first(document) is None:
             return False
         else:
             self.logger.info('Connection is ok')
-            self.logger.info('Logged in as %s ' % soup.find("meta", {"name": "ogame-player-name"})['content'])
-            self.logger.info('Language is %s ' % soup.find("meta", {"name": "ogame-language"})['content'])
-            self.logger.info('Game version is %s ' % soup.find("meta", {"name": "ogame-version"})['content'])
+            self.logger.info('Logged in as %s ' % PLAYER_META['player-name'].first(document).get('content'))
+            self.logger.info('Language is %s ' % PLAYER_META['language'].first(document).get('content'))
+            self.logger.info('Game version is %s ' % PLAYER_META['version'].first(document).get('content'))
             return True
 
     def connect(self):
         self.logger.info('Opening login page ' + self.login_url)
         # Open login page
-        self.open_url(self.login_url)
+        self.open_url(self.login_url, navigate=True)
         self.browser.select_form(name="loginForm")
 
         # Enter Username and password
@@ -57,19 +90,9 @@ class AuthenticationProvider(Scraper):
         self.browser['uni'] = ['s%s-%s.ogame.gameforge.com' % (self.universe, self.country)]
         self.logger.info('Logging in to server: %s' % self.browser['uni'])
         self.submit_request()
-        self.logger.info('Saving authentication data')
-        self.cj.save(self.cookies_file_name)
-
-    def get_browser(self):
-        # Check if cookies file exists
-        if os.path.isfile(self.cookies_file_name):
-            self.logger.info('Found stored cookies')
-            self.cj.load(self.cookies_file_name, ignore_discard=True)
-            if self.verify_connection():
-                return self.browser
-            else:
-                self.logger.info('Could not restore session from cookies file')
 
+    def login(self):
+        """Log in and check the new session, called by the session when there isn't a valid one"""
         self.connect()
         connection = self.verify_connection()
 
@@ -77,5 +100,7 @@ class AuthenticationProvider(Scraper):
             self.logger.error("Unable to connect, check your username and password")
             exit()
 
-        self.cj.save(self.cookies_file_name, ignore_discard=True)
+    def get_browser(self):
+        # The stored session is not checked here, the first page the bot loads tells if it is still valid
+        self.session.start()
         return self.browser
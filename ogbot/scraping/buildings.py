@@ -1,8 +1,14 @@
-﻿from bs4 import BeautifulSoup
-import re
+﻿import re
+import catalog
+import parsing
 from general import General
 from scraper import *
 
+DETAIL_BUTTONS = parsing.Selector.by_class("*", "detail_button")
+LEVEL = parsing.Selector.by_class("span", "level")
+FAST_BUILD_LINKS = parsing.Selector('.//a[@class="fastBuild tooltip js_hideTipOnMobile"]')
+DETAILS_LINK = parsing.Selector('.//a[@id="details"]')
+
 
 class BuildingTypes(Enum):
     """
@@ -24,32 +30,6 @@ class BuildingTypes(Enum):
     DeuteriumTank = "24"
 
 
-BUILDINGS_DATA = {
-
-    "mm": BuildingItem(1, "Metal Mine"),
-    "cm": BuildingItem(2, "Crystal Mine"),
-    "ds": BuildingItem(3, "Deuterium Synthesizer"),
-    "sp": BuildingItem(4, "Solar Plant"),
-    "fr": BuildingItem(12, "Fusion Reactor"),
-    "ms": BuildingItem(22, "Metal Storage"),
-    "cs": BuildingItem(23, "Crystal Storage"),
-    "dt": BuildingItem(24, "Deuterium Tank"),
-
-    "1": BuildingItem(1, "Metal Mine"),
-    "2": BuildingItem(2, "Crystal Mine"),
-    "3": BuildingItem(3, "Deuterium Synthesizer"),
-    "4": BuildingItem(4, "Solar Plant"),
-    "12": BuildingItem(12, "Fusion Reactor"),
-    "102": BuildingItem(22, "Metal Storage"),
-    "23": BuildingItem(23, "Crystal Storage"),
-    "24": BuildingItem(24, "Deuterium Tank")
-
-}
-
-
-class BuildingItem(Item): pass
-
-
 class BuildingData(object):
     def __init__(self, building, level):
         self.building = building
@@ -59,7 +39,7 @@ class BuildingData(object):
 class Buildings(Scraper):
     def __init__(self, browser, config):
         super(Buildings, self).__init__(browser, config)
-        self.general_client = General(browser, config)
+        self.general_client = get_client(General, browser, config)
 
     @staticmethod
     def parse_buildings(buildings):
@@ -72,14 +52,16 @@ class Buildings(Scraper):
 
     def get_buildings(self, planet):
         self.logger.info('Getting buildings data for planet %s' % planet.name)
-        url = self.url_provider.get_page_url('resources', planet)
-        res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
-        building_buttons = soup(attrs={'class': "detail_button"})
+        return self.get_snapshot('resources', planet).get('buildings', self.extract_buildings)
+
+    @classmethod
+    def extract_buildings(cls, document):
+        """ Read the buildings and their levels from the resources page """
+        building_buttons = DETAIL_BUTTONS(document)
 
         buildings = []
         for building_button in building_buttons:
-            building_data = self.get_building_data_from_button(building_button)
+            building_data = cls.get_building_data_from_button(building_button)
 
             if building_data is not None:
                 buildings.append(building_data)
@@ -89,22 +71,20 @@ class Buildings(Scraper):
     def get_building_data_from_button(building_button):
         """ Read the building data from the building button """
 
-        building_id = building_button['ref']
-        building_data = BUILDINGS_DATA.get(building_id)
+        building_id = building_button.get('ref')
+        building_data = catalog.BUILDINGS.get(building_id)
 
         # ensures that execution will not break if there is a new item
         if building_data is not None:
             try:
-                building_info = "".join(building_button.find("span", {"class": "level"})
-                                        .findAll(text=True, recursive=False)[1])
+                building_info = "".join(parsing.own_text(LEVEL.first(building_button))[1])
             # If we get an exception here it means the building is in construction mode, so we
             # the info we need will be at index 0
             except IndexError:
-                building_info = "".join(building_button.find("span", {"class": "level"})
-                                        .findAll(text=True, recursive=False)[0])
+                building_info = "".join(parsing.own_text(LEVEL.first(building_button))[0])
 
             level = int(re.sub("[^0-9]", "", building_info))
-            return ItemAction(BuildingItem(building_data.id, building_data.name), level)
+            return ItemAction(building_data, level)
         else:
             return None
 
@@ -120,18 +100,19 @@ class Buildings(Scraper):
     def get_available_buildings_for_planet(self, planet):
         """ Returns the the structures on planet that has enough resources to be built """
 
-        url = self.url_provider.get_page_url('resources', planet)
-        resp = self.open_url(url)
+        return self.get_snapshot('resources', planet).get('available_buildings', self.extract_available_buildings)
 
-        soup = BeautifulSoup(resp.read(), "lxml")
-        build_images = soup.findAll("a", {"class": "fastBuild tooltip js_hideTipOnMobile"})
+    @classmethod
+    def extract_available_buildings(cls, document):
+        """ Read the buildings that can be built from the resources page """
+        build_images = FAST_BUILD_LINKS(document)
 
         buildings = []
 
         for build_image in build_images:
-            parent_block = build_image.parent
-            building_btn = parent_block.find("a", {"id": "details"})
-            building = self.get_building_data_from_button(building_btn)
+            parent_block = build_image.getparent()
+            building_btn = DETAILS_LINK.first(parent_block)
+            building = cls.get_building_data_from_button(building_btn)
             if building is not None:
                 buildings.append(building.item)
 
@@ -143,7 +124,7 @@ class Buildings(Scraper):
             return
         else:
             self.logger.info('Building %s on planet %s' % (building_data.name, planet.name))
-            self.build_structure_item(building_data)
+            self.build_structure_item(building_data, planet)
 
     def build_structure_item(self, building_data, planet=None):
         """
@@ -154,7 +135,7 @@ class Buildings(Scraper):
 
         if planet is not None:
             url = self.url_provider.get_page_url('resources', planet)
-            self.open_url(url)
+            self.open_url(url, navigate=True)
 
         self.create_control("form", "text", "menge", "1")
         self.create_control("form", "text", "type", str(building_data.id))
@@ -170,9 +151,4 @@ class Buildings(Scraper):
         :return: True if the planet is in construction mode, otherwise returns False
         """
 
-        url = self.url_provider.get_page_url('resources', planet)
-        resp = self.open_url(url)
-        soup = BeautifulSoup(resp.read(), "lxml")
-        # if the planet is in construction mode there shoud be a div with the
-        # class construction
-        return soup.find("div", {"class": "construction"}) is not None
+        return self.get_snapshot('resources', planet).get('construction_mode', is_in_construction)
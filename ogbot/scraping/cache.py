@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+
+import util
+from transport import Response
+
+# Time in seconds that a page is kept in the cache, pages that are not listed are never cached
+DEFAULT_PAGE_TTL = {
+    'overview': 30,
+    'resources': 60,
+    'research': 60,
+    'shipyard': 60,
+    'defense': 60
+}
+
+
+class PageCache(object):
+    """
+    Cache of page responses keyed by page, planet and post data.
+    It is shared by all the scrapers of a browser and of its clones, that use it from several threads,
+    see get_page_cache
+    """
+
+    def __init__(self, page_ttl=None):
+        """
+        :param page_ttl: dict with the time in seconds that each page is kept in the cache,
+        overrides the values in DEFAULT_PAGE_TTL
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.page_ttl = dict(DEFAULT_PAGE_TTL)
+        self.page_ttl.update(page_ttl or {})
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(url, data=None):
+        page, planet_link = util.parse_page_url(url)
+        return page, planet_link, data
+
+    def get(self, url, data=None):
+        """
+        :return: A Response if the page is in the cache and has not expired, otherwise None
+        """
+        key = self.get_key(url, data)
+        if self.page_ttl.get(key[0], 0) <= 0:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        self.logger.debug("Serving %s from the page cache" % url)
+        return Response(entry[1], url)
+
+    def put(self, url, data, response_data):
+        """Store the response data if the page is cacheable"""
+        key = self.get_key(url, data)
+        ttl = self.page_ttl.get(key[0], 0)
+        if ttl > 0:
+            with self.lock:
+                self.entries[key] = (time.time() + ttl, response_data)
+
+    def invalidate(self, planet_link=None):
+        """
+        Remove the pages of a planet from the cache
+        :param planet_link: Link(cp) of the planet, if None the whole cache is cleared
+        """
+        with self.lock:
+            if planet_link is None:
+                self.entries.clear()
+                return
+
+            # Pages requested without a planet belong to whatever planet was selected at the time
+            for key in [key for key in list(self.entries) if key[1] in (planet_link, None)]:
+                del self.entries[key]
+
+
+def get_page_cache(browser, config):
+    """Get the page cache shared by all the scrapers that use the browser"""
+    return util.get_shared_object(browser, 'page_cache', lambda: PageCache(config.page_cache_ttl))
@@ -0,0 +1,111 @@
+"""
+Catalog of the game items: ships, defenses, buildings and research. The items are created once when
+the module is imported and shared by all the scrapers, they must not be modified
+"""
+from scraper import BuildingItem, DefenseItem, Resources, ResearchItem, ShipItem
+
+
+class ItemCatalog(object):
+    """Items of one kind, found by their id (204 or "204", as in the ref of the page buttons) or short code ("lf")"""
+
+    def __init__(self, items):
+        """:param items: list of (short code, item), the code is None for the items that don't have one"""
+        self.items = [item for _, item in items]
+        self.items_by_id = dict((item.id, item) for item in self.items)
+        self.items_by_code = dict((code, item) for code, item in items if code is not None)
+
+    def get(self, key, default=None):
+        """:return: The item of the id or short code, default if there is none"""
+        if isinstance(key, basestring) and not key.isdigit():
+            return self.items_by_code.get(key, default)
+        try:
+            return self.items_by_id.get(int(key), default)
+        except (TypeError, ValueError):
+            return default
+
+    def get_ids(self):
+        return [item.id for item in self.items]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+SHIPS = ItemCatalog([
+    ("lf", ShipItem(204, "Light Fighter")),
+    ("hf", ShipItem(205, "Heavy Fighter")),
+    ("cr", ShipItem(206, "Cruiser")),
+    ("bs", ShipItem(207, "Battle Ship")),
+    ("cs", ShipItem(208, "Colony Ship")),
+    ("sg", ShipItem(202, "Small Cargo Ship")),
+    ("lg", ShipItem(203, "Large Cargo Ship")),
+    ("ep", ShipItem(210, "Espionage Probe")),
+    ("bc", ShipItem(215, "Battlecruiser")),
+    ("b", ShipItem(211, "Bomber")),
+    ("d", ShipItem(213, "Destroyer")),
+    ("ds", ShipItem(214, "Deathstar")),
+    ("r", ShipItem(209, "Recycler")),
+    ("ss", ShipItem(212, "Solar Satellite"))
+])
+
+DEFENSES = ItemCatalog([
+    ("rl", DefenseItem(401, "Rocket Launcher", Resources(2000, 0))),
+    ("ll", DefenseItem(402, "Light Laser", Resources(1500, 500))),
+    ("hl", DefenseItem(403, "Heavy Laser", Resources(6000, 2000))),
+    ("gc", DefenseItem(404, "Gauss Cannon", Resources(20000, 15000, 2000))),
+    ("ic", DefenseItem(405, "Ion Cannon", Resources(2000, 6000))),
+    ("pt", DefenseItem(406, "Plasma Turret", Resources(50000, 50000, 30000))),
+    ("ssd", DefenseItem(407, "Small Shield Dome", Resources(10000, 10000))),
+    ("lsd", DefenseItem(408, "Large Shield Dome", Resources(50000, 50000))),
+    ("abm", DefenseItem(502, "Anti-Ballistic Missile", Resources(8000, 2000))),
+    ("im", DefenseItem(503, "Interplanetary Missile", Resources(12500, 2500, 10000)))
+])
+
+BUILDINGS = ItemCatalog([
+    ("mm", BuildingItem(1, "Metal Mine")),
+    ("cm", BuildingItem(2, "Crystal Mine")),
+    ("ds", BuildingItem(3, "Deuterium Synthesizer")),
+    ("sp", BuildingItem(4, "Solar Plant")),
+    ("fr", BuildingItem(12, "Fusion Reactor")),
+    ("ms", BuildingItem(22, "Metal Storage")),
+    ("cs", BuildingItem(23, "Crystal Storage")),
+    ("dt", BuildingItem(24, "Deuterium Tank"))
+])
+
+RESEARCH = ItemCatalog([
+    (None, ResearchItem(113, "Energy Technology")),
+    (None, ResearchItem(120, "Laser Technology")),
+    (None, ResearchItem(121, "Ion Technology")),
+    (None, ResearchItem(114, "Hyperspace Technology")),
+    (None, ResearchItem(122, "Plasma Technology")),
+    (None, ResearchItem(115, "Combustion Drive")),
+    (None, ResearchItem(117, "Impulse Drive")),
+    (None, ResearchItem(118, "Hyperspace Drive")),
+    (None, ResearchItem(106, "Espionage Technology")),
+    (None, ResearchItem(108, "Computer Technology")),
+    (None, ResearchItem(124, "Astro Physics")),
+    (None, ResearchItem(123, "Intergalactic Research Network")),
+    (None, ResearchItem(199, "Graviton Research")),
+    (None, ResearchItem(109, "Weapon Technology")),
+    (None, ResearchItem(110, "Shield Technology")),
+    (None, ResearchItem(111, "Armour Technology"))
+])
+
+# Ids of the fleet missions
+MISSIONS = {
+    "expedition": 15,
+    "colonization": 7,
+    "recycle": 8,
+    "transport": 3,
+    "transfer": 4,
+    "spy": 6,
+    "defend": 5,
+    "attack": 1,
+    "allianceAttack": 2,
+    "destroyStar": 9
+}
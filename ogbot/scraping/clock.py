@@ -0,0 +1,81 @@
+"""
+Game clock. The server time is read from the OGameClock element of a page once, the offset to the
+local clock is kept and the current game time is computed locally until the offset gets old
+"""
+import datetime
+import logging
+import re
+import threading
+import time
+
+import util
+
+GAME_CLOCK_FORMAT = "%d.%m.%Y %H:%M:%S"
+# The clock is found in the raw markup, the pages that have it don't need to be parsed
+GAME_CLOCK_PATTERN = re.compile(r'class="OGameClock"[^>]*>\s*([\d.]+)\s*(?:<span>)?\s*([\d:]+)')
+
+
+def parse_game_clock(text):
+    return datetime.datetime.strptime(" ".join(text.split()), GAME_CLOCK_FORMAT)
+
+
+class GameClock(object):
+    def __init__(self, ttl=3600, clock=time.time):
+        """
+        :param ttl: Time in seconds after which the offset has to be measured again
+        :param clock: Function that returns the local time in seconds
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.ttl = ttl
+        self.clock = clock
+        self.offset = None
+        self.synchronized_at = None
+        self.lock = threading.Lock()
+
+    def is_stale(self):
+        """:return: True if the offset was never measured or it is older than the ttl"""
+        return self.synchronized_at is None or self.clock() - self.synchronized_at > self.ttl
+
+    def observe(self, game_datetime, local_time=None):
+        """
+        Measure the offset from a game datetime read from the server
+        :param local_time: Local time in seconds when the game datetime was read, now if None
+        """
+        if local_time is None:
+            local_time = self.clock()
+        with self.lock:
+            self.offset = game_datetime - datetime.datetime.fromtimestamp(local_time)
+            self.synchronized_at = local_time
+        self.logger.debug("Game clock synchronized, the offset to the local clock is %s" % self.offset)
+
+    def observe_markup(self, markup, local_time=None):
+        """
+        Measure the offset from the clock of a page, if it has one
+        :return: True if the page had a clock
+        """
+        match = GAME_CLOCK_PATTERN.search(markup)
+        if match is None:
+            return False
+        try:
+            game_datetime = parse_game_clock(" ".join(match.groups()))
+        except ValueError:
+            return False
+        self.observe(game_datetime, local_time)
+        return True
+
+    def now(self, synchronize=None):
+        """
+        :param synchronize: Function without arguments called to measure the offset when it is stale,
+        it should call observe or observe_markup
+        :return: The current game datetime
+        """
+        if synchronize is not None and self.is_stale():
+            synchronize()
+        if self.offset is None:
+            raise ValueError("The game clock has never been synchronized")
+        return datetime.datetime.fromtimestamp(self.clock()) + self.offset
+
+
+def get_game_clock(browser, config):
+    """Get the game clock shared by all the scrapers of the session"""
+    return util.get_shared_object(browser, 'game_clock', lambda: GameClock(config.game_clock_ttl))
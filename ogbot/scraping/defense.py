@@ -1,43 +1,11 @@
-from bs4 import BeautifulSoup
 import re
+import catalog
+import parsing
 from scraper import *
 
 
-ROCKET_LAUNCHER = DefenseItem(401, "Rocket Launcher", Resources(2000, 0))
-LIGHT_LASER = DefenseItem(402, "Light Laser", Resources(1500, 500))
-HEAVY_LASER = DefenseItem(403, "Heavy Laser", Resources(6000, 2000))
-GAUSS_CANNON = DefenseItem(404, "Gauss Cannon", Resources(20000, 15000, 2000))
-ION_CANNON = DefenseItem(405, "Ion Cannon", Resources(2000, 6000))
-PLASMA_TURRET = DefenseItem(406, "Plasma Turret", Resources(50000, 50000, 30000))
-SMALL_SHIELD_DOME = DefenseItem(407, "Small Shield Dome", Resources(10000, 10000))
-LARGE_SHIELD_DOME = DefenseItem(408, "Large Shield Dome", Resources(50000, 50000))
-ANTI_BALLISTIC_MISSILE = DefenseItem(502, "Anti-Ballistic Missile", Resources(8000, 2000))
-INTERPLANETARY_MISSILE = DefenseItem(503, "Interplanetary Missile", Resources(12500, 2500, 10000))
-
-DEFENSES_DATA = {
-
-    "rl": ROCKET_LAUNCHER,
-    "ll": LIGHT_LASER,
-    "hl": HEAVY_LASER,
-    "gc": GAUSS_CANNON,
-    "ic": ION_CANNON,
-    "pt": PLASMA_TURRET,
-    "ssd": SMALL_SHIELD_DOME,
-    "lsd": LARGE_SHIELD_DOME,
-    "abm": ANTI_BALLISTIC_MISSILE,
-    "im": INTERPLANETARY_MISSILE,
-
-    "401": ROCKET_LAUNCHER,
-    "402": LIGHT_LASER,
-    "403": HEAVY_LASER,
-    "404": GAUSS_CANNON,
-    "405": ION_CANNON,
-    "406": PLASMA_TURRET,
-    "407": SMALL_SHIELD_DOME,
-    "408": LARGE_SHIELD_DOME,
-    "502": ANTI_BALLISTIC_MISSILE,
-    "503": INTERPLANETARY_MISSILE
-}
+DETAIL_BUTTONS = parsing.Selector.by_class("*", "detail_button")
+LEVEL = parsing.Selector.by_class("span", "level")
 
 
 class Defenses:
@@ -57,21 +25,20 @@ class Defense(Scraper):
         self.logger.info('Getting defense data for planet %s' % planet.name)
         url = self.url_provider.get_page_url('defense', planet)
         res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
-        defense_buttons = soup(attrs={'class': "detail_button"})
+        document = self.parse(res.read(), 'defense')
+        defense_buttons = DETAIL_BUTTONS(document)
 
         defenses = []
         for def_button in defense_buttons:
-            def_id = def_button['ref']
-            defense_data = DEFENSES_DATA.get(def_id)
+            def_id = def_button.get('ref')
+            defense_data = catalog.DEFENSES.get(def_id)
 
             # ensures that execution will not break if there is a new item
             if defense_data is not None:
-                amount_level_text = def_button.find("span", {"class": "level"}).text
+                amount_level_text = parsing.text(LEVEL.first(def_button))
                 amount = int(re.findall('\d+\.?\d*', amount_level_text)[0].replace(".", ""))
 
-                item = DefenseItem(defense_data.id, defense_data.name)
-                defenses.append(ItemAction(item, amount))
+                defenses.append(ItemAction(defense_data, amount))
 
         return defenses
 
@@ -106,7 +73,7 @@ class Defense(Scraper):
 
         url = self.url_provider.get_page_url('defense', planet)
         self.logger.info("Redirecting to page %s" % url)
-        self.open_url(url)
+        self.open_url(url, navigate=True)
 
     def build_defense_on_current_page(self, defense_id, amount):
         """
@@ -0,0 +1,188 @@
+"""
+Execution engine for independent pieces of work of a mode, i.e. scanning the systems of the next
+origin planet while probes are sent from the current one. The work runs on worker threads and the
+callers get a Task to wait for. Every worker has its own browser of the game session, so the
+requests of the workers never touch the browser of the bots
+"""
+import collections
+import logging
+import sys
+import threading
+import Queue
+
+import authentication
+import metrics
+import util
+from scraper import Scraper
+
+
+class Task(object):
+    """Result of a piece of work submitted to the engine"""
+
+    def __init__(self, name):
+        self.name = name
+        self.finished = threading.Event()
+        self.value = None
+        self.error = None
+
+    def set_result(self, value):
+        self.value = value
+        self.finished.set()
+
+    def set_error(self, error):
+        self.error = error
+        self.finished.set()
+
+    def done(self):
+        return self.finished.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the work to finish
+        :return: The value returned by the work
+        :raise: The error raised by the work, with its original traceback
+        """
+        # Event.wait without timeout can't be interrupted with Ctrl+C on python 2
+        while not self.finished.wait(timeout if timeout is not None else 1):
+            if timeout is not None:
+                raise RuntimeError("Task %s did not finish in %s seconds" % (self.name, timeout))
+        if self.error is not None:
+            raise self.error[0], self.error[1], self.error[2]
+        return self.value
+
+
+class Engine(object):
+    def __init__(self, browser, config, size):
+        """
+        :param browser: Browser of the game session
+        :param config: Bot config
+        :param size: Number of worker threads
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.browser = browser
+        self.config = config
+        self.pending = Queue.Queue()
+        self.local = threading.local()
+        self.workers = [threading.Thread(target=self.work, name="engine-%d" % index) for index in range(max(size, 1))]
+        for worker in self.workers:
+            worker.daemon = True
+            worker.start()
+
+    def work(self):
+        while True:
+            task, function, args = self.pending.get()
+            try:
+                task.set_result(function(*args))
+            except Exception:
+                task.set_error(sys.exc_info())
+
+    def get_scraper(self, scraper_class):
+        """:return: The scraper of the class of the current worker, they all share the browser of the worker"""
+        scrapers = getattr(self.local, 'scrapers', None)
+        if scrapers is None:
+            scrapers = self.local.scrapers = {}
+            self.local.browser = authentication.clone_browser(self.browser)
+        if scraper_class not in scrapers:
+            scrapers[scraper_class] = scraper_class(self.local.browser, self.config)
+        return scrapers[scraper_class]
+
+    def submit(self, name, function, *args):
+        """
+        Run function(*args) on a worker
+        :param name: Name of the work, used in the errors
+        :return: Task of the work
+        """
+        task = Task(name)
+        self.pending.put((task, function, args))
+        return task
+
+    def submit_scraper(self, scraper_class, function, *args):
+        """
+        Run function(scraper, *args) on a worker, with a scraper of the class that uses the browser of the worker
+        :return: Task of the work
+        """
+        return self.submit(scraper_class.__name__,
+                           lambda *args: function(self.get_scraper(scraper_class), *args), *args)
+
+    def open_url(self, url, data=None):
+        """
+        Same as Scraper.open_url, but the request is made on a worker
+        :return: Task of the request, its result is the response
+        """
+        return self.submit_scraper(Scraper, lambda scraper: scraper.open_url(url, data))
+
+    @staticmethod
+    def gather(tasks):
+        """
+        Wait for all the tasks
+        :return: list with the results of the tasks, in the same order
+        """
+        return [task.result() for task in tasks]
+
+
+class QueuedTask(object):
+    """Work waiting in a Prefetcher, it is submitted to the engine when it's needed if it didn't start before"""
+
+    def __init__(self, prefetcher, name, function, args):
+        self.prefetcher = prefetcher
+        self.name = name
+        self.function = function
+        self.args = args
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = self.prefetcher.engine.submit(self.name, self.function, *self.args)
+
+    def done(self):
+        return self.task is not None and self.task.done()
+
+    def result(self, timeout=None):
+        self.prefetcher.start(self)
+        return self.task.result(timeout)
+
+
+class Prefetcher(object):
+    """
+    Read-only work, like galaxy scans or the pages of the next planet, that runs while the bot waits
+    between two fleet dispatches. The wait itself doesn't change, only the idle time is used
+    """
+
+    def __init__(self, engine):
+        self.logger = logging.getLogger('OGBot')
+        self.engine = engine
+        self.queued = collections.deque()
+        self.lock = threading.Lock()
+
+    def add(self, scraper_class, function, *args):
+        """
+        Queue function(scraper, *args), it starts on the next sleep or when its result is needed
+        :return: QueuedTask of the work
+        """
+        task = QueuedTask(self, scraper_class.__name__,
+                          lambda *args: function(self.engine.get_scraper(scraper_class), *args), args)
+        with self.lock:
+            self.queued.append(task)
+        return task
+
+    def start(self, task):
+        with self.lock:
+            if task in self.queued:
+                self.queued.remove(task)
+        task.start()
+
+    def sleep(self, seconds, reason):
+        """Start the queued work and sleep, like metrics.sleep"""
+        with self.lock:
+            tasks, self.queued = list(self.queued), collections.deque()
+        if tasks:
+            self.logger.debug("Prefetching %d pages while waiting" % len(tasks))
+            metrics.observe('prefetch', reason, len(tasks))
+        for task in tasks:
+            task.start()
+        metrics.sleep(seconds, reason)
+
+
+def get_engine(browser, config):
+    """Get the engine shared by all the bots of the session"""
+    return util.get_shared_object(browser, 'engine', lambda: Engine(browser, config, config.engine_workers))
@@ -1,35 +1,44 @@
 ﻿from __future__ import division
-from bs4 import BeautifulSoup
+import catalog
 import general
 import math
+import mechanize
+import parsing
+import slots
 from scraper import *
 
+SLOTS = parsing.Selector('.//div[@id="slots"]')
+SLOTS_BLOCKS = parsing.Selector.by_class("div", "fleft")
+SLOTS_USAGE = parsing.Selector.by_class("span", "tooltip", "advice")
+OVERMARK = parsing.Selector.by_class("span", "overmark")
+
 
 class Fleet(Scraper):
     def __init__(self, browser, config):
         super(Fleet, self).__init__(browser, config)
 
-        self.general_client = general.General(browser, config)
+        self.general_client = get_client(general.General, browser, config)
+        self.slot_allocator = slots.get_slot_allocator(browser)
 
     def spy_planet(self, origin_planet, destination_planet, spy_probes_count):
 
         self.logger.info("Spying planet %s (%s)", destination_planet.name, destination_planet.coordinates)
 
         result = self.send_fleet(origin_planet, destination_planet.coordinates,
-                                 self.missions["spy"], {self.SHIPS_DATA.get('ep'): spy_probes_count})
+                                 catalog.MISSIONS["spy"], {catalog.SHIPS.get('ep'): spy_probes_count})
 
         return result
 
     def send_expedition(self, origin_planet, coordinates):
         fleet = {
             # Small expedition fleet
-            self.SHIPS_DATA.get('sg'): 1,
-            self.SHIPS_DATA.get('lf'): 2,
-            self.SHIPS_DATA.get('ep'): 1
+            catalog.SHIPS.get('sg'): 1,
+            catalog.SHIPS.get('lf'): 2,
+            catalog.SHIPS.get('ep'): 1
         }
 
         self.logger.info("Sending expedition from planet %s to coordinates %s", origin_planet.name, coordinates)
-        self.send_fleet(origin_planet, coordinates, self.missions.get("expedition"), fleet)
+        self.send_fleet(origin_planet, coordinates, catalog.MISSIONS.get("expedition"), fleet)
 
     def attack_inactive_planet(self, origin_planet, target_planet):
         fleet = self.get_attack_fleet(origin_planet, target_planet)
@@ -37,7 +46,7 @@ class Fleet(Scraper):
         self.logger.info("Attacking planet %s from planet %s", target_planet.planet_name, origin_planet.name)
 
         result = self.send_fleet(origin_planet, target_planet.coordinates,
-                                 self.missions["attack"], fleet)
+                                 catalog.MISSIONS["attack"], fleet)
         return result
 
     def transport_resources(self, origin_planet, destination_planet, resources):
@@ -52,7 +61,7 @@ class Fleet(Scraper):
         fleet = self.get_tranport_fleet(resources, origin_planet)
 
         self.send_fleet(origin_planet, destination_planet.coordinates,
-                        self.missions["transport"], fleet, resources)
+                        catalog.MISSIONS["transport"], fleet, resources)
 
     def send_fleet(self, origin_planet, coordinates, mission, ships, resources=None):
         """
@@ -76,10 +85,10 @@ class Fleet(Scraper):
             return FleetResult.WrongParameters
 
         url = self.url_provider.get_page_url('fleet', origin_planet)
-        resp = self.open_url(url)
+        resp = self.open_url(url, navigate=True)
 
-        soup = BeautifulSoup(resp.read(), "lxml")
-        fleet_slots = self.get_fleet_slots_usage(mission, soup)
+        document = self.parse(resp.read(), 'fleet1')
+        fleet_slots = self.get_fleet_slots_usage(mission, document)
 
         if fleet_slots[0] >= fleet_slots[1]:
             self.logger.error('No available slots')
@@ -132,39 +141,43 @@ class Fleet(Scraper):
         if not resources.empty():
             self.logger.info("The fleet is transporting %s " % resources)
 
+        # Every mission takes one of the fleet slots, expeditions included
+        self.slot_allocator.reserve()
         return FleetResult.Success
 
-    def get_fleet_slots_usage(self, mission=None, soup=None):
+    def get_fleet_slots_usage(self, mission=None, document=None):
         """
             Get fleet slot usage data.
         """
 
-        if soup is None:
+        if document is None:
             url = self.url_provider.get_page_url('fleet')
             res = self.open_url(url)
-            soup = BeautifulSoup(res.read(), "lxml")
+            document = self.parse(res.read(), 'fleet1')
 
-        slots_info = soup.find("div", {"id": "slots"})
+        slots_info = SLOTS.first(document)
 
         if slots_info is None:
             self.logger.warning("Error Getting fleet slots data")
             return 0, 15
 
-        flefts = slots_info.findAll("div", {"class": "fleft"})
+        flefts = SLOTS_BLOCKS(slots_info)
 
-        if mission == self.missions.get("expedition"):
-            node = flefts[1].findAll("span", {"class": "tooltip advice"})
+        if mission == catalog.MISSIONS.get("expedition"):
+            node = SLOTS_USAGE(flefts[1])
         else:
-            node = flefts[0].findAll("span", {"class": "tooltip advice"})
+            node = SLOTS_USAGE(flefts[0])
 
-        slot_usage = "".join(node[0].findAll(text=True, recursive=False))
+        slot_usage = "".join(parsing.own_text(node[0]))
 
         try:
             result = (int(slot_usage.split('/')[0].strip()), int(slot_usage.split('/')[1].strip()))
         except ValueError:
-            slot_usage = "".join(node[0].find("span", {"class": "overmark"}).findAll(text=True, recursive=False))
+            slot_usage = "".join(parsing.own_text(OVERMARK.first(node[0])))
             result = (int(slot_usage.split('/')[0].strip()), int(slot_usage.split('/')[1].strip()))
 
+        if mission != catalog.MISSIONS.get("expedition"):
+            self.slot_allocator.observe_usage(*result)
         return result
 
     def get_tranport_fleet(self, resources, origin_planet=None):
@@ -203,14 +216,14 @@ class Fleet(Scraper):
         if (small_cargos_count * 5000) > resources_count:
             self.logger.info("Using small cargos")
             ships_count = int(math.ceil(resources_count / 5000))
-            return {self.SHIPS_DATA.get('sg'): ships_count}
+            return {catalog.SHIPS.get('sg'): ships_count}
         else:
             self.logger.info("Not enough Small Cargos, using Large Cargos instead")
             ships_count = int(math.ceil(resources_count / 25000))
             large_cargos_count = self.get_ships_count(origin_planet, "lg")
             if ships_count > large_cargos_count:
                 ships_count = large_cargos_count
-            fleet = {self.SHIPS_DATA.get('lg'): ships_count}
+            fleet = {catalog.SHIPS.get('lg'): ships_count}
             return fleet
 
     def get_ships_count(self, planet, ship_type):
@@ -221,7 +234,7 @@ class Fleet(Scraper):
         """
         ships_count = [ship.amount for ship
                        in planet.ships
-                       if ship.item.id == self.SHIPS_DATA.get(ship_type).id]
+                       if ship.item.id == catalog.SHIPS.get(ship_type).id]
 
         return next(iter(ships_count), 0)
 
@@ -1,51 +1,150 @@
-from bs4 import BeautifulSoup
+import json
 import urllib
 from scraper import *
+import parsing
+import pool
 import re
 
 
+GALAXY_TABLE = parsing.Selector('.//table[@id="galaxytable"]')
+ROWS = parsing.Selector.by_class("tr", "row")
+PLANET_NAME = parsing.Selector.by_class("*", "planetname")
+POSITION = parsing.Selector.by_class("td", "position")
+PLAYER_NAME_CELL = parsing.Selector.by_class("*", "playername")
+# The player name is in the heading of the player tooltip
+PLAYER_NAME = parsing.Selector("(.//h1)[1]//span")
+RANKS = parsing.Selector.by_class("li", "rank")
+RANK_LINK = parsing.Selector(".//a")
+
+
+class PlanetFilter(object):
+    """Conditions that the planets must meet, checked while the galaxy rows are parsed"""
+
+    def __init__(self, player_states=None, minimum_rank=None, maximum_rank=None):
+        """
+        :param player_states: list of accepted PlayerState, all of them if None
+        :param minimum_rank: minimum rank of the player, inclusive
+        :param maximum_rank: maximum rank of the player, inclusive
+        """
+        self.player_states = player_states
+        self.minimum_rank = minimum_rank
+        self.maximum_rank = maximum_rank
+
+    def accepts_state(self, player_state):
+        return self.player_states is None or player_state in self.player_states
+
+    def accepts_rank(self, player_rank):
+        return (self.minimum_rank is None or player_rank >= self.minimum_rank) \
+               and (self.maximum_rank is None or player_rank <= self.maximum_rank)
+
+
 class Galaxy(Scraper):
-    def get_planets(self, galaxy, system):
+    def __init__(self, browser, config):
+        super(Galaxy, self).__init__(browser, config)
+        self.scraper_pool = None
+
+    def get_planets_in_systems(self, systems, planet_filter=None):
+        """
+        Get planets in the given systems, up to GalaxyScanConcurrency systems are fetched at the same time
+        :param systems: list of (galaxy, system) tuples
+        :param planet_filter: PlanetFilter the planets must match, all the planets are returned if None
+        :return: list with the planets of each system, in the same order as the systems
+        """
+        return [planets if planets is not None else [] for planets in self.get_systems(systems, planet_filter)]
+
+    def get_systems(self, systems, planet_filter=None):
+        """
+        Same as get_planets_in_systems, but the systems that could not be read are None instead of empty lists
+        """
+        if self.config.galaxy_scan_concurrency <= 1 or len(systems) <= 1:
+            return [self.get_system(galaxy, system, planet_filter) for galaxy, system in systems]
+
+        if self.scraper_pool is None:
+            self.scraper_pool = pool.ScraperPool(Galaxy, self.browser, self.config,
+                                                 self.config.galaxy_scan_concurrency)
+
+        return self.scraper_pool.map(
+            lambda galaxy_client, system: galaxy_client.get_system(system[0], system[1], planet_filter), systems)
+
+    def get_planets(self, galaxy, system, planet_filter=None):
         """
         Get planets in the given galaxy and system
+        :param planet_filter: PlanetFilter the planets must match, all the planets are returned if None
+        """
+        planets = self.get_system(galaxy, system, planet_filter)
+        return planets if planets is not None else []
+
+    def get_system(self, galaxy, system, planet_filter=None):
+        """
+        Get planets in the given galaxy and system
+        :param planet_filter: PlanetFilter the planets must match, all the planets are returned if None
+        :return: list of planets, None if the response of the server is invalid
         """
         self.logger.info('Getting data from system %s:%s' % (galaxy, system))
         url = self.url_provider.get_page_url('galaxyContent')
         data = urllib.urlencode({'galaxy': galaxy, 'system': system})
         res = self.open_url(url, data).read()
 
-        # For some reason the server is retrieving a file full of escaped quotes,
-        # So we need to replace the spaced quotes for normal quotes
-        res2 = res.replace('\\"', '"')
+        galaxy_html = self.get_galaxy_html(res)
+        if galaxy_html is None:
+            self.logger.error("Invalid response from server, it is not a JSON object with the galaxy html")
+            return None
+
+        document = self.parse(galaxy_html, 'galaxyContent')
+        planets = self.parse_planets(document, galaxy, system, planet_filter)
 
-        soup = BeautifulSoup(self.strip_text(res2), "lxml")
+        if planets is None:
+            self.logger.error("Invalid response from server, could not find #galaxytable")
+
+        return planets
+
+    @staticmethod
+    def get_galaxy_html(content):
+        """
+        Get the html of the galaxy table from a galaxyContent response, a JSON object that has it in its galaxy field
+        :param content: Body of the response
+        :return: The html encoded as utf-8, None if the response is not a galaxyContent object
+        """
+        try:
+            galaxy_content = json.loads(content.decode('utf-8'))
+        except ValueError:
+            return None
+
+        if not isinstance(galaxy_content, dict) or not isinstance(galaxy_content.get('galaxy'), basestring):
+            return None
+
+        # libxml2 parses utf-8 faster than python unicode strings
+        return galaxy_content['galaxy'].encode('utf-8')
 
-        table = soup.find("table", {"id": "galaxytable"})
+    @classmethod
+    def parse_planets(cls, document, galaxy, system, planet_filter=None):
+        """
+        Read the planets of the galaxy table. The rows rejected by the filter are skipped as soon as
+        possible, without reading the rest of their data
+        :return: list of planets, None if the page has no galaxy table
+        """
+        table = GALAXY_TABLE.first(document)
 
         if table is None:
-            self.logger.error("Invalid response from server, could not find #galaxytable")
-            return []
+            return None
 
-        table_rows = table.findAll("tr", {"class": "row"})
+        # The ranks are only read if there is a row that needs them
+        player_ranks = None
         planets = []
 
-        for table_row in table_rows:
+        for table_row in ROWS(table):
 
             # skip empty table rows
-            if "empty_filter" in table_row.get("class"):
+            if "empty_filter" in parsing.classes(table_row):
                 continue
 
-            planet_name = self.strip_text(table_row(attrs={'class': "planetname"})[0].text)
-            planet_position = self.strip_text(table_row.find('td', {'class': "position"}).text)
-            planet_coordinates = ":".join([galaxy, system, planet_position])
-            player_name_data = table_row(attrs={'class': "playername"})[0]
-            player_name_heading = table_row.find('h1')
-            if player_name_heading is None:
+            player_name_data = PLAYER_NAME_CELL.first(table_row)
+            player_name_node = PLAYER_NAME.first(table_row)
+            if player_name_data is None or player_name_node is None:
                 continue
-            player_name = player_name_heading.find('span').text
 
             # Set player state
-            player_name_classes = player_name_data.get("class")
+            player_name_classes = parsing.classes(player_name_data)
 
             if 'longinactive' in player_name_classes:
                 player_state = PlayerState.Inactive
@@ -55,32 +154,46 @@ class Galaxy(Scraper):
             else:
                 player_state = PlayerState.Active
 
-            player_rank = self.get_rank(soup, player_name)
+            if planet_filter is not None and not planet_filter.accepts_state(player_state):
+                continue
+
+            if player_ranks is None:
+                player_ranks = cls.get_player_ranks(document)
+            player_name = parsing.text(player_name_node)
+            player_rank = player_ranks.get(player_name, 0)
+
+            if planet_filter is not None and not planet_filter.accepts_rank(player_rank):
+                continue
+
+            planet_name = parsing.text(PLANET_NAME.first(table_row)).strip()
+            planet_position = parsing.text(POSITION.first(table_row)).strip()
+            planet_coordinates = ":".join([galaxy, system, planet_position])
             planets.append(Planet(planet_name, planet_coordinates, player_name, player_state, player_rank))
 
         return planets
 
-    @staticmethod
-    def strip_text(text):
-        return text.replace("\\n", '').strip("u' [ ]")
+    @classmethod
+    def get_player_ranks(cls, document):
+        """
+        Read the rank of every player of the system in a single pass over the page
+        :return: dict with the rank of each player name
+        """
+        player_ranks = {}
+        for rank_node in RANKS(document):
+            # The rank is in the tooltip of the player, below the heading with the player name
+            player_name_node = PLAYER_NAME.first(rank_node.getparent().getparent())
+            if player_name_node is None:
+                continue
+            player_name = parsing.text(player_name_node)
+            if player_name not in player_ranks:
+                player_ranks[player_name] = cls.parse_rank(rank_node)
+        return player_ranks
 
     @staticmethod
-    def get_rank(soup, player_name):
-        rank_nodes = soup.findAll("li", {"class": "rank"})
-
-        player_rank_node_match = [rank_node
-                                  for rank_node
-                                  in rank_nodes
-                                  if player_name in rank_node.parent.parent.text]
-
-        if len(player_rank_node_match) == 0:
-            return 0
-        else:
-            player_rank_node = player_rank_node_match[0]
-            player_rank_string = player_rank_node.find("a").text.strip()
-            s = re.findall('^\d*', player_rank_string)
-            player_rank = int(s[0] if s[0] else "-1")
-            return player_rank
+    def parse_rank(rank_node):
+        player_rank_string = parsing.text(RANK_LINK.first(rank_node)).strip()
+        s = re.findall('^\d*', player_rank_string)
+        return int(s[0] if s[0] else "-1")
 
 
 class Planet(object):
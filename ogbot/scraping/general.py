@@ -1,8 +1,15 @@
-from bs4 import BeautifulSoup
 import urlparse
-import datetime
+import clock
+import parsing
 from scraper import *
 
+GAME_CLOCK = parsing.Selector.by_class("li", "OGameClock")
+RESOURCES = dict((resource, parsing.Selector('.//*[@id="resources_%s"]' % resource))
+                 for resource in ['metal', 'crystal', 'deuterium', 'energy'])
+PLANET_LINKS = parsing.Selector.by_class("*", "planetlink")
+PLANET_NAME = parsing.Selector.by_class("*", "planet-name")
+PLANET_COORDINATES = parsing.Selector.by_class("*", "planet-koords")
+
 
 class General(Scraper):
     def log_index_page(self):
@@ -12,39 +19,49 @@ class General(Scraper):
         self.logger.info(res.read())
 
     def get_game_datetime(self):
+        """
+        Get the current game datetime from the game clock, the overview page is only fetched when
+        the offset between the server and the local clock has to be measured again
+        """
+        return self.game_clock.now(self.synchronize_game_clock)
+
+    def synchronize_game_clock(self):
+        """Measure the offset of the game clock with a fresh overview page"""
         url = self.url_provider.get_page_url('overview')
-        res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
+        res = self.open_url(url, use_cache=False)
 
-        datetime_data = soup.find("li", {"class": "OGameClock"}).text
-        game_datetime = datetime.datetime.strptime(datetime_data, "%d.%m.%Y %H:%M:%S")
-        return game_datetime
+        # open_url reads the clock from the raw page, parse it if the markup is not the expected one
+        if self.game_clock.is_stale():
+            document = self.parse(res.read(), 'overview')
+            datetime_data = parsing.text(GAME_CLOCK.first(document))
+            self.game_clock.observe(clock.parse_game_clock(datetime_data))
 
     def get_resources(self, planet):
         self.logger.info('Getting resources data for planet %s' % planet.name)
-        url = self.url_provider.get_page_url('resources', planet)
-        res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
+        return self.get_snapshot('resources', planet).get('resources', self.extract_resources)
 
-        metal = int(soup.find(id='resources_metal').text.replace('.', ''))
-        crystal = int(soup.find(id='resources_crystal').text.replace('.', ''))
-        deuterium = int(soup.find(id='resources_deuterium').text.replace('.', ''))
-        energy = int(soup.find(id='resources_energy').text.replace('.', ''))
+    @staticmethod
+    def extract_resources(document):
+        """ Read the resources of the planet from the resources page """
+        metal = int(parsing.text(RESOURCES['metal'].first(document)).replace('.', ''))
+        crystal = int(parsing.text(RESOURCES['crystal'].first(document)).replace('.', ''))
+        deuterium = int(parsing.text(RESOURCES['deuterium'].first(document)).replace('.', ''))
+        energy = int(parsing.text(RESOURCES['energy'].first(document)).replace('.', ''))
 
         return Resources(metal, crystal, deuterium, energy)
 
     def get_planets(self):
         self.logger.info('Getting planets')
-        url = self.url_provider.get_page_url('resources')
-
-        res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
+        return self.get_snapshot('resources').get('planets', self.extract_planets)
 
-        links = soup(attrs={'class': "planetlink"})
+    @staticmethod
+    def extract_planets(document):
+        """ Read the planets of the player from any page """
+        links = PLANET_LINKS(document)
 
-        planets = [Planet((str(link(attrs={'class': "planet-name"})[0].contents[0])),
-                          urlparse.parse_qs(link['href'])['cp'][0],
-                          parse_coordinates(str(link(attrs={'class': "planet-koords"})[0].contents[0])))
+        planets = [Planet(str(parsing.own_text(PLANET_NAME.first(link))[0]),
+                          urlparse.parse_qs(link.get('href'))['cp'][0],
+                          parse_coordinates(str(parsing.own_text(PLANET_COORDINATES.first(link))[0])))
                    for link in links]
 
         return planets
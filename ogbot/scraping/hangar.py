@@ -1,31 +1,33 @@
-from bs4 import BeautifulSoup
 import re
+import catalog
+import parsing
 from scraper import *
 
+DETAIL_BUTTONS = parsing.Selector.by_class("*", "detail_button")
+LEVEL = parsing.Selector.by_class("span", "level")
+
 
 class Hangar(Scraper):
     def get_ships(self, planet):
         self.logger.info('Getting shipyard data for planet %s' % planet.name)
         url = self.url_provider.get_page_url('shipyard', planet)
         res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
-        ship_buttons = soup(attrs={'class': "detail_button"})
+        document = self.parse(res.read(), 'shipyard')
+        ship_buttons = DETAIL_BUTTONS(document)
 
         ships = []
         for ship_button in ship_buttons:
-            ship_id = ship_button['ref']
-            ship_data = self.SHIPS_DATA.get(ship_id)
+            ship_id = ship_button.get('ref')
+            ship_data = catalog.SHIPS.get(ship_id)
 
             # ensures that execution will not break if there is a new item
             if ship_data is not None:
 
                 try:
-                    amount_info = "".join(ship_button.find("span", {"class": "level"})
-                                          .findAll(text=True, recursive=False)[1])
+                    amount_info = "".join(parsing.own_text(LEVEL.first(ship_button))[1])
                 except IndexError:
-                    amount_info = "".join(ship_button.find("span", {"class": "level"})
-                                          .findAll(text=True, recursive=False)[0])
+                    amount_info = "".join(parsing.own_text(LEVEL.first(ship_button))[0])
                 amount = int(re.sub("[^0-9]", "", amount_info))
-                ships.append(ItemAction(ShipItem(ship_data.id, ship_data.name), amount))
+                ships.append(ItemAction(ship_data, amount))
 
         return ships
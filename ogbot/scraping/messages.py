@@ -1,48 +1,108 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from bs4 import BeautifulSoup
 from enum import Enum
 import urllib
 import galaxy
 import general
 import datetime
+import parsing
+import pool
+import reportstore
 from scraper import Scraper
 
+CURRENT_PAGE = parsing.Selector.by_class("li", "curPage")
+MESSAGE_BOXES = parsing.Selector.by_class("li", "msg")
+ESPIONAGE_DEFENSE_TEXT = parsing.Selector.by_class("span", "espionageDefText")
+MESSAGE_DATE = parsing.Selector.by_class("span", "msg_date", "fright")
+PLANET_LINK = parsing.Selector.by_class("a", "txt_link")
+INACTIVE_PLAYER = parsing.Selector.by_class("span", "status_abbr_longinactive")
+MESSAGE_CONTENT = parsing.Selector.by_class("div", "compacting")
+RESOURCES = parsing.Selector.by_class("span", "resspan")
+LOOT = parsing.Selector('.//span[normalize-space(@class)="ctn ctn4"]')
+FLEET = parsing.Selector.by_class("span", "ctn4", "tooltipLeft")
+DEFENSES = parsing.Selector.by_class("span", "ctn4", "fright", "tooltipRight")
+
+REPORT_DATETIME_FORMAT = "%d.%m.%Y %H:%M:%S"
+
 
 class Messages(Scraper):
     def __init__(self, browser, config):
         super(Messages, self).__init__(browser, config)
+        self.scraper_pool = None
 
     def get_messages(self):
         raise NotImplementedError
 
-    def get_spy_reports(self):
+    def get_spy_reports(self, oldest_datetime=None, inactive_only=False):
+        """
+        Get the newest spy report of each planet. Only the messages that are newer than the ones seen in
+        previous runs are downloaded, the reports seen before are kept in the spy report store
+        :param oldest_datetime: game datetime of the oldest report that is needed. The reports arrive
+        newest first, so the pagination stops at the first page that has an older report
+        :param inactive_only: Get only the reports of inactive players
+        :return: list with the newest report of each planet
+        """
         self.logger.info('Getting messages')
+        store = self.get_spy_report_store()
         url = self.url_provider.get_page_url('messages')
         data = urllib.urlencode({'tab': 20, 'ajax': 1})
 
         self.logger.info("Getting messages for first page")
         res = self.open_url(url, data)
-        soup = BeautifulSoup(res.read(), "lxml")
-        spy_reports = []
-
-        # add messages from the first page
-        spy_reports.extend(self.parse_spy_reports(soup))
+        document = self.parse(res.read(), 'messages')
+        new_reports = []
 
-        pagination_info = soup.find('li', {"class": "curPage"}).text
+        pagination_info = parsing.text(CURRENT_PAGE.first(document))
         page_count = int(pagination_info.split('/')[1])
 
-        # add messages from the other pages
-        for page in range(1, page_count):
-            page_number = page + 1
-            self.logger.info("Getting messages for page %d" % page_number)
-            data = urllib.urlencode({'messageId': -1, 'tabid': 20, 'action': 107, 'pagination': page_number, 'ajax': 1})
-            res = self.open_url(url, data)
-            soup = BeautifulSoup(res.read(), "lxml")
-            page_reports = self.parse_spy_reports(soup)
-            spy_reports.extend(page_reports)
-        return spy_reports
+        # The other pages are fetched in batches of concurrent requests until the known reports are reached
+        pending_pages = range(2, page_count + 1)
+        pages_reports = [self.parse_spy_reports(document)]
+        while pages_reports:
+            page_reports = pages_reports.pop(0)
+            new_reports.extend(report for report in page_reports if store.is_new(report))
+
+            if any(not store.is_new(report) or oldest_datetime is not None and report.report_datetime < oldest_datetime
+                   for report in page_reports):
+                self.logger.info("Reached the reports seen before, skipping %d pages" % len(pending_pages))
+                break
+
+            if not pages_reports and pending_pages:
+                batch_size = max(self.config.spy_report_fetch_concurrency, 1)
+                batch, pending_pages = pending_pages[:batch_size], pending_pages[batch_size:]
+                pages_reports = self.get_spy_reports_pages(batch)
+
+        self.logger.info("Got %d new spy reports" % len(new_reports))
+        store.add(new_reports)
+        return store.get_newest_reports(oldest_datetime, inactive_only)
+
+    def get_spy_report_store(self):
+        return reportstore.get_spy_report_store(self.config.spy_report_database_path)
+
+    def get_spy_reports_pages(self, page_numbers):
+        """
+        Get the spy reports of the pages, up to SpyReportFetchConcurrency pages are fetched and parsed at the same time
+        :param page_numbers: list of page numbers
+        :return: list with the spy reports of each page, in the same order as the page numbers
+        """
+        if self.config.spy_report_fetch_concurrency <= 1 or len(page_numbers) <= 1:
+            return [self.get_spy_reports_page(page_number) for page_number in page_numbers]
+
+        if self.scraper_pool is None:
+            self.scraper_pool = pool.ScraperPool(Messages, self.browser, self.config,
+                                                 self.config.spy_report_fetch_concurrency)
+
+        return self.scraper_pool.map(lambda messages_client, page_number:
+                                     messages_client.get_spy_reports_page(page_number), page_numbers)
+
+    def get_spy_reports_page(self, page_number):
+        """Get the spy reports of a page of the espionage tab"""
+        self.logger.info("Getting messages for page %d" % page_number)
+        url = self.url_provider.get_page_url('messages')
+        data = urllib.urlencode({'messageId': -1, 'tabid': 20, 'action': 107, 'pagination': page_number, 'ajax': 1})
+        res = self.open_url(url, data)
+        return self.parse_spy_reports(self.parse(res.read(), 'messages'))
 
     def clear_spy_reports(self):
         url = self.url_provider.get_page_url('messages')
@@ -50,10 +110,9 @@ class Messages(Scraper):
         self.open_url(url, data)
         self.logger.info("Clearing spy reports")
 
-    def parse_spy_reports(self, soup):
+    def parse_spy_reports(self, document):
         """parse spy reports for an individual page"""
-        message_boxes = soup.findAll("li", {"class": "msg "})
-        message_boxes += soup.findAll("li", {"class": "msg msg_new"})
+        message_boxes = MESSAGE_BOXES(document)
         spy_reports = []
 
         for message_box in message_boxes:
@@ -61,14 +120,17 @@ class Messages(Scraper):
             # We already are in the espionage tab, there is only spy reports and reports from other
             # players spying on us here. If the report is from other player spying on us the message div
             # should contain an span with the class espionageDefText
-            is_spy_report = True if message_box.find("span", {"class": "espionageDefText"}) is None else False
+            is_spy_report = True if ESPIONAGE_DEFENSE_TEXT.first(message_box) is None else False
+
+            message_id = message_box.get('data-msg-id')
+            message_id = int(message_id) if message_id and message_id.isdigit() else None
 
-            msg_date_node = message_box.find("span", {"class": "msg_date fright"})
+            msg_date_node = MESSAGE_DATE.first(message_box)
             message_datetime = parse_report_datetime(
-                msg_date_node.text if msg_date_node is not None else "1.1.2016 00:00:00")
+                parsing.text(msg_date_node) if msg_date_node is not None else "1.1.2016 00:00:00")
 
             if is_spy_report:
-                planet_info = message_box.find("a", {"class": "txt_link"}).text
+                planet_info = parsing.text(PLANET_LINK.first(message_box))
                 planet_name = planet_info.split('[')[0].strip()
                 coordinates_data = planet_info.split('[')
 
@@ -78,35 +140,35 @@ class Messages(Scraper):
                     continue
                 coordinates = coordinates_data[1].replace(']', '').strip()
                 # find inactive player name
-                player_node = message_box.find("span", {"class": "status_abbr_longinactive"})
+                player_node = INACTIVE_PLAYER.first(message_box)
                 if player_node is not None:
-                    player_name = player_node.text.strip()
+                    player_name = parsing.text(player_node).strip()
                     player_state = galaxy.PlayerState.Inactive
                 else:
                     # if the player isn't inactive I don't care about the name
                     player_name = 'unknown'
                     player_state = galaxy.PlayerState.Active
-                message_content = message_box.findAll("div", {"class": "compacting"})
+                message_content = MESSAGE_CONTENT(message_box)
 
                 if len(message_content) > 0:
                     resources_row = message_content[1]
-                    resources_data = resources_row.findAll("span", {"class": "resspan"})
+                    resources_data = RESOURCES(resources_row)
                     resources = None
                     if resources_data is not None:
-                        metal = parse_resource(resources_data[0].text)
-                        crystal = parse_resource(resources_data[1].text)
-                        deuterium = parse_resource(resources_data[2].text)
+                        metal = parse_resource(parsing.text(resources_data[0]))
+                        crystal = parse_resource(parsing.text(resources_data[1]))
+                        deuterium = parse_resource(parsing.text(resources_data[2]))
                         resources = general.Resources(metal, crystal, deuterium)
                     loot_row = message_content[2]
-                    loot_data = loot_row.find("span", {"class": "ctn ctn4"})
-                    loot = parse_loot_percentage(loot_data.text)
+                    loot_data = LOOT.first(loot_row)
+                    loot = parse_loot_percentage(parsing.text(loot_data))
                     defense_row = message_content[3]
-                    fleet_data = defense_row.find("span", {"class": "ctn ctn4 tooltipLeft"})
-                    defenses_data = defense_row.find("span", {"class": "ctn ctn4 fright tooltipRight"})
+                    fleet_data = FLEET.first(defense_row)
+                    defenses_data = DEFENSES.first(defense_row)
 
                     if fleet_data is not None and defenses_data is not None:
-                        fleet = parse_resource(fleet_data.text)
-                        defenses = parse_resource(defenses_data.text)
+                        fleet = parse_resource(parsing.text(fleet_data))
+                        defenses = parse_resource(parsing.text(defenses_data))
                     else:
                         fleet = None
                         defenses = None
@@ -117,7 +179,7 @@ class Messages(Scraper):
                     loot = None
 
                 report = SpyReport(str(planet_name), player_name, player_state, str(coordinates), resources, fleet,
-                                   defenses, loot, message_datetime)
+                                   defenses, loot, message_datetime, message_id)
                 spy_reports.append(report)
 
         return spy_reports
@@ -136,7 +198,7 @@ def parse_loot_percentage(text):
 
 
 def parse_report_datetime(text):
-    time = datetime.datetime.strptime(text.strip(), "%d.%m.%Y %H:%M:%S")
+    time = datetime.datetime.strptime(text.strip(), REPORT_DATETIME_FORMAT)
     return time
 
 
@@ -146,7 +208,7 @@ class MessageType(Enum):
 
 class SpyReport(object):
     def __init__(self, planet_name, player_name, player_state, coordinates, resources, fleet, defenses, loot,
-                 report_datetime):
+                 report_datetime, message_id=None):
         self.planet_name = planet_name
         self.player_name = player_name
         self.player_state = player_state
@@ -156,6 +218,7 @@ class SpyReport(object):
         self.fleet = fleet
         self.loot = loot
         self.report_datetime = report_datetime
+        self.message_id = message_id
 
     def __str__(self):
         return "Planet %s,Player %s, State: %s, coordinates %s, Resouces = %s, Fleet: %s, Defenses: %s, Loot: %s " % (
@@ -0,0 +1,162 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the histogram buckets of each kind of metric
+TIME_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf')]
+SIZE_BUCKETS = [1024, 10 * 1024, 50 * 1024, 100 * 1024, 500 * 1024, 1024 * 1024, float('inf')]
+COUNT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, float('inf')]
+
+METRIC_BUCKETS = {
+    'network': TIME_BUCKETS,  # Time waiting for the server, per request attempt
+    'bytes': SIZE_BUCKETS,  # Size of the responses
+    'parse': TIME_BUCKETS,  # Time building the parse tree of the responses
+    'sleep': TIME_BUCKETS,  # Time sleeping, keyed by reason instead of page
+    'throttle': TIME_BUCKETS,  # Time waiting for the rate limiter
+    'prefetch': COUNT_BUCKETS  # Work started during a sleep, keyed by the reason of the sleep
+}
+
+METRIC_UNITS = {'bytes': 'B', 'prefetch': ''}
+
+# Reentrant, the summary is logged from a signal handler that may interrupt the main thread holding it
+_lock = threading.RLock()
+_histograms = {}
+
+
+class Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percentage):
+        """:return: Upper bound of the bucket that contains the percentile"""
+        target = self.count * percentage / 100.0
+        accumulated = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            accumulated += count
+            if accumulated >= target:
+                return min(bucket, self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / float(self.count) if self.count else 0
+
+    def merge(self, counts, count, total, maximum):
+        """Add the values of other histogram of the same buckets"""
+        self.counts = [own + other for own, other in zip(self.counts, counts)]
+        self.count += count
+        self.total += total
+        self.max = max(self.max, maximum)
+
+
+def observe(metric, key, value):
+    """
+    Record a value
+    :param metric: Kind of metric, one of METRIC_BUCKETS
+    :param key: Page name (see UrlProvider) or reason the value is recorded for
+    :param value: Value to record, in seconds or bytes
+    """
+    with _lock:
+        histogram = _histograms.get((metric, key))
+        if histogram is None:
+            histogram = _histograms[(metric, key)] = Histogram(METRIC_BUCKETS[metric])
+        histogram.observe(value)
+
+
+@contextmanager
+def timed(metric, key):
+    """Record the time spent in the with block"""
+    start = time.time()
+    try:
+        yield
+    finally:
+        observe(metric, key, time.time() - start)
+
+
+def sleep(seconds, reason):
+    """time.sleep that records the time slept"""
+    observe('sleep', reason, seconds)
+    time.sleep(seconds)
+
+
+def get_summary():
+    """:return: list of lines with the statistics of each metric and key"""
+    with _lock:
+        histograms = sorted(_histograms.items())
+
+    lines = []
+    for (metric, key), histogram in histograms:
+        unit = METRIC_UNITS.get(metric, 's')
+        lines.append("%-8s %-15s count: %5d, total: %10.2f%s, mean: %8.3f%s, p50: %8.3f%s, p95: %8.3f%s, max: %8.3f%s"
+                     % (metric, key, histogram.count, histogram.total, unit, histogram.mean(), unit,
+                        histogram.percentile(50), unit, histogram.percentile(95), unit, histogram.max, unit))
+    return lines
+
+
+def log_summary():
+    logger = logging.getLogger('OGBot')
+    lines = get_summary()
+    if lines:
+        logger.info("Performance summary:")
+    for line in lines:
+        logger.info(line)
+
+
+def export_histograms(histograms):
+    return [[metric, key, histogram.counts, histogram.count, histogram.total, histogram.max]
+            for (metric, key), histogram in histograms.items()]
+
+
+def merge_histograms(histograms, data):
+    for metric, key, counts, count, total, maximum in data:
+        histogram = histograms.get((metric, key))
+        if histogram is None:
+            histogram = histograms[(metric, key)] = Histogram(METRIC_BUCKETS[metric])
+        histogram.merge(counts, count, total, maximum)
+
+
+def export():
+    """:return: list with the data of every histogram, it can be stored as JSON"""
+    with _lock:
+        return export_histograms(_histograms)
+
+
+def merge(data):
+    """Add the histograms of an export, i.e. the metrics of other process"""
+    with _lock:
+        merge_histograms(_histograms, data)
+
+
+def save(path):
+    """Add the current metrics to the ones stored in the file, the metrics of the process are left as they are"""
+    histograms = {}
+    if os.path.isfile(path):
+        with open(path) as metrics_file:
+            merge_histograms(histograms, json.load(metrics_file))
+    merge_histograms(histograms, export())
+    with open(path, 'w') as metrics_file:
+        json.dump(export_histograms(histograms), metrics_file)
+
+
+def load(path):
+    """Add the metrics stored in the file"""
+    with open(path) as metrics_file:
+        merge(json.load(metrics_file))
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
@@ -11,7 +11,7 @@ class missile(Scraper):
         system = coordinates.split(':')[1]
         position = coordinates.split(':')[2]
         data = urllib.urlencode({'galaxy': galaxy, 'system': system, 'position': position, 'planetType': 1})
-        self.open_url(url, data)
+        self.open_url(url, data, navigate=True)
         self.browser.select_form(name='rocketForm')
         self.browser['anz'] = missiles_count
         self.submit_request()
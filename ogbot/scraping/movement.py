@@ -1,7 +1,40 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
+import parsing
 from scraper import *
 from general import General
+import slots
+
+MOVEMENT_DETAILS = parsing.Selector.by_class("div", "fleetDetails", "detailsOpened")
+ORIGIN_COORDINATES = parsing.Selector.by_class("span", "originCoords")
+ORIGIN_PLANET = parsing.Selector.by_class("span", "originPlanet")
+DESTINATION_COORDINATES = parsing.Selector.by_class("span", "destinationCoords", "tooltip")
+EVENT_TABLE = parsing.Selector('.//table[@id="eventContent"]')
+EVENT_ROWS = parsing.Selector.by_class("tr", "eventFleet")
+EVENT_CELLS = dict((cell_class, parsing.Selector.by_class("td", cell_class))
+                   for cell_class in ["coordsOrigin", "originFleet", "destCoords", "destFleet", "countDown",
+                                      "arrivalTime"])
+FLEET_SLOTS = parsing.Selector.by_class("span", "fleetSlots")
+CURRENT_SLOTS = parsing.Selector.by_class("span", "current")
+ALL_SLOTS = parsing.Selector.by_class("span", "all")
+
+
+class MovementTracker(object):
+    """Tells the movements that are new or changed since the previous read of the event list"""
+
+    def __init__(self):
+        self.signatures = {}
+
+    def update(self, movements):
+        """
+        :param movements: All the movements of the event list
+        :return: list with the movements that are new or have changed since the previous update
+        """
+        signatures = dict((movement.get_key(), movement.get_signature()) for movement in movements)
+        changed_movements = [movement for movement in movements
+                             if self.signatures.get(movement.get_key()) != movement.get_signature()]
+        # The movements that arrived are forgotten, the event list doesn't show them anymore
+        self.signatures = signatures
+        return changed_movements
 
 
 def get_arrival_time(arrival_time_str):
@@ -14,7 +47,8 @@ def get_arrival_time(arrival_time_str):
 class Movement(Scraper):
     def __init__(self, browser, config):
         super(Movement, self).__init__(browser, config)
-        self.general_client = General(browser, config)
+        self.general_client = get_client(General, browser, config)
+        self.slot_allocator = slots.get_slot_allocator(browser)
 
     def get_fleet_movement_from_movement_page(self):
         """
@@ -23,14 +57,14 @@ class Movement(Scraper):
         """
         url = self.url_provider.get_page_url('movement')
         res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
-        movement_nodes = soup.findAll("div", {"class": "fleetDetails detailsOpened"})
+        document = self.parse(res.read(), 'movement')
+        movement_nodes = MOVEMENT_DETAILS(document)
         fleet_movements = []
         for movement_node in movement_nodes:
-            origin_planet_coords = self.parse_coords(movement_node.find("span", {"class": "originCoords"}).text)
-            origin_planet_name = movement_node.find("span", {"class": "originPlanet"}).text.strip()
+            origin_planet_coords = self.parse_coords(parsing.text(ORIGIN_COORDINATES.first(movement_node)))
+            origin_planet_name = parsing.text(ORIGIN_PLANET.first(movement_node)).strip()
             destination_coords = self.parse_coords(
-                movement_node.find("span", {"class": "destinationCoords tooltip"}).text)
+                parsing.text(DESTINATION_COORDINATES.first(movement_node)))
             movement = FleetMovement(origin_planet_coords, origin_planet_name, destination_coords)
             fleet_movements.append(movement)
         return fleet_movements
@@ -38,32 +72,43 @@ class Movement(Scraper):
     def get_fleet_movement(self):
         url = self.url_provider.get_page_url('eventList')
         res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
+        document = self.parse(res.read(), 'eventList')
 
-        movement_table = soup.find("table", {"id": "eventContent"})
-        movement_rows = movement_table.findAll("tr", {"class": "eventFleet"})
+        movement_table = EVENT_TABLE.first(document)
+        movement_rows = EVENT_ROWS(movement_table)
 
+        # The game clock answers locally, every countdown is measured from the same game time
+        game_time = self.general_client.get_game_datetime()
         fleet_movements = []
         for movement_row in movement_rows:
-            origin_coords = self.parse_coords(movement_row.find("td", {"class": "coordsOrigin"}).text.strip())
-            origin_planet_name = movement_row.find("td", {"class": "originFleet"}).text.strip()
-            dest_coords = self.parse_coords(movement_row.find("td", {"class": "destCoords"}).text.strip())
-            dest_planet_name = movement_row.find("td", {"class": "destFleet"}).text.strip()
-            count_down_td = movement_row.find("td", {"class": "countDown"})
-            is_friendly = 'friendly' in count_down_td.attrs['class']
-
-            arrival_time_str = movement_row.find("td", {"class": "arrivalTime"}).text
+            origin_coords = self.parse_coords(parsing.text(EVENT_CELLS["coordsOrigin"].first(movement_row)).strip())
+            origin_planet_name = parsing.text(EVENT_CELLS["originFleet"].first(movement_row)).strip()
+            dest_coords = self.parse_coords(parsing.text(EVENT_CELLS["destCoords"].first(movement_row)).strip())
+            dest_planet_name = parsing.text(EVENT_CELLS["destFleet"].first(movement_row)).strip()
+            count_down_td = EVENT_CELLS["countDown"].first(movement_row)
+            is_friendly = 'friendly' in parsing.classes(count_down_td)
+
+            arrival_time_str = parsing.text(EVENT_CELLS["arrivalTime"].first(movement_row)).strip()
             arrival_time = get_arrival_time(arrival_time_str)
-            countdown_time = self.get_countdown_time(arrival_time)
+            countdown_time = self.get_countdown_time(arrival_time, game_time)
+
+            # The rows are identified by an id like eventRow-1234567
+            event_id = movement_row.get('id', '').replace('eventRow-', '') or None
+            mission_type = movement_row.get('data-mission-type')
+            mission_type = int(mission_type) if mission_type and mission_type.isdigit() else None
+            return_flight = movement_row.get('data-return-flight') == 'true'
 
             movement = FleetMovement(origin_coords, origin_planet_name, dest_coords, dest_planet_name, is_friendly,
-                                     arrival_time, countdown_time)
+                                     arrival_time, countdown_time, event_id, mission_type, return_flight,
+                                     arrival_time_str)
             fleet_movements.append(movement)
 
+        self.slot_allocator.observe_movements(fleet_movements)
         return fleet_movements
 
-    def get_countdown_time(self, arrival_time):
-        game_time = self.general_client.get_game_datetime()
+    def get_countdown_time(self, arrival_time, game_time=None):
+        if game_time is None:
+            game_time = self.general_client.get_game_datetime()
         return arrival_time - game_time
 
     @staticmethod
@@ -76,11 +121,11 @@ class Movement(Scraper):
         """
         url = self.url_provider.get_page_url('movement')
         res = self.open_url(url)
-        soup = BeautifulSoup(res.read())
-        slots_info_node = soup.find("span", {"class", "fleetSlots"})
+        document = self.parse(res.read(), 'movement')
+        slots_info_node = FLEET_SLOTS.first(document)
         if slots_info_node is not None:
-            current_slots = int(slots_info_node.find("span", {"class", "current"}).text)
-            all_slots = int(slots_info_node.find("span", {"class", "all"}).text)
+            current_slots = int(parsing.text(CURRENT_SLOTS.first(slots_info_node)))
+            all_slots = int(parsing.text(ALL_SLOTS.first(slots_info_node)))
         else:
             current_slots = 0
             all_slots = 1
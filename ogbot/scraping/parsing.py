@@ -0,0 +1,130 @@
+"""
+Parser backends of the scrapers. Pages are always parsed into lxml trees and read with precompiled
+XPath selectors, the backend only changes how the tree is built:
+    lxml: libxml2 html parser, the fastest one and the default
+    soup: BeautifulSoup with the python html parser, slower but more tolerant with broken markup.
+          It is also used when the lxml parser can not make sense of a page
+"""
+import logging
+import threading
+
+import lxml.etree
+import lxml.html
+from lxml.html import soupparser
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def class_predicate(*class_names):
+    """
+    :return: XPath predicate that matches the elements that have all the classes,
+    like the class searches of BeautifulSoup
+    """
+    return " and ".join("contains(concat(' ', normalize-space(@class), ' '), ' %s ')" % class_name
+                        for class_name in class_names)
+
+
+class Selector(object):
+    """Precompiled XPath expression"""
+
+    def __init__(self, xpath):
+        self.xpath = xpath
+        self.compiled = lxml.etree.XPath(xpath)
+
+    @classmethod
+    def by_class(cls, tag, *class_names):
+        """:return: Selector of the descendant tags that have all the classes"""
+        return cls(".//%s[%s]" % (tag, class_predicate(*class_names)))
+
+    def __call__(self, node):
+        """:return: list with all the matches below the node"""
+        return self.compiled(node)
+
+    def first(self, node):
+        """:return: The first match below the node, None if there is not any"""
+        matches = self.compiled(node)
+        return matches[0] if matches else None
+
+
+OWN_TEXT = Selector("text()")
+
+
+def text(node):
+    """:return: Text of the node and all its descendants"""
+    return node.text_content()
+
+
+def own_text(node):
+    """:return: list with the text nodes that are direct children of the node"""
+    return OWN_TEXT(node)
+
+
+def classes(node):
+    """:return: list with the classes of the node"""
+    return node.get('class', '').split()
+
+
+class LxmlBackend(object):
+    name = 'lxml'
+
+    def __init__(self):
+        # lxml parsers can't be used by several threads at the same time
+        self.local = threading.local()
+
+    def parse(self, markup):
+        if isinstance(markup, unicode):
+            return lxml.html.document_fromstring(markup)
+
+        parser = getattr(self.local, 'parser', None)
+        if parser is None:
+            # The game pages are utf-8, don't let libxml2 guess the encoding
+            parser = self.local.parser = lxml.html.HTMLParser(encoding='utf-8')
+        return lxml.html.document_fromstring(markup, parser=parser)
+
+
+class SoupBackend(object):
+    name = 'soup'
+
+    def parse(self, markup):
+        return soupparser.fromstring(markup, features='html.parser')
+
+
+BACKENDS = {
+    'lxml': LxmlBackend,
+    'soup': SoupBackend
+}
+
+
+class Parser(object):
+    def __init__(self, backend='lxml'):
+        """
+        :param backend: Name of the backend used to build the trees, one of BACKENDS
+        """
+        self.logger = logging.getLogger('OGBot')
+        if backend not in BACKENDS:
+            self.logger.warning("There is no parser backend named %s, using lxml" % backend)
+            backend = 'lxml'
+        self.backend = BACKENDS[backend]()
+        self.fallback = SoupBackend() if backend != 'soup' else None
+
+    def parse(self, markup):
+        """
+        :param markup: Html to parse
+        :return: Root element of the lxml tree of the page
+        """
+        try:
+            return self.backend.parse(markup)
+        except (lxml.etree.ParserError, ValueError) as e:
+            if self.fallback is None:
+                raise
+            self.logger.debug("Unable to parse the page with %s (%s), using BeautifulSoup" % (self.backend.name, e))
+            return self.fallback.parse(markup)
+
+
+def get_parser(backend):
+    """Get the parser of the backend shared by all the scrapers of the process"""
+    with _parsers_lock:
+        if backend not in _parsers:
+            _parsers[backend] = Parser(backend)
+        return _parsers[backend]
@@ -0,0 +1,63 @@
+import logging
+import sys
+import threading
+import Queue
+
+import authentication
+
+
+class ScraperPool(object):
+    """
+    Pool of scrapers of the same class that run requests concurrently.
+    Every scraper has its own browser, all of them share the game session of the original browser
+    """
+
+    def __init__(self, scraper_class, browser, config, size):
+        """
+        :param scraper_class: Scraper class to create the pool of
+        :param browser: Browser of the game session
+        :param config: Bot config
+        :param size: Maximum number of concurrent requests
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.scrapers = [scraper_class(authentication.clone_browser(browser), config)
+                         for _ in range(max(size, 1))]
+
+    def map(self, function, items):
+        """
+        Call function(scraper, item) for every item, using the scrapers of the pool concurrently
+        :param function: Function to call, it receives the scraper and the item
+        :param items: Items to process
+        :return: List with the results in the same order as the items
+        """
+        items = list(items)
+        results = [None] * len(items)
+        errors = []
+        pending = Queue.Queue()
+        for index, item in enumerate(items):
+            pending.put((index, item))
+
+        def work(scraper):
+            while not errors:
+                try:
+                    index, item = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[index] = function(scraper, item)
+                except Exception:
+                    errors.append(sys.exc_info())
+
+        workers = [threading.Thread(target=work, args=(scraper,))
+                   for scraper in self.scrapers[:len(items)]]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if errors:
+            # Raise the first error with its original traceback
+            raise errors[0][0], errors[0][1], errors[0][2]
+
+        return results
@@ -0,0 +1,87 @@
+import threading
+import time
+
+# Class of endpoint of each page, every class has its own bucket
+ENDPOINT_CLASSES = {
+    'galaxyContent': 'galaxy',
+    'galaxy': 'galaxy',
+    'messages': 'messages',
+    'fleet1': 'fleet',
+    'fleet2': 'fleet',
+    'fleet3': 'fleet',
+    'movement': 'fleet'
+}
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """Token bucket that allows a sustained rate of requests with bursts of up to burst requests"""
+
+    def __init__(self, rate, burst, clock=time.time, sleep=time.sleep):
+        """
+        :param rate: Requests per second, the bucket doesn't limit anything if it is 0
+        :param burst: Maximum number of requests that can be made at once
+        """
+        self.rate = float(rate)
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token from the bucket, waiting until there is one available
+        :return: Time waited in seconds
+        """
+        if self.rate <= 0:
+            return 0
+
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # The token is reserved right away, so concurrent requests queue up behind this one
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+class RateLimiter(object):
+    """Limit the rate of requests to the server, both overall and per class of endpoint"""
+
+    def __init__(self, rates):
+        """
+        :param rates: dict with the (rate, burst) tuple of each endpoint class, 'total' applies to all requests
+        and 'other' to the pages that have no class in ENDPOINT_CLASSES
+        """
+        self.buckets = dict((endpoint_class, TokenBucket(rate, burst))
+                            for endpoint_class, (rate, burst) in rates.items())
+
+    def acquire(self, page):
+        """
+        Wait until a request to the page is allowed
+        :param page: Page of the request (i.e.: 'galaxyContent')
+        :return: Time waited in seconds
+        """
+        waited = 0
+        for endpoint_class in (ENDPOINT_CLASSES.get(page, 'other'), 'total'):
+            bucket = self.buckets.get(endpoint_class)
+            if bucket is not None:
+                waited += bucket.acquire()
+        return waited
+
+
+def get_rate_limiter(config):
+    """Get the rate limiter shared by all the scrapers of the process"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(config.request_rates)
+        return _rate_limiter
@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import urlparse
+from collections import defaultdict
+
+import mechanize
+
+import util
+
+# Form fields whose values are left out of the request keys
+SECRET_FIELDS = ('pass', 'password')
+SALT_SIZE = 16
+
+
+class SessionArchive(object):
+    """
+    Compact on-disk archive of request/response pairs, a gzip file with one JSON record per line.
+    POST data is only stored as an HMAC keyed with a random salt of the archive, kept in its first line.
+    The password field of the login form is left out of it, so the password can't be guessed from the
+    archive, but the responses contain the session cookies: keep the archives private.
+    """
+
+    def __init__(self, path, mode):
+        """
+        :param path: Path of the archive file
+        :param mode: 'record' to append the requests made to the archive, 'replay' to serve them back
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.responses = defaultdict(list)
+        self.requests = 0
+        self.misses = 0
+        self.salt = ''
+
+        if mode == 'replay':
+            self.load()
+        else:
+            # Recording more requests in an archive keeps its salt
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                self.salt = self.read_salt()
+                header = None
+            else:
+                self.salt = os.urandom(SALT_SIZE).encode('hex')
+                header = json.dumps({'salt': self.salt}) + '\n'
+            # Several gzip members in the same file are read back as a single stream
+            self.file = gzip.open(path, 'ab')
+            if header is not None:
+                self.file.write(header)
+
+    def read_salt(self):
+        with gzip.open(self.path, 'rb') as archive_file:
+            return json.loads(archive_file.readline()).get('salt', '')
+
+    def get_key(self, method, url, data):
+        if not data:
+            return "%s %s " % (method, url)
+        fields = [(name, '' if name in SECRET_FIELDS else value)
+                  for name, value in urlparse.parse_qsl(data, keep_blank_values=True)]
+        if not fields:
+            fields = [('', data)]
+        digest = hmac.new(str(self.salt), repr(fields), hashlib.sha1).hexdigest()
+        return "%s %s %s" % (method, url, digest)
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            raise IOError("There is no session archive at %s" % self.path)
+
+        with gzip.open(self.path, 'rb') as archive_file:
+            for line in archive_file:
+                record = json.loads(line)
+                if 'salt' in record:
+                    self.salt = record['salt']
+                else:
+                    self.responses[record['key']].append(record)
+        self.logger.info("Loaded %d responses from %s" % (sum(map(len, self.responses.values())), self.path))
+
+    def record(self, method, url, data, code, msg, headers, body):
+        # Bodies are stored as latin-1 text so any sequence of bytes survives the round trip
+        record = {'key': self.get_key(method, url, data), 'url': url, 'code': code, 'msg': msg,
+                  'headers': headers, 'body': body.decode('latin-1')}
+        with self.lock:
+            self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self.file.flush()
+            self.requests += 1
+
+    def replay(self, method, url, data):
+        """
+        :return: The next recorded response for the request, the last one is repeated once all of them
+        have been served. None if the request was never recorded
+        """
+        with self.lock:
+            self.requests += 1
+            records = self.responses.get(self.get_key(method, url, data))
+            if not records:
+                self.misses += 1
+                return None
+            record = records.pop(0) if len(records) > 1 else records[0]
+
+        return mechanize.make_response(record['body'].encode('latin-1'),
+                                       [(str(name), str(value)) for name, value in record['headers']],
+                                       record['url'], record['code'], str(record['msg']))
+
+    def log_summary(self):
+        if self.mode == 'replay':
+            self.logger.info("Replayed %d requests from %s, %d of them were not in the archive"
+                             % (self.requests, self.path, self.misses))
+        else:
+            self.logger.info("Recorded %d requests in %s" % (self.requests, self.path))
+
+    def close(self):
+        if self.mode == 'record':
+            self.file.close()
+
+
+class ArchiveHandler(mechanize.BaseHandler):
+    """Mechanize handler that records the responses in the archive, or serves them from it"""
+
+    # Run before the http handlers, so replayed requests never reach the network
+    handler_order = 100
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def replay_open(self, request):
+        method = 'POST' if request.has_data() else 'GET'
+        response = self.archive.replay(method, request.get_full_url(), request.get_data())
+        if response is None:
+            self.archive.logger.warning("Request to %s is not in the session archive" % request.get_full_url())
+            raise mechanize.HTTPError(request.get_full_url(), 404, "Not in the session archive", None, None)
+        return response
+
+    def record_response(self, request, response):
+        method = 'POST' if request.has_data() else 'GET'
+        body = response.read()
+        headers = response.info().items()
+        self.archive.record(method, request.get_full_url(), request.get_data(), response.code, response.msg,
+                            headers, body)
+        return mechanize.make_response(body, headers, response.geturl(), response.code, response.msg)
+
+    def http_open(self, request):
+        if self.archive.mode == 'replay':
+            return self.replay_open(request)
+        return None
+
+    https_open = http_open
+
+    def http_response(self, request, response):
+        if self.archive.mode == 'record':
+            return self.record_response(request, response)
+        return response
+
+    https_response = http_response
+
+
+def install(browser, archive):
+    """Record the requests of the browser in the archive, or serve them from it"""
+    browser.add_handler(ArchiveHandler(archive))
+    util.set_shared_object(browser, 'session_archive', archive)
+
+
+def get_session_archive(browser):
+    """:return: The archive the session is recorded in or replayed from, None if there is not any"""
+    return util.get_shared_object(browser, 'session_archive', lambda: None)
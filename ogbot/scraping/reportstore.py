@@ -0,0 +1,179 @@
+"""
+Local SQLite store of the spy reports. Keeps the history of the reports across runs, so the espionage
+tab only has to be read for the messages that arrived since the last synchronization, and the newest
+report of each planet is an index lookup instead of a scan of every report
+"""
+import datetime
+import logging
+import sqlite3
+import threading
+
+import galaxy
+import general
+import messages
+
+# Datetimes are stored as text in this format, that sorts in chronological order
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spy_reports (
+    message_id INTEGER,
+    planet_name TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    inactive INTEGER NOT NULL,
+    coordinates TEXT NOT NULL,
+    metal INTEGER,
+    crystal INTEGER,
+    deuterium INTEGER,
+    fleet INTEGER,
+    defenses INTEGER,
+    loot REAL,
+    report_datetime TEXT NOT NULL,
+    UNIQUE (coordinates, report_datetime)
+);
+CREATE INDEX IF NOT EXISTS spy_reports_coordinates ON spy_reports (coordinates, report_datetime);
+CREATE INDEX IF NOT EXISTS spy_reports_player ON spy_reports (player_name);
+CREATE INDEX IF NOT EXISTS spy_reports_datetime ON spy_reports (report_datetime);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value
+);
+"""
+
+COLUMNS = ("message_id, planet_name, player_name, inactive, coordinates, metal, crystal, deuterium, fleet, "
+           "defenses, loot, report_datetime")
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def format_datetime(value):
+    return value.strftime(DATETIME_FORMAT) if value is not None else None
+
+
+def parse_datetime(text):
+    return datetime.datetime.strptime(text, DATETIME_FORMAT) if text is not None else None
+
+
+class SpyReportStore(object):
+    def __init__(self, path):
+        """
+        :param path: Path of the database file, ':memory:' keeps the reports only while the process runs
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.path = path
+        # The reports are stored by the thread that synchronizes the messages, but the store is shared
+        # by every bot of the process, so a single connection is used under a lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def get_state(self, name):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_newest_message_id(self):
+        """:return: Id of the newest message stored, the high-water mark of the synchronization"""
+        return self.get_state('newest_message_id')
+
+    def get_newest_report_datetime(self):
+        """:return: Datetime of the newest report stored, used when the messages have no id"""
+        return parse_datetime(self.get_state('newest_report_datetime'))
+
+    def is_new(self, report):
+        """:return: True if the report is newer than the high-water mark"""
+        newest_message_id = self.get_newest_message_id()
+        if report.message_id is not None and newest_message_id is not None:
+            return report.message_id > newest_message_id
+        newest_report_datetime = self.get_newest_report_datetime()
+        return newest_report_datetime is None or report.report_datetime > newest_report_datetime
+
+    def add(self, reports):
+        """Store the reports and move the high-water mark to the newest of them"""
+        if not reports:
+            return
+
+        rows = [to_row(report) for report in reports]
+        message_ids = [report.message_id for report in reports if report.message_id is not None]
+        newest_report_datetime = max(report.report_datetime for report in reports)
+
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO spy_reports (%s) VALUES (%s)"
+                                        % (COLUMNS, ", ".join("?" * len(rows[0]))), rows)
+            if message_ids:
+                self.connection.execute("INSERT OR REPLACE INTO sync_state VALUES ('newest_message_id', "
+                                        "MAX(?, IFNULL((SELECT value FROM sync_state "
+                                        "WHERE name = 'newest_message_id'), ?)))",
+                                        (max(message_ids), max(message_ids)))
+            self.connection.execute("INSERT OR REPLACE INTO sync_state VALUES ('newest_report_datetime', "
+                                    "MAX(?, IFNULL((SELECT value FROM sync_state "
+                                    "WHERE name = 'newest_report_datetime'), '')))",
+                                    (format_datetime(newest_report_datetime),))
+
+    def get_newest_reports(self, oldest_datetime=None, inactive_only=False):
+        """
+        Get the newest report of each planet
+        :param oldest_datetime: Ignore the reports older than this datetime
+        :param inactive_only: Get only the reports of inactive players
+        :return: list of SpyReport, one per coordinates
+        """
+        # The grouped subquery walks the coordinates index, the join picks the newest row of each planet.
+        # The player state is filtered after that, a newer report of an active player hides the older ones
+        query = ("SELECT %s FROM spy_reports JOIN "
+                 "(SELECT coordinates AS newest_coordinates, MAX(report_datetime) AS newest_datetime "
+                 "FROM spy_reports WHERE report_datetime >= ? GROUP BY coordinates) "
+                 "ON coordinates = newest_coordinates AND report_datetime = newest_datetime"
+                 % COLUMNS)
+        parameters = [format_datetime(oldest_datetime) or '']
+        if inactive_only:
+            query += " WHERE inactive = 1"
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [from_row(row) for row in rows]
+
+    def get_newest_report(self, coordinates):
+        """:return: The newest report of the planet, None if it has never been spied"""
+        with self.lock:
+            row = self.connection.execute("SELECT %s FROM spy_reports WHERE coordinates = ? "
+                                          "ORDER BY report_datetime DESC LIMIT 1" % COLUMNS,
+                                          (coordinates,)).fetchone()
+        return from_row(row) if row is not None else None
+
+    def get_player_reports(self, player_name):
+        """:return: list with all the reports of the player, newest first"""
+        with self.lock:
+            rows = self.connection.execute("SELECT %s FROM spy_reports WHERE player_name = ? "
+                                           "ORDER BY report_datetime DESC" % COLUMNS, (player_name,)).fetchall()
+        return [from_row(row) for row in rows]
+
+
+def to_row(report):
+    resources = report.resources
+    metal, crystal, deuterium = ((resources.metal, resources.crystal, resources.deuterium)
+                                 if resources is not None else (None, None, None))
+    return (report.message_id, report.planet_name, report.player_name,
+            report.player_state == galaxy.PlayerState.Inactive, report.coordinates, metal, crystal, deuterium,
+            report.fleet, report.defenses, report.loot, format_datetime(report.report_datetime))
+
+
+def from_row(row):
+    (message_id, planet_name, player_name, inactive, coordinates, metal, crystal, deuterium, fleet, defenses, loot,
+     report_datetime) = row
+    resources = general.Resources(metal, crystal, deuterium) if metal is not None else None
+    player_state = galaxy.PlayerState.Inactive if inactive else galaxy.PlayerState.Active
+    return messages.SpyReport(str(planet_name), player_name, player_state, str(coordinates), resources, fleet,
+                              defenses, loot, parse_datetime(report_datetime), message_id)
+
+
+def get_spy_report_store(path):
+    """Get the store of the database file, shared by all the scrapers of the process"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SpyReportStore(path)
+        return _stores[path]
@@ -1,12 +1,11 @@
-from bs4 import BeautifulSoup
+import catalog
+import logging
+import parsing
 from general import General
-from scraper import Item, ItemAction, Scraper
+from scraper import ItemAction, ResearchItem, Scraper, get_client, is_in_construction
 from enum import Enum
 
 
-class ResearchItem(Item): pass
-
-
 class ResearchTypes(Enum):
     EnergyTech = 113,
     LaserTech = 120,
@@ -26,24 +25,11 @@ class ResearchTypes(Enum):
     ArmourTech = 111
 
 
-RESEARCH_DATA = {
-    "113": ResearchItem(113, "Energy Technology"),
-    "120": ResearchItem(120, "Laser Technology"),
-    "121": ResearchItem(121, "Ion Technology"),
-    "114": ResearchItem(114, "Hyperspace Technology"),
-    "122": ResearchItem(122, "Plasma Technology"),
-    "115": ResearchItem(115, "Combustion Drive"),
-    "117": ResearchItem(117, "Impulse Drive"),
-    "118": ResearchItem(118, "Hyperspace Drive"),
-    "106": ResearchItem(106, "Espionage Technology"),
-    "108": ResearchItem(108, "Computer Technology"),
-    "124": ResearchItem(124, "Astro Physics"),
-    "123": ResearchItem(123, "Intergalactic Research Network"),
-    "199": ResearchItem(199, "Graviton Research"),
-    "109": ResearchItem(109, "Weapon Technology"),
-    "110": ResearchItem(110, "Shield Technology"),
-    "111": ResearchItem(111, "Armour Technology")
-}
+DETAIL_BUTTONS = parsing.Selector.by_class("*", "detail_button")
+LEVEL = parsing.Selector.by_class("span", "level")
+FAST_BUILD_LINKS = parsing.Selector('.//a[@class="fastBuild tooltip js_hideTipOnMobile"]')
+DETAILS_LINKS = dict((research_id, parsing.Selector('.//a[@id="details%s"]' % research_id))
+                     for research_id in catalog.RESEARCH.get_ids())
 
 
 class ResearchData(object):
@@ -55,7 +41,7 @@ class ResearchData(object):
 class Research(Scraper):
     def __init__(self, browser, config):
         super(Research, self).__init__(browser, config)
-        self.general_client = General(browser, config)
+        self.general_client = get_client(General, browser, config)
 
     @staticmethod
     def parse_research(research):
@@ -68,14 +54,16 @@ class Research(Scraper):
 
     def get_research(self, planet):
         self.logger.info('Getting research data for planet %s' % planet.name)
-        url = self.url_provider.get_page_url('research', planet)
-        res = self.open_url(url)
-        soup = BeautifulSoup(res.read(), "lxml")
-        research_buttons = soup(attrs={'class': "detail_button"})
+        return self.get_snapshot('research', planet).get('research', self.extract_research)
+
+    @classmethod
+    def extract_research(cls, document):
+        """ Read the research and their levels from the research page """
+        research_buttons = DETAIL_BUTTONS(document)
 
         research = []
         for research_button in research_buttons:
-            research_data = self.get_research_data_from_button(research_button)
+            research_data = cls.get_research_data_from_button(research_button)
             if research_data is not None:
                 research.append(research_data)
 
@@ -85,54 +73,52 @@ class Research(Scraper):
     def get_research_data_from_button(research_button):
         """ Read the research data from the research button """
 
-        research_id = research_button['ref']
-        research_data = RESEARCH_DATA.get(research_id)
+        research_id = research_button.get('ref')
+        research_data = catalog.RESEARCH.get(research_id)
 
         # ensures that execution will not break if there is a new item
         if research_data is not None:
             try:
-                research_info = "".join(research_button.find("span", {"class": "level"})
-                                        .findAll(text=True, recursive=False))
+                research_info = "".join(parsing.own_text(LEVEL.first(research_button)))
             # If we get an exception here it means the research is in construction mode, so we
             # the info we need will be at index 0
             except IndexError:
-                research_info = "".join(research_button.find("span", {"class": "level"})
-                                        .findAll(text=True, recursive=False))
+                research_info = "".join(parsing.own_text(LEVEL.first(research_button)))
 
             level = int(research_info.strip())
-            return ItemAction(ResearchItem(research_data.id, research_data.name), level)
+            return ItemAction(research_data, level)
         else:
             return None
 
     def get_available_research_for_planet(self, planet):
         """ Returns the the research on the page of the planetthat has enough resources to be built """
 
-        url = self.url_provider.get_page_url('research', planet)
-        resp = self.open_url(url)
+        return self.get_snapshot('research', planet).get('available_research', self.extract_available_research)
 
-        soup = BeautifulSoup(resp.read(), "lxml")
-        build_images = soup.findAll("a", {"class": "fastBuild tooltip js_hideTipOnMobile"})
+    @classmethod
+    def extract_available_research(cls, document):
+        """ Read the research that can be started from the research page """
+        build_images = FAST_BUILD_LINKS(document)
 
         research = []
 
         for build_image in build_images:
-            parent_block = build_image.parent
+            parent_block = build_image.getparent()
 
-            for i in RESEARCH_DATA.keys():
-                details = "details" + i
-                research_item_btn = parent_block.find("a", {"id": details})
+            for i in catalog.RESEARCH.get_ids():
+                research_item_btn = DETAILS_LINKS[i].first(parent_block)
                 if research_item_btn is not None:
-                    research_item = self.get_research_data_from_button(research_item_btn)
+                    research_item = cls.get_research_data_from_button(research_item_btn)
                     if research_item is not None:
                         research.append(research_item.item)
 
             research_item = None
             if research_item_btn is not None:
-                research_item = self.get_research_data_from_button(research_item_btn)
+                research_item = cls.get_research_data_from_button(research_item_btn)
 
             if research_item is not None:
                 research.append(research_item.item)
-                self.logger.info(research_item.item)
+                logging.getLogger('OGBot').info(research_item.item)
 
         return research if research else None
 
@@ -142,13 +128,13 @@ class Research(Scraper):
             return
         else:
             self.logger.info('Research %s on planet %s' % (research_data.name, planet.name))
-            self.start_research_item(research_data)
+            self.start_research_item(research_data, planet)
 
     def start_research_item(self, research_data, planet=None):
 
         if planet is not None:
             url = self.url_provider.get_page_url('research', planet)
-            self.open_url(url)
+            self.open_url(url, navigate=True)
 
         self.create_control("form", "text", "menge", "1")
         self.create_control("form", "text", "type", str(research_data.id))
@@ -164,9 +150,4 @@ class Research(Scraper):
         :return: True if the planet is in construction mode, otherwise returns False
         """
 
-        url = self.url_provider.get_page_url('research', planet)
-        resp = self.open_url(url)
-        soup = BeautifulSoup(resp.read(), "lxml")
-        # if the planet is in construction mode there shoud be a div with the
-        # class construction
-        return soup.find("div", {"class": "construction"}) is not None
+        return self.get_snapshot('research', planet).get('research_mode', is_in_construction)
@@ -0,0 +1,168 @@
+import httplib
+import logging
+import random
+import socket
+import threading
+import time
+import urllib2
+from collections import Counter
+
+import metrics
+import util
+
+
+class RequestError(Exception):
+    """A request to the game server failed"""
+
+    def __init__(self, page, kind, error):
+        """
+        :param page: Page of the request (i.e.: 'galaxyContent')
+        :param kind: Kind of the error, see RetryPolicy.classify
+        :param error: Last error raised by the request
+        """
+        super(RequestError, self).__init__("Request to page %s failed (%s): %s" % (page, kind, error))
+        self.page = page
+        self.kind = kind
+        self.error = error
+
+
+class ServerUnavailableError(RequestError):
+    """The game server could not be reached after retrying the request"""
+    pass
+
+
+class CircuitBreaker(object):
+    """
+    Stops all the requests of the session while the server is degraded.
+    The breaker opens after a number of consecutive failures; while it is open the requests wait for
+    the cooldown to finish, then a single request is let through to probe the server.
+    """
+
+    def __init__(self, threshold=5, cooldown=60.0, sleep=time.sleep):
+        self.logger = logging.getLogger('OGBot')
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.sleep = sleep
+        self.consecutive_failures = 0
+        self.open_until = 0
+        self.lock = threading.Lock()
+
+    def is_open(self):
+        return self.consecutive_failures >= self.threshold
+
+    def wait(self):
+        """Wait until requests are allowed"""
+        while True:
+            with self.lock:
+                delay = self.open_until - time.time() if self.is_open() else 0
+                if delay <= 0:
+                    if self.is_open():
+                        # Let this request probe the server, the others keep waiting
+                        self.open_until = time.time() + self.cooldown
+                    return
+            self.sleep(delay)
+
+    def record_success(self):
+        with self.lock:
+            if self.is_open():
+                self.logger.info("The server is responding again, resuming requests")
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures == self.threshold:
+                self.logger.warning("The server seems degraded, pausing requests for %d seconds" % self.cooldown)
+                self.open_until = time.time() + self.cooldown
+
+
+class RetryPolicy(object):
+    """Retry failed requests with exponential backoff and jitter"""
+
+    # Kinds of error that are worth retrying
+    RETRYABLE = ('timeout', 'server_error', 'connection')
+
+    def __init__(self, attempts=5, base_delay=1.0, max_delay=60.0, jitter=0.5, breaker=None, sleep=time.sleep):
+        """
+        :param attempts: Maximum number of attempts of each request
+        :param base_delay: Delay in seconds after the first failed attempt, doubles on each attempt
+        :param max_delay: Maximum delay in seconds between attempts
+        :param jitter: Random proportion of the delay that is added or removed
+        :param breaker: CircuitBreaker shared by the requests of the session
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.breaker = breaker if breaker is not None else CircuitBreaker(sleep=sleep)
+        self.sleep = sleep
+        self.retries = Counter()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def classify(error):
+        """
+        :return: The kind of the error: 'timeout', 'server_error', 'client_error' or 'connection'
+        """
+        if isinstance(error, urllib2.HTTPError):
+            # Too many requests is the server asking us to slow down
+            if error.code >= 500 or error.code == 429:
+                return 'server_error'
+            return 'client_error'
+        if isinstance(error, urllib2.URLError) and isinstance(error.reason, socket.timeout):
+            return 'timeout'
+        if isinstance(error, socket.timeout):
+            return 'timeout'
+        return 'connection'
+
+    def get_delay(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def call(self, page, request):
+        """
+        Make the request, retrying it if it fails
+        :param page: Page of the request, used for the retry counters
+        :param request: Function without arguments that makes the request
+        :return: The result of the request
+        :raise RequestError: If the server rejected the request
+        :raise ServerUnavailableError: If all the attempts failed
+        """
+        for attempt in range(self.attempts):
+            self.breaker.wait()
+            try:
+                result = request()
+            except (urllib2.URLError, socket.error, httplib.HTTPException) as e:
+                kind = self.classify(e)
+                if kind not in self.RETRYABLE:
+                    self.breaker.record_success()
+                    raise RequestError(page, kind, e)
+
+                self.breaker.record_failure()
+                if attempt == self.attempts - 1:
+                    raise ServerUnavailableError(page, kind, e)
+
+                with self.lock:
+                    self.retries[(page, kind)] += 1
+                delay = self.get_delay(attempt)
+                self.logger.warning("Error requesting page %s (%s: %s), trying again in %.1f seconds"
+                                    % (page, kind, e, delay))
+                self.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def log_retries(self):
+        """Log the number of retries per page and kind of error"""
+        for (page, kind), count in sorted(self.retries.items()):
+            self.logger.info("Retried %d requests to page %s (%s)" % (count, page, kind))
+
+
+def get_retry_policy(browser, config):
+    """Get the retry policy shared by all the scrapers of the session"""
+    return util.get_shared_object(browser, 'retry_policy', lambda: RetryPolicy(
+        config.retry_attempts, config.retry_base_delay, config.retry_max_delay,
+        breaker=CircuitBreaker(config.circuit_breaker_threshold, config.circuit_breaker_cooldown,
+                               sleep=lambda seconds: metrics.sleep(seconds, 'circuit_breaker')),
+        sleep=lambda seconds: metrics.sleep(seconds, 'retry_backoff')))
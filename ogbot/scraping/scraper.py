@@ -1,8 +1,23 @@
 ﻿import util
+import cache
+import transport
+import retry
+import ratelimit
+import metrics
+import parsing
+import snapshot
+import clock
+import session
 import logging
-import mechanize
+import threading
+import weakref
 from enum import Enum
 
+# Scrapers shared by the bots, per browser and scraper class
+_clients = weakref.WeakKeyDictionary()
+# Reentrant, the scrapers get the clients they use while they are created
+_clients_lock = threading.RLock()
+
 
 class Scraper(object):
     """Base class for scraper classes"""
@@ -12,85 +27,101 @@ class Scraper(object):
         self.url_provider = util.UrlProvider(self.config.universe, self.config.country)
         self.logger = logging.getLogger('OGBot')
         self.browser = browser
+        self.page_cache = cache.get_page_cache(browser, config)
+        self.transport = transport.get_transport(browser, config)
+        self.retry_policy = retry.get_retry_policy(browser, config)
+        self.rate_limiter = ratelimit.get_rate_limiter(config)
+        self.snapshots = snapshot.get_snapshot_store(browser)
+        self.parser = parsing.get_parser(config.parser_backend)
+        self.game_clock = clock.get_game_clock(browser, config)
 
-        self.attempts = 3
         self.timeout = 30.0
-        self.SHIPS_DATA = {
-            "lf": ShipItem(204, "Light Fighter"),
-            "hf": ShipItem(205, "Heavy Fighter"),
-            "cr": ShipItem(206, "Cruiser"),
-            "bs": ShipItem(207, "Battle Ship"),
-            "cs": ShipItem(208, "Colony Ship"),
-            "sg": ShipItem(202, "Small Cargo Ship"),
-            "lg": ShipItem(203, "Large Cargo Ship"),
-            "ep": ShipItem(210, "Espionage Probe"),
-            "bc": ShipItem(215, "Battlecruiser"),
-            "b": ShipItem(211, "Bomber"),
-            "d": ShipItem(213, "Destroyer"),
-            "ds": ShipItem(214, "Deathstar"),
-            "r": ShipItem(209, "Recycler"),
-            "ss": ShipItem(212, "Solar Satellite"),
-
-            "204": ShipItem(204, "Light Fighter"),
-            "205": ShipItem(205, "Heavy Fighter"),
-            "206": ShipItem(206, "Cruiser"),
-            "207": ShipItem(207, "Battle Ship"),
-            "208": ShipItem(208, "Colony Ship"),
-            "202": ShipItem(202, "Small Cargo Ship"),
-            "203": ShipItem(203, "Large Cargo Ship"),
-            "210": ShipItem(210, "Espionage Probe"),
-            "215": ShipItem(215, "Battlecruiser"),
-            "211": ShipItem(211, "Bomber"),
-            "213": ShipItem(213, "Destroyer"),
-            "214": ShipItem(214, "Deathstar"),
-            "209": ShipItem(209, "Recycler"),
-            "212": ShipItem(212, "Solar Satellite"),
-        }
-
-        self.missions = {
-            "expedition": 15,
-            "colonization": 7,
-            "recycle": 8,
-            "transport": 3,
-            "transfer": 4,
-            "spy": 6,
-            "defend": 5,
-            "attack": 1,
-            "allianceAttack": 2,
-            "destroyStar": 9
-        }
-
-    def open_url(self, url, data=None):
+
+    def open_url(self, url, data=None, navigate=False, use_cache=True):
         """
-        Redirect to the url, makes up to 3 attempts
+        Redirect to the url, retrying the request if it fails
         :param url: Url to redirect to
         :param data: Additional data to send in the get request
+        :param navigate: The browser must end up on the page, i.e. to fill one of its forms.
+        These requests never use the page cache and are always sent through the browser
+        :param use_cache: Serve the page from the page cache if it is there
+        :raise retry.RequestError: If the request failed, ServerUnavailableError if the server can't be reached
         """
-        for attempt in range(0, self.attempts):
-            try:
-                res = self.browser.open(url, data, self.timeout)
+        if use_cache and not navigate:
+            res = self.page_cache.get(url, data)
+            if res is not None:
                 return res
-            except mechanize.URLError:
-                self.logger.warning("URLError opening url, trying again for the %dth time" % (attempt + 1))
 
-        # If is unable to connect quit the bot
-        self.logger.error("Unable to communicate with the server, exiting the bot")
-        exit()
+        page = util.parse_page_url(url)[0] or 'index'
+
+        def request():
+            self.throttle(page)
+            with metrics.timed('network', page):
+                if navigate:
+                    return self.browser.open(url, data, self.timeout)
+                return self.transport.open(url, data, self.timeout)
+
+        game_session = session.get_session(self.browser)
+        generation = game_session.generation if game_session is not None else None
+        res = self.retry_policy.call(page, request)
+        # The stored session is only checked here, on the pages the bot needs anyway
+        if game_session is not None and game_session.is_logged_out(url, res):
+            self.logger.warning('The session is over, logging in again')
+            game_session.renew(generation)
+            res = self.retry_policy.call(page, request)
+        metrics.observe('bytes', page, len(res.get_data()))
+        self.page_cache.put(url, data, res.get_data())
+        # Any fresh page with the game clock is good to measure the offset to the server time again
+        if self.game_clock.is_stale():
+            self.game_clock.observe_markup(res.get_data())
+        return res
 
     def submit_request(self):
         """
-        Submit form, makes up to 3 attempts
+        Submit form, retrying the request if it fails.
+        The cached pages of the planet the form belongs to are discarded
+        :raise retry.RequestError: If the request failed, ServerUnavailableError if the server can't be reached
         """
-        for attempt in range(0, self.attempts):
-            try:
-                res = self.browser.submit()
-                return res
-            except mechanize.URLError:
-                self.logger.warning("URLError submitting form, trying again for the %dth time" % (attempt + 1))
+        page, planet_link = util.parse_page_url(self.get_current_url())
+        page = page or 'index'
+
+        def request():
+            self.throttle(page)
+            with metrics.timed('network', page):
+                return self.browser.submit()
+
+        try:
+            return self.retry_policy.call(page, request)
+        finally:
+            self.page_cache.invalidate(planet_link)
 
-        # If is unable to connect quit the bot
-        self.logger.error("Unable to communicate with the server, exiting the bot")
-        exit()
+    def throttle(self, page):
+        """Wait until the rate limiter allows a request to the page"""
+        waited = self.rate_limiter.acquire(page)
+        if waited > 0:
+            metrics.observe('throttle', page, waited)
+
+    def parse(self, markup, page):
+        """
+        Build the parse tree of a page, recording the time it takes
+        :param markup: Html of the page
+        :param page: Page name, used for the metrics
+        :return: Root element of the tree, read it with the selectors of the parsing module
+        """
+        with metrics.timed('parse', page):
+            return self.parser.parse(markup)
+
+    def get_snapshot(self, page, planet=None):
+        """
+        Get the page parsed once, the values read from it are shared by all the scrapers of the session
+        :param page: Page name (i.e.: 'resources')
+        :param planet: Planet of the page, the current one if None
+        :return: PageSnapshot of the page
+        """
+        url = self.url_provider.get_page_url(page, planet)
+        res = self.open_url(url)
+        page_name = util.parse_page_url(url)[0]
+        return self.snapshots.get(url, res.get_data(), lambda markup: self.parse(markup, page_name))
 
     def get_current_url(self):
         """
@@ -113,6 +144,27 @@ class Scraper(object):
         self.browser[control_name] = control_value
 
 
+def get_client(scraper_class, browser, config):
+    """
+    Get the scraper of the class for the browser, creating it on first use. All the bots of the
+    session use the same scraper of each class instead of building their own
+    """
+    with _clients_lock:
+        clients = _clients.setdefault(browser, {})
+        if scraper_class not in clients:
+            clients[scraper_class] = scraper_class(browser, config)
+        return clients[scraper_class]
+
+
+CONSTRUCTION = parsing.Selector.by_class("div", "construction")
+
+
+def is_in_construction(document):
+    # if the planet is in construction mode there shoud be a div with the
+    # class construction
+    return CONSTRUCTION.first(document) is not None
+
+
 def sanitize(t):
     for i in t:
         try:
@@ -238,11 +290,16 @@ class ResearchItem(Item):
 
 class FleetMovement(object):
     def __init__(self, origin_coordinates, origin_name, destination_coordinates, destination_name, friendly,
-                 arrival_time=None, countdown_time=None):
+                 arrival_time=None, countdown_time=None, event_id=None, mission_type=None, return_flight=False,
+                 arrival_time_text=None):
         """
         :param origin_coordinates: Coordinates of the origin planet
         :param origin_name: Name of the origin planet
         :param destination_coordinates: Destination of the destination planet
+        :param event_id: Id of the row of the event list, it doesn't change while the fleet flies
+        :param mission_type: Mission of the fleet, see catalog.MISSIONS
+        :param return_flight: The fleet is coming back to its origin, its slot is free when it arrives
+        :param arrival_time_text: Arrival time as shown in the event list (HH:MM:SS)
         """
         self.origin_coords = origin_coordinates
         self.origin_name = origin_name
@@ -251,6 +308,23 @@ class FleetMovement(object):
         self.friendly = friendly
         self.arrival_time = arrival_time
         self.countdown_time = countdown_time
+        self.event_id = event_id
+        self.mission_type = mission_type
+        self.return_flight = return_flight
+        self.arrival_time_text = arrival_time_text
+
+    def get_key(self):
+        """:return: Identity of the movement, the same on every read of the event list"""
+        if self.event_id is not None:
+            return self.event_id
+        return self.origin_coords, self.destination_coords, self.friendly, self.mission_type
+
+    def get_signature(self):
+        """:return: The values of the movement that, if they change, are worth a new alert"""
+        # The arrival datetime gets the date of the day it is read, the text shown by the game doesn't
+        # change at midnight
+        arrival_time = self.arrival_time_text if self.arrival_time_text is not None else self.arrival_time
+        return self.destination_coords, self.mission_type, arrival_time
 
     def __str__(self):
         return "%s fleet from planet %s(%s) to planet %s(%s) in %s" % (("Friendly" if self.friendly else "Hostile"),
@@ -258,10 +332,6 @@ class FleetMovement(object):
                                                                        self.destination_name, self.destination_coords,
                                                                        self.countdown_time)
 
-    def get_count_down_time(self, arrival_time):
-        game_time = self.general_client.get_game_datetime()
-        return arrival_time - game_time
-
 
 class PlayerState(Enum):
     Active = 1
@@ -0,0 +1,162 @@
+"""
+Game session shared by the scrapers of a browser and by the bot processes that use the same cookies file.
+The stored cookies are trusted until a page shows that the session is over: the game pages redirect to
+the login page. Then the bot logs in again, unless another process already did it and saved the new
+cookies. The cookies file is locked while it is read or written, so parallel runs don't corrupt it
+"""
+import errno
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import util
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, the lock is a file created exclusively next to the cookies file
+    fcntl = None
+
+# Part of the url of every game page, the pages of a session that is over redirect outside of it
+GAME_URL_PATH = '/game/'
+LOCK_POLL_INTERVAL = 0.1
+STALE_LOCK_TIME = 120
+
+
+@contextmanager
+def locked_file(path, exclusive=True):
+    """
+    Hold a lock on the file while the with block runs, the lock is on a separate file that is never replaced
+    :param exclusive: Exclusive lock to write the file, shared lock to read it
+    """
+    lock_path = path + '.lock'
+    if fcntl is not None:
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+                # The lock of a process that died holding it
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_TIME:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    pass
+                time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+
+
+class CookieStore(object):
+    """Cookies file shared by the runs that use the same account"""
+
+    def __init__(self, cookie_jar, path):
+        self.cookie_jar = cookie_jar
+        self.path = path
+        # Modification time of the file when it was last loaded or saved by this process
+        self.modified_time = None
+
+    def get_modified_time(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def load(self):
+        with locked_file(self.path, exclusive=False):
+            self.load_unlocked()
+
+    def load_unlocked(self):
+        self.cookie_jar.load(self.path, ignore_discard=True)
+        self.modified_time = self.get_modified_time()
+
+    def save_unlocked(self):
+        # Written to a temporary file and renamed, the readers never see a half written file
+        temporary_path = self.path + '.tmp'
+        self.cookie_jar.save(temporary_path, ignore_discard=True)
+        if os.name == 'nt' and os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temporary_path, self.path)
+        self.modified_time = self.get_modified_time()
+
+    def changed_since_load(self):
+        """:return: True if other process saved the file after this one loaded or saved it"""
+        modified_time = self.get_modified_time()
+        return modified_time is not None and modified_time != self.modified_time
+
+
+class Session(object):
+    def __init__(self, cookie_store, login):
+        """
+        :param cookie_store: CookieStore of the session
+        :param login: Function without arguments that logs in, the cookies are saved after it
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.cookie_store = cookie_store
+        self.login = login
+        # Incremented on every login, the scrapers that saw a logout at the same time only log in once
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def is_logged_out(self, url, response):
+        """
+        :return: True if the request of a game page was redirected out of the game, to the login page.
+        The requests of the login itself are not checked, they are the ones that log in
+        """
+        if getattr(self.local, 'logging_in', False):
+            return False
+        return GAME_URL_PATH in url and GAME_URL_PATH not in (response.geturl() or '')
+
+    def start(self):
+        """Restore the stored session without checking it, or log in if there is none"""
+        if self.cookie_store.exists():
+            self.logger.info('Found stored cookies, the session is checked on the first page')
+            self.cookie_store.load()
+        else:
+            self.renew(self.generation)
+
+    def renew(self, generation):
+        """
+        Log in again after a logout
+        :param generation: Generation of the session when the logout was seen
+        """
+        with self.lock:
+            if generation != self.generation:
+                # Other scraper logged in already
+                return
+            with locked_file(self.cookie_store.path):
+                if self.cookie_store.changed_since_load():
+                    self.logger.info('Using the session saved by another run')
+                    self.cookie_store.load_unlocked()
+                else:
+                    self.local.logging_in = True
+                    try:
+                        self.login()
+                    finally:
+                        self.local.logging_in = False
+                    self.logger.info('Saving authentication data')
+                    self.cookie_store.save_unlocked()
+            self.generation += 1
+
+
+def get_session(browser):
+    """:return: Session of the browser, None if it isn't authenticated by an AuthenticationProvider"""
+    return util.get_shared_object(browser, 'session', lambda: None)
@@ -0,0 +1,99 @@
+"""
+Fleet slot allocator shared by every mission of the session. The used and total slots are learned from
+the fleet pages the dispatches load anyway, and the time each slot frees up from the return flights
+of the event list, so a dispatcher that finds every slot in use can wait exactly until one is free
+"""
+import bisect
+import logging
+import threading
+import time
+
+import util
+
+# Seconds waited after a fleet returns, the slot is not free in the fleet page at the exact second
+RELEASE_MARGIN = 2
+
+
+class FleetSlotAllocator(object):
+    def __init__(self, clock=time.time):
+        self.logger = logging.getLogger('OGBot')
+        self.clock = clock
+        self.used_slots = None
+        self.total_slots = None
+        # Local times when the fleets in flight return, sorted
+        self.release_times = []
+        self.lock = threading.Lock()
+
+    def observe_usage(self, used_slots, total_slots):
+        """Update the slot usage read from a fleet page"""
+        with self.lock:
+            self.used_slots, self.total_slots = used_slots, total_slots
+            self.discard_past_releases()
+
+    def observe_movements(self, movements):
+        """
+        Learn when the slots free up from the fleet movements of the event list
+        :param movements: All the movements of the event list, with their countdown time
+        """
+        now = self.clock()
+        release_times = sorted(now + movement.countdown_time.total_seconds() for movement in movements
+                               if movement.friendly and movement.return_flight and movement.countdown_time is not None)
+        with self.lock:
+            self.release_times = release_times
+            self.discard_past_releases()
+
+    def discard_past_releases(self):
+        del self.release_times[:bisect.bisect_right(self.release_times, self.clock())]
+
+    def has_free_slot(self):
+        """:return: True if there is a free slot or the usage is unknown"""
+        with self.lock:
+            return self.used_slots is None or self.used_slots < self.total_slots
+
+    def reserve(self):
+        """Count a fleet that was just sent"""
+        with self.lock:
+            if self.used_slots is not None:
+                self.used_slots += 1
+
+    def get_free_slots(self):
+        """:return: Number of free slots, None if the usage is unknown"""
+        with self.lock:
+            if self.used_slots is None:
+                return None
+            return max(self.total_slots - self.used_slots, 0)
+
+    def get_wait_time(self):
+        """
+        :return: Seconds until a slot is free, 0 if there is one already, None if no return flight is known
+        """
+        with self.lock:
+            if self.used_slots is None or self.used_slots < self.total_slots:
+                return 0
+            self.discard_past_releases()
+            if not self.release_times:
+                return None
+            return self.release_times[0] - self.clock() + RELEASE_MARGIN
+
+    def wait_for_free_slot(self, read_movements, fallback_delay, sleep):
+        """
+        Wait until a fleet returns and frees up a slot
+        :param read_movements: Function without arguments that reads the event list, called if no return
+        flight is known. The movement scraper passes the movements to observe_movements
+        :param fallback_delay: Seconds to wait if there isn't any return flight in the event list
+        :param sleep: Function that sleeps the given seconds
+        """
+        wait_time = self.get_wait_time()
+        if wait_time is None:
+            read_movements()
+            wait_time = self.get_wait_time()
+        if wait_time is None:
+            wait_time = fallback_delay
+        if wait_time > 0:
+            self.logger.info("Waiting %d seconds for a fleet to return and free up a slot" % wait_time)
+            sleep(wait_time)
+
+
+def get_slot_allocator(browser):
+    """Get the slot allocator shared by all the scrapers of the session"""
+    return util.get_shared_object(browser, 'fleet_slots', FleetSlotAllocator)
@@ -0,0 +1,64 @@
+import util
+
+
+class PageSnapshot(object):
+    """
+    Page of a planet parsed once. Each value read from it is extracted the first time it is requested
+    and kept, so the scraper methods that read the same page share a single download and parse.
+    The values are shared by all the callers, treat them as read only
+    """
+
+    def __init__(self, page, markup, parse):
+        """
+        :param page: Page name (i.e.: 'resources')
+        :param markup: Html of the page
+        :param parse: Function that builds the parse tree of the markup
+        """
+        self.page = page
+        self.markup = markup
+        self.parse = parse
+        self.parsed = None
+        self.values = {}
+
+    @property
+    def document(self):
+        if self.parsed is None:
+            self.parsed = self.parse(self.markup)
+        return self.parsed
+
+    def get(self, name, extractor):
+        """
+        :param name: Name of the value
+        :param extractor: Function that reads the value from the parse tree of the page
+        :return: The value, extracted on the first call
+        """
+        if name not in self.values:
+            self.values[name] = extractor(self.document)
+        return self.values[name]
+
+
+class SnapshotStore(object):
+    """Latest snapshot of each page and planet, shared by all the scrapers of a browser"""
+
+    def __init__(self):
+        self.snapshots = {}
+
+    def get(self, url, markup, parse):
+        """
+        :param url: Url the page was downloaded from
+        :param markup: Html of the page
+        :param parse: Function that builds the parse tree of the markup
+        :return: The snapshot of the page, a new one if the html changed since the last snapshot
+        """
+        key = util.parse_page_url(url)
+        snapshot = self.snapshots.get(key)
+        # The page cache hands back the same string until the page expires or a form of the planet is
+        # submitted, a page downloaded again is compared to know if it changed
+        if snapshot is None or (snapshot.markup is not markup and snapshot.markup != markup):
+            snapshot = self.snapshots[key] = PageSnapshot(key[0], markup, parse)
+        return snapshot
+
+
+def get_snapshot_store(browser):
+    """Get the snapshot store shared by all the scrapers that use the browser"""
+    return util.get_shared_object(browser, 'page_snapshots', SnapshotStore)
@@ -0,0 +1,192 @@
+import httplib
+import logging
+import socket
+import threading
+import urllib2
+import urlparse
+import zlib
+import Queue
+
+import recorder
+import util
+
+# Http status codes that are followed as redirects
+REDIRECT_CODES = (301, 302, 303, 307)
+MAX_REDIRECTS = 5
+
+
+class Response(object):
+    """Response of a transport, has the same reading interface as the mechanize responses"""
+
+    def __init__(self, data, url, code=200, headers=None):
+        self.data = data
+        self.url = url
+        self.code = code
+        self.headers = headers
+
+    def read(self):
+        return self.data
+
+    def get_data(self):
+        return self.data
+
+    def geturl(self):
+        return self.url
+
+    def info(self):
+        return self.headers
+
+
+class MechanizeTransport(object):
+    """Sends the requests through the mechanize browser, the browser ends up on the requested page"""
+
+    def __init__(self, browser):
+        self.browser = browser
+
+    def open(self, url, data=None, timeout=None):
+        return self.browser.open(url, data, timeout)
+
+
+class PooledTransport(object):
+    """
+    HTTP/1.1 transport that keeps the connections alive and reuses them, with a bounded pool of
+    connections per host. Responses are requested and decoded with gzip/deflate.
+    The cookies are read from and stored in the cookie jar of the game session.
+    """
+
+    def __init__(self, cookie_jar, headers, pool_size=4):
+        """
+        :param cookie_jar: Cookie jar of the session
+        :param headers: List of (name, value) headers sent with every request
+        :param pool_size: Maximum number of open connections per host
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.cookie_jar = cookie_jar
+        self.headers = list(headers) + [('Accept-Encoding', 'gzip, deflate'), ('Connection', 'keep-alive')]
+        self.pool_size = pool_size
+        self.pools = {}
+        self.pools_lock = threading.Lock()
+
+        # Statistics, used to compare the transport with the mechanize one
+        self.connections_opened = 0
+        self.requests_sent = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+
+    def open(self, url, data=None, timeout=None):
+        """
+        Send a GET request, or a POST request if there is data, following the redirects
+        :return: Response object
+        :raise urllib2.HTTPError: if the server answers with an error status
+        :raise urllib2.URLError: if the server can't be reached
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            request = urllib2.Request(url, data, dict(self.headers))
+            self.cookie_jar.add_cookie_header(request)
+            response, body = self.send(request, timeout)
+            self.cookie_jar.extract_cookies(Response(body, url, response.status, response.msg), request)
+
+            if response.status in REDIRECT_CODES and response.getheader('location'):
+                url = urlparse.urljoin(url, response.getheader('location'))
+                data = None
+                continue
+
+            body = self.decode(body, response.getheader('content-encoding'))
+            if response.status >= 400:
+                raise urllib2.HTTPError(url, response.status, response.reason, response.msg, None)
+            return Response(body, url, response.status, response.msg)
+
+        raise urllib2.URLError("Too many redirects opening %s" % url)
+
+    def send(self, request, timeout):
+        """
+        Send the request on a pooled connection
+        :return: tuple with the httplib response and its raw body
+        """
+        scheme, host = request.get_type(), request.get_host()
+        idle_connections = self.get_pool(scheme, host)
+        method = 'POST' if request.has_data() else 'GET'
+        headers = dict(request.header_items())
+        if request.has_data():
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        connection = idle_connections.get()
+        try:
+            # A reused connection may have been closed by the server, in that case try once more with a new one
+            for attempt in range(2):
+                if connection is None:
+                    connection = self.create_connection(scheme, host, timeout)
+                    reused = False
+                else:
+                    reused = True
+                try:
+                    connection.request(method, request.get_selector(), request.get_data(), headers)
+                    response = connection.getresponse()
+                    body = response.read()
+                except (httplib.HTTPException, socket.error) as e:
+                    connection.close()
+                    connection = None
+                    if reused and attempt == 0:
+                        continue
+                    raise urllib2.URLError(e)
+
+                self.requests_sent += 1
+                self.bytes_received += len(body)
+                if response.will_close:
+                    connection.close()
+                    connection = None
+                return response, body
+        finally:
+            idle_connections.put(connection)
+
+    def get_pool(self, scheme, host):
+        """Get the queue of idle connections of the host, None items are free slots for new connections"""
+        with self.pools_lock:
+            if (scheme, host) not in self.pools:
+                idle_connections = Queue.LifoQueue()
+                for _ in range(self.pool_size):
+                    idle_connections.put(None)
+                self.pools[(scheme, host)] = idle_connections
+            return self.pools[(scheme, host)]
+
+    def create_connection(self, scheme, host, timeout):
+        self.connections_opened += 1
+        self.logger.debug("Opening a new connection to %s" % host)
+        if scheme == 'https':
+            return httplib.HTTPSConnection(host, timeout=timeout)
+        return httplib.HTTPConnection(host, timeout=timeout)
+
+    def decode(self, body, content_encoding):
+        """
+        :raise urllib2.URLError: if the body is corrupt or truncated, so the request is retried
+        """
+        try:
+            if content_encoding == 'gzip':
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            elif content_encoding == 'deflate':
+                try:
+                    body = zlib.decompress(body)
+                except zlib.error:
+                    # Some servers send raw deflate data without the zlib header
+                    body = zlib.decompress(body, -zlib.MAX_WBITS)
+        except zlib.error as e:
+            raise urllib2.URLError("Unable to decode the %s response: %s" % (content_encoding, e))
+        self.bytes_decoded += len(body)
+        return body
+
+
+def get_transport(browser, config):
+    """
+    Get the transport used for the requests that don't need the browser to end up on the page.
+    The pooled transport is shared by all the browsers of the session.
+    Recorded and replayed sessions always use the browser, that is where the archive is plugged in
+    """
+    if config.http_transport != 'pooled' or recorder.get_session_archive(browser) is not None:
+        return MechanizeTransport(browser)
+
+    cookie_jar = util.get_shared_object(browser, 'cookie_jar', lambda: None)
+    if cookie_jar is None:
+        return MechanizeTransport(browser)
+
+    return util.get_shared_object(browser, 'pooled_transport',
+                                  lambda: PooledTransport(cookie_jar, browser.addheaders, config.http_pool_size))
@@ -0,0 +1,166 @@
+"""
+Persistent map of the universe. Player states and ranks change slowly, so the planets of each system
+are kept in a local SQLite database and a system is only scanned again once its data is older than
+the configured staleness
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+import galaxy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS systems (
+    galaxy INTEGER NOT NULL,
+    system INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (galaxy, system)
+);
+CREATE TABLE IF NOT EXISTS planets (
+    galaxy INTEGER NOT NULL,
+    system INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    player_state INTEGER NOT NULL,
+    player_rank INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (galaxy, system, position)
+);
+CREATE INDEX IF NOT EXISTS planets_player ON planets (player_name);
+"""
+
+_maps = {}
+_maps_lock = threading.Lock()
+
+
+class UniverseMap(object):
+    def __init__(self, path, clock=time.time):
+        """
+        :param path: Path of the database file, ':memory:' keeps the map only while the process runs
+        :param clock: Function that returns the current time in seconds
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.path = path
+        self.clock = clock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def get_stale_systems(self, systems, staleness):
+        """
+        :param systems: list of (galaxy, system) tuples
+        :param staleness: Age in seconds after which the data of a system is stale
+        :return: list with the systems that were never seen or are stale, the oldest first
+        """
+        with self.lock:
+            last_seen = dict(((str(galaxy_number), str(system)), seen) for galaxy_number, system, seen
+                             in self.connection.execute("SELECT galaxy, system, last_seen FROM systems"))
+
+        oldest_fresh_time = self.clock() - staleness
+        stale_systems = [system for system in systems
+                         if system not in last_seen or last_seen[system] < oldest_fresh_time]
+        # The systems that were never seen go first
+        return sorted(stale_systems, key=lambda system: last_seen.get(system))
+
+    def update_system(self, galaxy_number, system, planets):
+        """Replace the planets of the system with the ones just scanned"""
+        now = self.clock()
+        rows = [(galaxy_number, system, int(planet.coordinates.split(':')[2]), planet.name, planet.player_name,
+                 int(planet.player_state), planet.player_rank, now) for planet in planets]
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM planets WHERE galaxy = ? AND system = ?", (galaxy_number, system))
+            self.connection.executemany("INSERT INTO planets VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.execute("INSERT OR REPLACE INTO systems VALUES (?, ?, ?)", (galaxy_number, system, now))
+
+    def get_planets(self, galaxy_number, system, planet_filter=None):
+        """
+        Get the planets of the system stored in the map
+        :param planet_filter: PlanetFilter the planets must match, all the planets are returned if None
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT position, name, player_name, player_state, player_rank "
+                                           "FROM planets WHERE galaxy = ? AND system = ? ORDER BY position",
+                                           (galaxy_number, system)).fetchall()
+
+        planets = []
+        for position, name, player_name, player_state, player_rank in rows:
+            if planet_filter is not None and not (planet_filter.accepts_state(player_state)
+                                                  and planet_filter.accepts_rank(player_rank)):
+                continue
+            coordinates = ":".join([str(galaxy_number), str(system), str(position)])
+            planets.append(galaxy.Planet(name, coordinates, player_name, player_state, player_rank))
+        return planets
+
+
+class GalaxyScanner(object):
+    """Serves the planets of the systems from the map, refreshing the stale systems within a budget"""
+
+    def __init__(self, galaxy_client, universe_map, staleness, refresh_budget):
+        """
+        :param galaxy_client: Galaxy scraper used to scan the stale systems
+        :param universe_map: UniverseMap where the scanned systems are stored
+        :param staleness: Age in seconds after which a system is scanned again
+        :param refresh_budget: Maximum number of systems scanned on each run (see start_run), None for no limit
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.galaxy_client = galaxy_client
+        self.universe_map = universe_map
+        self.staleness = staleness
+        self.refresh_budget = refresh_budget
+        # Systems that can still be scanned in the current run
+        self.remaining_budget = refresh_budget
+        self.lock = threading.Lock()
+
+    def start_run(self):
+        """Start a new run of the mode, the whole refresh budget is available again"""
+        with self.lock:
+            self.remaining_budget = self.refresh_budget
+
+    def get_planets_in_systems(self, systems, planet_filter=None, galaxy_client=None):
+        """
+        Get planets in the given systems, like Galaxy.get_planets_in_systems
+        :param systems: list of (galaxy, system) tuples
+        :param planet_filter: PlanetFilter the planets must match, all the planets are returned if None
+        :param galaxy_client: Galaxy scraper used for the scan instead of the one of the scanner,
+        to scan from other threads
+        :return: list with the planets of each system, in the same order as the systems
+        """
+        if galaxy_client is None:
+            galaxy_client = self.galaxy_client
+
+        systems = [(str(galaxy_number), str(system)) for galaxy_number, system in systems]
+        with self.lock:
+            stale_systems = self.universe_map.get_stale_systems(systems, self.staleness)
+            if self.remaining_budget is not None:
+                if len(stale_systems) > self.remaining_budget:
+                    self.logger.info("%d systems are stale, refreshing the %d oldest ones"
+                                     % (len(stale_systems), self.remaining_budget))
+                stale_systems = stale_systems[:self.remaining_budget]
+                self.remaining_budget -= len(stale_systems)
+
+        self.logger.info("Scanning %d of %d systems, the rest are read from the universe map"
+                         % (len(stale_systems), len(systems)))
+        # Every planet is kept in the map, the filter is applied when the map is read
+        scanned_planets = galaxy_client.get_systems(stale_systems)
+        for (galaxy_number, system), planets in zip(stale_systems, scanned_planets):
+            # Keep the old data of the systems that could not be read
+            if planets is not None:
+                self.universe_map.update_system(galaxy_number, system, planets)
+
+        return [self.universe_map.get_planets(galaxy_number, system, planet_filter)
+                for galaxy_number, system in systems]
+
+
+def get_universe_map(path):
+    """Get the map of the database file, shared by all the scrapers of the process"""
+    with _maps_lock:
+        if path not in _maps:
+            _maps[path] = UniverseMap(path)
+        return _maps[path]
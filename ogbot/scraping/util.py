@@ -1,4 +1,43 @@
 import logging
+import threading
+import urlparse
+import weakref
+
+# Objects shared by all the scrapers that use the same browser (i.e. the same game session)
+_shared_objects = weakref.WeakKeyDictionary()
+# The scrapers of the cloned browsers of the pools and the engine get their objects from several threads.
+# Reentrant, the factory of an object may get other shared objects
+_shared_objects_lock = threading.RLock()
+
+
+def get_shared_object(browser, name, factory):
+    """
+    Get an object shared by every scraper that uses the browser, creating it on first use
+    :param browser: Browser the object belongs to
+    :param name: Name of the shared object
+    :param factory: Callable without arguments used to create the object
+    :return: The shared object
+    """
+    with _shared_objects_lock:
+        objects = _shared_objects.setdefault(browser, {})
+        if name not in objects:
+            objects[name] = factory()
+        return objects[name]
+
+
+def set_shared_object(browser, name, value):
+    """Set an object shared by every scraper that uses the browser"""
+    with _shared_objects_lock:
+        _shared_objects.setdefault(browser, {})[name] = value
+
+
+def share_objects(browser, other_browser):
+    """
+    Make the scrapers of other_browser use the same shared objects as the ones of browser,
+    used for extra browsers of the same game session
+    """
+    with _shared_objects_lock:
+        _shared_objects[other_browser] = _shared_objects.setdefault(browser, {})
 
 
 class UrlProvider:
@@ -41,3 +80,15 @@ class UrlProvider:
         Return the main url
         """
         return self.main_url
+
+
+def parse_page_url(url):
+    """
+    Get the page and planet of an ogame url
+    :param url: Url to parse, i.e.: index.php?page=resources&cp=33620229
+    :return: tuple with the page name and the planet link, None for the missing ones
+    """
+    query = urlparse.parse_qs(urlparse.urlparse(url or '').query)
+    page = query.get('page', [None])[0]
+    planet_link = query.get('cp', [None])[0]
+    return page, planet_link
@@ -1,6 +1,3 @@
-from twilio.rest import TwilioRestClient
-
-
 class SMSSender:
 
     def __init__(self, config):
@@ -8,6 +5,8 @@ class SMSSender:
 
     def send_sms(self, message):
         if self.config.enable_twilio_messaging:
+            # Only imported when the messages are enabled, it is slow to import and an optional dependency
+            from twilio.rest import TwilioRestClient
             twilio_client = TwilioRestClient(self.config.twilio_account_sid, self.config.twilio_account_token)
             twilio_client.messages.create(to=self.config.twilio_to_number, from_=self.config.twilio_from_number,
                                           body=message)
\ No newline at end of file
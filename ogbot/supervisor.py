@@ -0,0 +1,111 @@
+"""
+Supervisor of the profiles of user.cfg. Every profile, an account in a universe, runs in its own worker
+process with its own cookies and state directory. The request rates of user.cfg are the budget of the
+whole install and they are split between the workers. The log lines of the workers are written to the
+output of the supervisor with the name of the profile, and their metrics are added up in one summary
+"""
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+from scraping import metrics
+
+
+class Worker(object):
+    def __init__(self, profile, process, metrics_path):
+        self.profile = profile
+        self.process = process
+        self.metrics_path = metrics_path
+
+
+class Supervisor(object):
+    def __init__(self, config, main_path, args):
+        """
+        :param config: Config of the supervisor
+        :param main_path: Absolute path of main.py, the workers run it with --profile
+        :param args: Parsed arguments of the supervisor, the mode, range, planet and daemon ones are passed on
+        """
+        self.logger = logging.getLogger('OGBot')
+        self.config = config
+        self.main_path = main_path
+        self.args = args
+        self.workers = []
+        self.output_lock = threading.Lock()
+
+    def get_worker_command(self, profile, rate_share, metrics_path):
+        command = [sys.executable, self.main_path, '--profile', profile, '--rate-share', repr(rate_share),
+                   '--metrics', metrics_path]
+        if self.args.m:
+            command += ['-m'] + self.args.m
+        if self.args.r:
+            command += ['-r', self.args.r]
+        if self.args.p:
+            command += ['-p', self.args.p]
+        if self.args.daemon:
+            command.append('--daemon')
+        return command
+
+    def pump_output(self, worker):
+        """Write the lines of the worker to the output of the supervisor, the workers log the name of their profile"""
+        for line in iter(worker.process.stdout.readline, ''):
+            with self.output_lock:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+
+    def run(self):
+        """
+        Start a worker for each profile and wait for all of them
+        :return: True if every worker finished successfully
+        """
+        profiles = self.config.profiles
+        if not profiles:
+            self.logger.error("There are no [Profile <name>] sections in user.cfg")
+            return False
+
+        # Every worker gets the same share of the request rates
+        rate_share = 1.0 / len(profiles)
+        metrics_directory = tempfile.mkdtemp(prefix='ogbot-metrics-')
+        pumps = []
+        try:
+            for profile in profiles:
+                metrics_path = os.path.join(metrics_directory, '%d.json' % len(self.workers))
+                self.logger.info("Starting the worker of profile %s" % profile)
+                process = subprocess.Popen(self.get_worker_command(profile, rate_share, metrics_path),
+                                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                worker = Worker(profile, process, metrics_path)
+                self.workers.append(worker)
+                pump = threading.Thread(target=self.pump_output, args=(worker,), name="pump-%s" % profile)
+                pump.daemon = True
+                pump.start()
+                pumps.append(pump)
+
+            succeeded = True
+            for worker in self.workers:
+                return_code = worker.process.wait()
+                if return_code != 0:
+                    succeeded = False
+                    self.logger.error("The worker of profile %s exited with code %d" % (worker.profile, return_code))
+            for pump in pumps:
+                pump.join()
+
+            for worker in self.workers:
+                if os.path.isfile(worker.metrics_path):
+                    metrics.load(worker.metrics_path)
+            self.logger.info("Metrics of all the profiles:")
+            metrics.log_summary()
+            return succeeded
+        finally:
+            self.stop()
+            shutil.rmtree(metrics_directory, ignore_errors=True)
+
+    def stop(self):
+        """Terminate the workers that are still running"""
+        for worker in self.workers:
+            if worker.process.poll() is None:
+                self.logger.info("Stopping the worker of profile %s" % worker.profile)
+                worker.process.terminate()
+                worker.process.wait()
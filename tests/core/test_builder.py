@@ -2,7 +2,7 @@ import unittest
 from mock import Mock
 
 from ogbot.core import builder
-from ogbot.scraping import buildings
+from ogbot.scraping import catalog
 
 
 class TestBuilder(unittest.TestCase):
@@ -12,11 +12,11 @@ class TestBuilder(unittest.TestCase):
         self.config_mock3 = Mock(build_solar_plant=False, build_fusion_reactor=False, build_storage=False)
 
         self.available_buildings_stub = []
-        self.available_buildings_stub.append(buildings.BUILDINGS_DATA.get('sp'))
-        self.available_buildings_stub.append(buildings.BUILDINGS_DATA.get('fr'))
-        self.available_buildings_stub.append(buildings.BUILDINGS_DATA.get('cs'))
-        self.available_buildings_stub.append(buildings.BUILDINGS_DATA.get('ms'))
-        self.available_buildings_stub.append(buildings.BUILDINGS_DATA.get('dt'))
+        self.available_buildings_stub.append(catalog.BUILDINGS.get('sp'))
+        self.available_buildings_stub.append(catalog.BUILDINGS.get('fr'))
+        self.available_buildings_stub.append(catalog.BUILDINGS.get('cs'))
+        self.available_buildings_stub.append(catalog.BUILDINGS.get('ms'))
+        self.available_buildings_stub.append(catalog.BUILDINGS.get('dt'))
 
     def test_filter_available_buildings(self):
         self.setup_test_filter_available_buildings()
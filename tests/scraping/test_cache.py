@@ -0,0 +1,33 @@
+import unittest
+
+from ogbot.scraping import cache
+
+RESOURCES_URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=resources&cp=1"
+OTHER_PLANET_URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=resources&cp=2"
+MESSAGES_URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=messages"
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.page_cache = cache.PageCache({'defense': 0})
+
+    def test_get_cached_page(self):
+        self.assertIsNone(self.page_cache.get(RESOURCES_URL))
+        self.page_cache.put(RESOURCES_URL, None, "resources page")
+        self.assertEquals(self.page_cache.get(RESOURCES_URL).read(), "resources page")
+        self.assertIsNone(self.page_cache.get(RESOURCES_URL, "data=1"))
+        self.assertIsNone(self.page_cache.get(OTHER_PLANET_URL))
+
+    def test_pages_without_ttl_are_not_cached(self):
+        self.page_cache.put(MESSAGES_URL, None, "messages page")
+        self.page_cache.put(RESOURCES_URL.replace('resources', 'defense'), None, "defense page")
+        self.assertEquals(len(self.page_cache.entries), 0)
+
+    def test_invalidate_planet(self):
+        self.page_cache.put(RESOURCES_URL, None, "resources page")
+        self.page_cache.put(OTHER_PLANET_URL, None, "resources page")
+        self.page_cache.invalidate("1")
+        self.assertIsNone(self.page_cache.get(RESOURCES_URL))
+        self.assertIsNotNone(self.page_cache.get(OTHER_PLANET_URL))
+        self.page_cache.invalidate()
+        self.assertIsNone(self.page_cache.get(OTHER_PLANET_URL))
@@ -0,0 +1,34 @@
+import unittest
+
+from ogbot.scraping import catalog, scraper
+
+
+class FakeClient(object):
+    def __init__(self, browser, config):
+        self.browser = browser
+        self.config = config
+
+
+class FakeBrowser(object):
+    pass
+
+
+class TestCatalog(unittest.TestCase):
+    def test_items_by_id_and_code(self):
+        light_fighter = catalog.SHIPS.get('lf')
+        self.assertEquals(light_fighter.id, 204)
+        self.assertIs(catalog.SHIPS.get(204), light_fighter)
+        self.assertIs(catalog.SHIPS.get('204'), light_fighter)
+        self.assertIsNone(catalog.SHIPS.get('999'))
+        self.assertIsNone(catalog.SHIPS.get('xx'))
+
+    def test_metal_storage_id(self):
+        self.assertEquals(catalog.BUILDINGS.get('22').name, "Metal Storage")
+        self.assertIs(catalog.BUILDINGS.get('ms'), catalog.BUILDINGS.get(22))
+        self.assertNotIn('102', catalog.BUILDINGS)
+
+    def test_clients_are_shared_per_browser(self):
+        browser, other_browser = FakeBrowser(), FakeBrowser()
+        client = scraper.get_client(FakeClient, browser, None)
+        self.assertIs(scraper.get_client(FakeClient, browser, None), client)
+        self.assertIsNot(scraper.get_client(FakeClient, other_browser, None), client)
@@ -0,0 +1,34 @@
+import datetime
+import unittest
+
+from ogbot.scraping import clock
+
+OVERVIEW = '<ul><li class="OGameClock">03.04.2016 <span>00:25:13</span></li></ul>'
+
+
+class TestGameClock(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000000.0
+        self.game_clock = clock.GameClock(60, clock=lambda: self.now)
+
+    def test_now(self):
+        self.assertTrue(self.game_clock.is_stale())
+        self.assertTrue(self.game_clock.observe_markup(OVERVIEW))
+        self.now += 30.5
+        self.assertFalse(self.game_clock.is_stale())
+        self.assertEquals(self.game_clock.now(), datetime.datetime(2016, 4, 3, 0, 25, 43, 500000))
+        self.assertFalse(self.game_clock.observe_markup('{"galaxy": ""}'))
+
+    def test_synchronize_when_stale(self):
+        synchronizations = []
+
+        def synchronize():
+            synchronizations.append(self.now)
+            self.game_clock.observe(datetime.datetime(2016, 4, 3, 0, 0, 0))
+
+        self.game_clock.now(synchronize)
+        self.now += 50
+        self.game_clock.now(synchronize)
+        self.now += 20
+        self.assertEquals(self.game_clock.now(synchronize), datetime.datetime(2016, 4, 3, 0, 0, 0))
+        self.assertEquals(len(synchronizations), 2)
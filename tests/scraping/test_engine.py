@@ -0,0 +1,42 @@
+import threading
+import unittest
+
+from ogbot.scraping import engine
+
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = engine.Engine(None, None, 2)
+
+    def test_gather(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocked():
+            started.set()
+            release.wait(5)
+            return 'blocked'
+
+        first = self.engine.submit('blocked', blocked)
+        started.wait(5)
+        # The second worker runs while the first one is blocked
+        second = self.engine.submit('double', lambda value: value * 2, 21)
+        self.assertEquals(second.result(5), 42)
+        self.assertFalse(first.done())
+        release.set()
+        self.assertEquals(engine.Engine.gather([first, second]), ['blocked', 42])
+
+    def test_error(self):
+        task = self.engine.submit('error', lambda: {}['missing'])
+        self.assertRaises(KeyError, task.result, 5)
+
+    def test_prefetcher(self):
+        prefetcher = engine.Prefetcher(self.engine)
+        self.engine.get_scraper = lambda scraper_class: scraper_class()
+        first = prefetcher.add(list, lambda scraper, value: value, 1)
+        second = prefetcher.add(list, lambda scraper, value: value, 2)
+        self.assertEquals(first.result(5), 1)
+        self.assertIsNone(second.task)
+        prefetcher.sleep(0, 'test')
+        self.assertEquals(second.result(5), 2)
+        self.assertEquals(len(prefetcher.queued), 0)
@@ -0,0 +1,39 @@
+import unittest
+
+from ogbot.scraping import parsing, scraper
+from ogbot.scraping.galaxy import Galaxy, PlanetFilter
+
+GALAXY_TABLE = '<table id="galaxytable"><tr class="row empty_filter"><td class="position">4</td></tr>%s</table>'
+
+ROW = '''<tr class="row"><td class="position">%d</td><td class="planetname">Colony</td>
+<td class="playername %s"><div class="htmlTooltip">
+<h1>Player: <span>%s</span></h1>
+<ul class="ListLinks"><li class="rank">Ranking: <a href="#">%s</a></li></ul>
+</div></td></tr>'''
+
+
+class TestGalaxy(unittest.TestCase):
+    def test_get_player_ranks(self):
+        document = parsing.Parser().parse(GALAXY_TABLE % "".join([ROW % (1, "", "Anna", "12"),
+                                                                  ROW % (2, "", "Ann", "340"),
+                                                                  ROW % (3, "", "Bob", "")]))
+        self.assertEquals(Galaxy.get_player_ranks(document), {'Anna': 12, 'Ann': 340, 'Bob': -1})
+
+    def test_parse_planets_with_filter(self):
+        rows = "".join([ROW % (1, "longinactive", "Anna", "12"),
+                        ROW % (2, "", "Bob", "20"),
+                        ROW % (3, "longinactive", "Ann", "340")])
+        inactive_filter = PlanetFilter([scraper.PlayerState.Inactive], 10, 100)
+        for backend in parsing.BACKENDS:
+            document = parsing.Parser(backend).parse(GALAXY_TABLE % rows)
+            planets = Galaxy.parse_planets(document, "1", "100", inactive_filter)
+            self.assertEquals([(planet.coordinates, planet.player_name, planet.player_rank) for planet in planets],
+                              [("1:100:1", "Anna", 12)])
+            self.assertEquals(len(Galaxy.parse_planets(document, "1", "100")), 3)
+
+    def test_get_galaxy_html(self):
+        content = '{"galaxy":"<td class=\\"planetname\\">Base \\"Alpha\\" K\\u00f6nigsberg Timbuktu<\\/td>","success":true}'
+        self.assertEquals(Galaxy.get_galaxy_html(content),
+                          '<td class="planetname">Base "Alpha" K\xc3\xb6nigsberg Timbuktu</td>')
+        self.assertIsNone(Galaxy.get_galaxy_html('<html>Your session has expired</html>'))
+        self.assertIsNone(Galaxy.get_galaxy_html('{"success":false}'))
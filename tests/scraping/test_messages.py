@@ -1,7 +1,45 @@
+import logging
 import unittest
 import datetime
 
-from ogbot.scraping import messages
+from mock import Mock
+
+from ogbot.scraping import messages, parsing, reportstore, scraper, util
+
+PAGINATION = '<ul class="pagination"><li class="curPage">1/%d</li></ul>'
+
+
+def make_report(message_id, player_state=scraper.PlayerState.Inactive):
+    """Report of the message, the newer the message the newer the report"""
+    return messages.SpyReport("Colony", "Anna", player_state, "1:100:%d" % message_id,
+                              scraper.Resources(1000, 500, 0), 0, 0, .5,
+                              datetime.datetime(2016, 4, 3, 0, message_id, 0), message_id)
+
+
+class PagedMessages(messages.Messages):
+    """Messages scraper that reads the reports of each page of the espionage tab from a list"""
+
+    def __init__(self, pages, concurrency, store):
+        self.logger = logging.getLogger('OGBot')
+        self.config = Mock(spy_report_fetch_concurrency=concurrency)
+        self.url_provider = util.UrlProvider('1', 'en')
+        self.parser = parsing.Parser()
+        self.pages = pages
+        self.store = store
+        self.batches = []
+
+    def open_url(self, url, data=None, navigate=False, use_cache=True):
+        return Mock(read=lambda: PAGINATION % len(self.pages))
+
+    def parse_spy_reports(self, document):
+        return self.pages[0]
+
+    def get_spy_reports_pages(self, page_numbers):
+        self.batches.append(page_numbers)
+        return [self.pages[page_number - 1] for page_number in page_numbers]
+
+    def get_spy_report_store(self):
+        return self.store
 
 
 class TestMessages(unittest.TestCase):
@@ -24,3 +62,51 @@ class TestMessages(unittest.TestCase):
                           datetime.datetime(2016, 4, 2, 23, 38, 23))
         self.assertEquals(messages.parse_report_datetime("02.04.2016 23:38:20"),
                           datetime.datetime(2016, 4, 2, 23, 38, 20))
+
+
+class TestSpyReportsPagination(unittest.TestCase):
+    def setUp(self):
+        self.store = reportstore.SpyReportStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def get_spy_reports(self, pages, concurrency, oldest_datetime=None):
+        """:return: The scraper and the ids of the reports it stored, in the order they were stored"""
+        messages_client = PagedMessages(pages, concurrency, self.store)
+        self.store.add = Mock(side_effect=self.store.add)
+        messages_client.get_spy_reports(oldest_datetime)
+        return messages_client, [report.message_id for call in self.store.add.call_args_list for report in call[0][0]]
+
+    def test_pages_are_read_in_batches_until_a_known_report(self):
+        self.store.add([make_report(46)])
+        pages = [[make_report(50), make_report(49)], [make_report(48)], [make_report(47)],
+                 [make_report(46), make_report(45)], [make_report(44)], [make_report(43)]]
+
+        messages_client, added = self.get_spy_reports(pages, 2)
+
+        self.assertEquals(messages_client.batches, [[2, 3], [4, 5]])
+        # The reports are taken in the order of the pages, the ones of the page after the known one are not
+        self.assertEquals(added, [50, 49, 48, 47])
+
+    def test_stop_at_the_high_water_mark(self):
+        self.store.add([make_report(48)])
+        pages = [[make_report(50), make_report(49)], [make_report(48), make_report(47)], [make_report(46)]]
+
+        messages_client, added = self.get_spy_reports(pages, 1)
+        self.assertEquals(messages_client.batches, [[2]])
+        self.assertEquals(added, [50, 49])
+
+        # Nothing arrived since, only the first page is read
+        messages_client, added = self.get_spy_reports(pages, 1)
+        self.assertEquals(messages_client.batches, [])
+        self.assertEquals(added, [])
+
+    def test_stop_at_the_oldest_needed_report(self):
+        pages = [[make_report(50)], [make_report(49)], [make_report(46)], [make_report(45)]]
+
+        messages_client, added = self.get_spy_reports(pages, 1, datetime.datetime(2016, 4, 3, 0, 47, 0))
+
+        self.assertEquals(messages_client.batches, [[2], [3]])
+        # The reports of the page after the break are never stored
+        self.assertEquals(added, [50, 49, 46])
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ogbot.scraping import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = metrics.Histogram(metrics.TIME_BUCKETS)
+        for value in [0.02] * 90 + [3] * 10:
+            histogram.observe(value)
+        self.assertEquals(histogram.percentile(50), 0.05)
+        self.assertEquals(histogram.percentile(95), 3)
+        self.assertAlmostEquals(histogram.mean(), 0.318)
+
+    def test_summary_per_metric_and_key(self):
+        metrics.observe('bytes', 'galaxyContent', 2048)
+        metrics.observe('bytes', 'galaxyContent', 4096)
+        metrics.sleep(0, 'spy_delay')
+
+        summary = metrics.get_summary()
+        self.assertEquals(len(summary), 2)
+        self.assertTrue(summary[0].startswith('bytes    galaxyContent   count:     2'))
+        self.assertTrue(summary[1].startswith('sleep    spy_delay'))
+
+    def test_save_adds_to_stored_metrics(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'metrics.json')
+            metrics.observe('network', 'overview', 0.2)
+            metrics.save(path)
+            metrics.reset()
+            metrics.observe('network', 'overview', 3)
+            metrics.save(path)
+            metrics.reset()
+
+            metrics.load(path)
+            [[metric, key, counts, count, total, maximum]] = metrics.export()
+            self.assertEquals((metric, key, count, maximum), ('network', 'overview', 2, 3))
+            self.assertEquals(sum(counts), 2)
+            self.assertAlmostEquals(total, 3.2)
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,38 @@
+import datetime
+import unittest
+
+from ogbot.scraping.movement import MovementTracker
+from ogbot.scraping.scraper import FleetMovement
+
+
+def make_movement(event_id, arrival_minute, destination="1:100:4"):
+    return FleetMovement("2:200:8", "Enemy", destination, "Colony", False,
+                         datetime.datetime(2016, 4, 3, 0, arrival_minute, 0), None, event_id, 1)
+
+
+class TestMovementTracker(unittest.TestCase):
+    def test_update(self):
+        tracker = MovementTracker()
+        first = make_movement("1", 10)
+        self.assertEquals(tracker.update([first]), [first])
+        self.assertEquals(tracker.update([make_movement("1", 10)]), [])
+
+        second = make_movement("2", 20)
+        delayed = make_movement("1", 15)
+        self.assertEquals(tracker.update([delayed, second]), [delayed, second])
+
+        # A movement that is gone and shows up again is new
+        self.assertEquals(tracker.update([second]), [])
+        self.assertEquals(tracker.update([delayed, second]), [delayed])
+
+    def test_same_arrival_after_midnight(self):
+        tracker = MovementTracker()
+        arrival_text = "01:30:00"
+        before_midnight = FleetMovement("2:200:8", "Enemy", "1:100:4", "Colony", False,
+                                        datetime.datetime(2016, 4, 3, 1, 30, 0), None, "1", 1,
+                                        arrival_time_text=arrival_text)
+        after_midnight = FleetMovement("2:200:8", "Enemy", "1:100:4", "Colony", False,
+                                       datetime.datetime(2016, 4, 4, 1, 30, 0), None, "1", 1,
+                                       arrival_time_text=arrival_text)
+        self.assertEquals(tracker.update([before_midnight]), [before_midnight])
+        self.assertEquals(tracker.update([after_midnight]), [])
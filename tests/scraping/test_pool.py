@@ -0,0 +1,35 @@
+import time
+import unittest
+from mock import Mock
+
+from ogbot.scraping import authentication, pool, util
+
+
+class FakeScraper(object):
+    def __init__(self, browser, config):
+        self.browser = browser
+
+
+class TestScraperPool(unittest.TestCase):
+    def setUp(self):
+        self.browser = authentication.create_browser(Mock())
+        self.scraper_pool = pool.ScraperPool(FakeScraper, self.browser, Mock(), 3)
+
+    def test_map_keeps_order(self):
+        def slow_square(scraper, number):
+            time.sleep(0.01 * (5 - number))
+            return number * number
+
+        self.assertEquals(self.scraper_pool.map(slow_square, range(5)), [0, 1, 4, 9, 16])
+
+    def test_browsers_share_cookies(self):
+        cookie_jars = set(util.get_shared_object(scraper.browser, 'cookie_jar', lambda: None)
+                          for scraper in self.scraper_pool.scrapers)
+        self.assertEquals(len(cookie_jars), 1)
+        self.assertNotIn(self.browser, [scraper.browser for scraper in self.scraper_pool.scrapers])
+
+    def test_map_raises_errors(self):
+        def fail(scraper, number):
+            raise ValueError(number)
+
+        self.assertRaises(ValueError, self.scraper_pool.map, fail, range(5))
@@ -0,0 +1,41 @@
+import unittest
+
+from ogbot.scraping import ratelimit
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = ratelimit.TokenBucket(2, 3, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_does_not_wait(self):
+        self.assertEquals([self.bucket.acquire() for _ in range(3)], [0, 0, 0])
+        self.assertEquals(self.clock.now, 0)
+
+    def test_sustained_rate(self):
+        for _ in range(3 + 10):
+            self.bucket.acquire()
+        self.assertAlmostEquals(self.clock.now, 5)
+
+    def test_tokens_refill(self):
+        for _ in range(3):
+            self.bucket.acquire()
+        self.clock.now += 10
+        self.assertEquals([self.bucket.acquire() for _ in range(3)], [0, 0, 0])
+
+    def test_disabled_bucket(self):
+        bucket = ratelimit.TokenBucket(0, 1, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(10):
+            bucket.acquire()
+        self.assertEquals(self.clock.now, 0)
@@ -0,0 +1,70 @@
+import cookielib
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import mechanize
+
+from ogbot.scraping import authentication, recorder
+
+URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=galaxyContent&ajax=1"
+
+
+class FakeServerHandler(mechanize.BaseHandler):
+    """Answers every request with its number, so each response is different"""
+    handler_order = 200
+
+    def __init__(self):
+        self.requests = 0
+
+    def https_open(self, request):
+        self.requests += 1
+        return mechanize.make_response("response %d \xe9" % self.requests, [('Content-Type', 'text/html')],
+                                       request.get_full_url(), 200, "OK")
+
+
+class TestRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'session.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_and_replay(self):
+        browser = authentication.create_browser(cookielib.LWPCookieJar())
+        browser.add_handler(FakeServerHandler())
+        archive = recorder.SessionArchive(self.path, 'record')
+        recorder.install(browser, archive)
+        recorded = [browser.open(URL, "galaxy=1&system=%d" % system).read() for system in (1, 2, 2)]
+        archive.close()
+
+        browser = authentication.create_browser(cookielib.LWPCookieJar())
+        archive = recorder.SessionArchive(self.path, 'replay')
+        recorder.install(browser, archive)
+        replayed = [browser.open(URL, "galaxy=1&system=%d" % system).read() for system in (1, 2, 2, 2)]
+
+        self.assertEquals(replayed, recorded + [recorded[-1]])
+        self.assertRaises(mechanize.HTTPError, browser.open, URL, "galaxy=1&system=3")
+        self.assertEquals(archive.misses, 1)
+
+    def test_password_is_not_in_the_keys(self):
+        login_data = "login=player&pass=secret&uni=s1-en.ogame.gameforge.com"
+        archive = recorder.SessionArchive(self.path, 'record')
+        archive.record('POST', URL, login_data, 200, "OK", [], "")
+        archive.close()
+
+        with gzip.open(self.path, 'rb') as archive_file:
+            content = archive_file.read()
+        self.assertNotIn(hashlib.sha1(login_data).hexdigest(), content)
+        self.assertNotIn("secret", content)
+
+        archive = recorder.SessionArchive(self.path, 'replay')
+        self.assertEquals(archive.get_key('POST', URL, login_data),
+                          archive.get_key('POST', URL, login_data.replace('secret', 'other')))
+        self.assertIsNotNone(archive.replay('POST', URL, login_data))
+        self.assertNotEquals(archive.get_key('POST', URL, "galaxy=1&system=1"),
+                             archive.get_key('POST', URL, "galaxy=1&system=2"))
@@ -0,0 +1,49 @@
+import datetime
+import unittest
+
+from ogbot.scraping import messages, reportstore, scraper
+
+
+def make_report(coordinates, minute, message_id, player_state=scraper.PlayerState.Inactive):
+    return messages.SpyReport("Colony", "Anna", player_state, coordinates, scraper.Resources(1000, 500, None), 0, 0,
+                              .5, datetime.datetime(2016, 4, 3, 0, minute, 0), message_id)
+
+
+class TestSpyReportStore(unittest.TestCase):
+    def setUp(self):
+        self.store = reportstore.SpyReportStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_high_water_mark(self):
+        report = make_report("1:100:4", 10, 42)
+        self.assertTrue(self.store.is_new(report))
+        self.store.add([report, make_report("1:100:5", 5, 40)])
+        self.assertEquals(self.store.get_newest_message_id(), 42)
+        self.assertFalse(self.store.is_new(report))
+        self.assertTrue(self.store.is_new(make_report("1:100:4", 20, 43)))
+        # Reports without message id are compared by datetime
+        self.assertFalse(self.store.is_new(make_report("1:100:4", 10, None)))
+
+    def test_get_newest_reports(self):
+        self.store.add([make_report("1:100:4", 10, 1), make_report("1:100:4", 30, 3),
+                        make_report("1:100:5", 20, 2, scraper.PlayerState.Active)])
+        # Storing a report twice keeps a single row
+        self.store.add([make_report("1:100:4", 30, 3)])
+
+        reports = self.store.get_newest_reports()
+        self.assertEquals(sorted((report.coordinates, report.message_id) for report in reports),
+                          [("1:100:4", 3), ("1:100:5", 2)])
+        self.assertEquals([report.message_id for report in self.store.get_newest_reports(inactive_only=True)], [3])
+        self.assertEquals(self.store.get_newest_reports(datetime.datetime(2016, 4, 3, 0, 40, 0)), [])
+
+        report = self.store.get_newest_report("1:100:4")
+        self.assertEquals((report.report_datetime, report.resources.metal, report.resources.deuterium),
+                          (datetime.datetime(2016, 4, 3, 0, 30, 0), 1000, None))
+        self.assertEquals(len(self.store.get_player_reports("Anna")), 3)
+
+    def test_newer_active_report_hides_older_inactive_one(self):
+        self.store.add([make_report("1:100:4", 10, 1), make_report("1:100:4", 30, 2, scraper.PlayerState.Active)])
+        self.assertEquals(self.store.get_newest_reports(inactive_only=True), [])
+        self.assertEquals([report.message_id for report in self.store.get_newest_reports()], [2])
@@ -0,0 +1,68 @@
+import socket
+import unittest
+import urllib2
+
+from ogbot.scraping import retry
+
+
+class FailingRequest(object):
+    def __init__(self, errors):
+        self.errors = errors
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "response"
+
+
+def server_error(code=503):
+    return urllib2.HTTPError("url", code, "error", None, None)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.delays = []
+        self.policy = retry.RetryPolicy(attempts=3, jitter=0, breaker=retry.CircuitBreaker(threshold=10),
+                                        sleep=self.delays.append)
+
+    def test_classify(self):
+        self.assertEquals(retry.RetryPolicy.classify(server_error(500)), 'server_error')
+        self.assertEquals(retry.RetryPolicy.classify(server_error(404)), 'client_error')
+        self.assertEquals(retry.RetryPolicy.classify(urllib2.URLError(socket.timeout())), 'timeout')
+        self.assertEquals(retry.RetryPolicy.classify(socket.error()), 'connection')
+
+    def test_retry_until_success(self):
+        request = FailingRequest([server_error(), urllib2.URLError(socket.timeout())])
+        self.assertEquals(self.policy.call('galaxyContent', request), "response")
+        self.assertEquals(request.calls, 3)
+        self.assertEquals(len(self.delays), 2)
+        self.assertEquals(self.delays, [1.0, 2.0])
+        self.assertEquals(self.policy.retries[('galaxyContent', 'server_error')], 1)
+        self.assertEquals(self.policy.retries[('galaxyContent', 'timeout')], 1)
+
+    def test_client_errors_are_not_retried(self):
+        request = FailingRequest([server_error(404)])
+        self.assertRaises(retry.RequestError, self.policy.call, 'messages', request)
+        self.assertEquals(request.calls, 1)
+
+    def test_raise_when_attempts_are_exhausted(self):
+        request = FailingRequest([server_error()] * 3)
+        self.assertRaises(retry.ServerUnavailableError, self.policy.call, 'messages', request)
+        self.assertEquals(request.calls, 3)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_after_consecutive_failures(self):
+        delays = []
+        breaker = retry.CircuitBreaker(threshold=2, cooldown=30, sleep=delays.append)
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open())
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open())
+        breaker.open_until = 0
+        breaker.wait()
+        self.assertEquals(delays, [])
+        breaker.record_success()
+        self.assertFalse(breaker.is_open())
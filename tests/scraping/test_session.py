@@ -0,0 +1,54 @@
+import cookielib
+import os
+import shutil
+import tempfile
+import unittest
+
+from ogbot.scraping import session, transport
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cookies.tmp')
+        self.logins = 0
+        self.session = session.Session(session.CookieStore(cookielib.LWPCookieJar(), self.path), self.login)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def login(self):
+        self.logins += 1
+
+    def test_logged_out_when_redirected_out_of_the_game(self):
+        url = 'https://s1-en.ogame.gameforge.com/game/index.php?page=overview'
+        self.assertFalse(self.session.is_logged_out(url, transport.Response('', url)))
+        self.assertTrue(self.session.is_logged_out(url, transport.Response('', 'https://en.ogame.gameforge.com/')))
+        self.assertFalse(self.session.is_logged_out('https://en.ogame.gameforge.com/',
+                                                    transport.Response('', 'https://en.ogame.gameforge.com/')))
+
+    def test_stored_session_is_not_checked_on_start(self):
+        self.session.start()
+        self.assertEquals(self.logins, 1)
+        self.assertTrue(os.path.isfile(self.path))
+
+        other_session = session.Session(session.CookieStore(cookielib.LWPCookieJar(), self.path), self.login)
+        other_session.start()
+        self.assertEquals(self.logins, 1)
+
+    def test_logout_seen_by_several_scrapers_logs_in_once(self):
+        self.session.start()
+        generation = self.session.generation
+        self.session.renew(generation)
+        self.session.renew(generation)
+        self.assertEquals(self.logins, 2)
+
+    def test_session_saved_by_other_run_is_reused(self):
+        self.session.start()
+        other_session = session.Session(session.CookieStore(cookielib.LWPCookieJar(), self.path), self.login)
+        other_session.start()
+
+        # Another run logged in again after a logout and saved its cookies
+        os.utime(self.path, (0, 0))
+        self.session.renew(self.session.generation)
+        self.assertEquals(self.logins, 1)
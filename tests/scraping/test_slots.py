@@ -0,0 +1,39 @@
+import datetime
+import unittest
+
+from ogbot.scraping.scraper import FleetMovement
+from ogbot.scraping.slots import FleetSlotAllocator, RELEASE_MARGIN
+
+
+def make_movement(countdown_seconds, return_flight=True, friendly=True):
+    return FleetMovement("1:100:4", "Home", "1:101:8", "Target", friendly, None,
+                         datetime.timedelta(seconds=countdown_seconds), return_flight=return_flight)
+
+
+class TestFleetSlotAllocator(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.allocator = FleetSlotAllocator(clock=lambda: self.now)
+
+    def test_wait_time(self):
+        self.assertEquals(self.allocator.get_wait_time(), 0)
+        self.allocator.observe_usage(2, 3)
+        self.assertTrue(self.allocator.has_free_slot())
+        self.allocator.reserve()
+        self.assertFalse(self.allocator.has_free_slot())
+        self.assertIsNone(self.allocator.get_wait_time())
+
+        self.allocator.observe_movements([make_movement(300), make_movement(120), make_movement(60, False),
+                                          make_movement(30, friendly=False)])
+        self.assertEquals(self.allocator.get_wait_time(), 120 + RELEASE_MARGIN)
+        self.now += 200
+        self.assertEquals(self.allocator.get_wait_time(), 100 + RELEASE_MARGIN)
+
+    def test_wait_for_free_slot(self):
+        sleeps = []
+        reads = []
+        self.allocator.observe_usage(3, 3)
+        self.allocator.wait_for_free_slot(lambda: reads.append(1), 12, sleeps.append)
+        self.allocator.observe_movements([make_movement(50)])
+        self.allocator.wait_for_free_slot(lambda: reads.append(1), 12, sleeps.append)
+        self.assertEquals((len(reads), sleeps), (1, [12, 50 + RELEASE_MARGIN]))
@@ -0,0 +1,31 @@
+import unittest
+
+from ogbot.scraping import snapshot
+
+RESOURCES_URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=resources&cp=1"
+OTHER_PLANET_URL = "https://s1-en.ogame.gameforge.com/game/index.php?page=resources&cp=2"
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.store = snapshot.SnapshotStore()
+        self.parsed = []
+
+    def parse(self, markup):
+        self.parsed.append(markup)
+        return markup.upper()
+
+    def test_page_is_parsed_once(self):
+        page = self.store.get(RESOURCES_URL, "resources page", self.parse)
+        self.assertEquals(page.get('title', lambda document: document[:9]), "RESOURCES")
+        self.assertEquals(page.get('length', len), 14)
+
+        page = self.store.get(RESOURCES_URL, "resources page", self.parse)
+        self.assertEquals(page.get('title', lambda document: None), "RESOURCES")
+        self.assertEquals(self.parsed, ["resources page"])
+
+    def test_changed_page_gets_a_new_snapshot(self):
+        page = self.store.get(RESOURCES_URL, "resources page", self.parse)
+        self.assertIsNot(self.store.get(OTHER_PLANET_URL, "resources page", self.parse), page)
+        self.assertIsNot(self.store.get(RESOURCES_URL, "construction page", self.parse), page)
+        self.assertEquals(self.store.get(RESOURCES_URL, "construction page", self.parse).document, "CONSTRUCTION PAGE")
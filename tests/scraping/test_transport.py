@@ -0,0 +1,22 @@
+import cookielib
+import unittest
+import urllib2
+import zlib
+
+from ogbot.scraping import transport
+
+
+class TestPooledTransport(unittest.TestCase):
+    def setUp(self):
+        self.transport = transport.PooledTransport(cookielib.LWPCookieJar(), [])
+
+    def test_decode(self):
+        self.assertEquals(self.transport.decode(zlib.compress('galaxy'), 'deflate'), 'galaxy')
+        self.assertEquals(self.transport.decode('galaxy', None), 'galaxy')
+
+    def test_corrupt_body_is_a_request_error(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        gzip_body = compressor.compress('galaxy' * 100) + compressor.flush()
+        self.assertEquals(self.transport.decode(gzip_body, 'gzip'), 'galaxy' * 100)
+        self.assertRaises(urllib2.URLError, self.transport.decode, gzip_body[:20], 'gzip')
+        self.assertRaises(urllib2.URLError, self.transport.decode, '\xff' * 20, 'deflate')
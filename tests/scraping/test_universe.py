@@ -0,0 +1,59 @@
+import unittest
+
+from ogbot.scraping import galaxy, universe
+from ogbot.scraping.scraper import PlayerState
+
+
+class FakeGalaxyClient(object):
+    def __init__(self):
+        self.scanned_systems = []
+
+    def get_systems(self, systems):
+        self.scanned_systems.extend(systems)
+        return [[galaxy.Planet("Colony", "%s:%s:4" % system, "Anna", PlayerState.Inactive, 200),
+                 galaxy.Planet("Home", "%s:%s:8" % system, "Bob", PlayerState.Active, 10)]
+                for system in systems]
+
+
+class TestGalaxyScanner(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.universe_map = universe.UniverseMap(':memory:', clock=lambda: self.now)
+        self.galaxy_client = FakeGalaxyClient()
+
+    def tearDown(self):
+        self.universe_map.close()
+
+    def test_scan_stale_systems_only(self):
+        scanner = universe.GalaxyScanner(self.galaxy_client, self.universe_map, 3600, None)
+        inactive_filter = galaxy.PlanetFilter([PlayerState.Inactive], 100, 300)
+
+        planets = scanner.get_planets_in_systems([("1", "100"), ("1", "101")], inactive_filter)
+        self.assertEquals([[planet.coordinates for planet in system_planets] for system_planets in planets],
+                          [["1:100:4"], ["1:101:4"]])
+
+        self.now += 1800
+        self.assertEquals(len(scanner.get_planets_in_systems([("1", "100"), ("1", "102")])[0]), 2)
+        self.assertEquals(self.galaxy_client.scanned_systems, [("1", "100"), ("1", "101"), ("1", "102")])
+
+        self.now += 3000
+        scanner.get_planets_in_systems([("1", "100"), ("1", "102")])
+        self.assertEquals(self.galaxy_client.scanned_systems[3:], [("1", "100")])
+
+    def test_refresh_budget(self):
+        scanner = universe.GalaxyScanner(self.galaxy_client, self.universe_map, 3600, 2)
+        planets = scanner.get_planets_in_systems([("1", "100"), ("1", "101"), ("1", "102")])
+        self.assertEquals([len(system_planets) for system_planets in planets], [2, 2, 0])
+        scanner.get_planets_in_systems([("1", "102")])
+        self.assertEquals(len(self.galaxy_client.scanned_systems), 2)
+
+    def test_refresh_budget_of_each_run(self):
+        scanner = universe.GalaxyScanner(self.galaxy_client, self.universe_map, 3600, 2)
+        systems = [("1", "100"), ("1", "101"), ("1", "102"), ("1", "103")]
+        scanner.start_run()
+        scanner.get_planets_in_systems(systems)
+
+        scanner.start_run()
+        planets = scanner.get_planets_in_systems(systems)
+        self.assertEquals([len(system_planets) for system_planets in planets], [2, 2, 2, 2])
+        self.assertEquals(len(self.galaxy_client.scanned_systems), 4)
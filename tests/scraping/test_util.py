@@ -0,0 +1,31 @@
+import threading
+import time
+import unittest
+
+from ogbot.scraping import util
+
+
+class Browser(object):
+    pass
+
+
+class TestSharedObjects(unittest.TestCase):
+    def test_object_is_created_once_by_concurrent_scrapers(self):
+        browser = Browser()
+        created = []
+
+        def factory():
+            time.sleep(0.01)
+            created.append(object())
+            return created[-1]
+
+        objects = []
+        threads = [threading.Thread(target=lambda: objects.append(util.get_shared_object(browser, 'limiter', factory)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(len(created), 1)
+        self.assertEquals(objects, created * 4)
@@ -0,0 +1,23 @@
+import ConfigParser
+import unittest
+
+from ogbot.config import Config
+
+
+class TestConfig(unittest.TestCase):
+    def test_parse_rate_config(self):
+        self.assertEquals(Config.parse_rate_config('2 5'), (2.0, 5))
+        self.assertEquals(Config.parse_rate_config('2.5'), (2.5, 3))
+        self.assertEquals(Config.parse_rate_config('0'), (0.0, 1))
+        self.assertEquals(Config.parse_rate_config('0 0'), (0.0, 0))
+
+    def test_get_profile_config(self):
+        config = ConfigParser.ConfigParser()
+        config.add_section('General')
+        config.set('General', 'ExcludedPlanets', 'colony')
+        config.set('General', 'DefaultOriginPlanet', 'homeworld')
+        config.add_section('Profile main')
+        config.set('Profile main', 'ExcludedPlanets', 'moon')
+        self.assertEquals(Config.get_profile_config(config, 'Profile main', 'ExcludedPlanets', 'General'), 'moon')
+        self.assertEquals(Config.get_profile_config(config, 'Profile main', 'DefaultOriginPlanet', 'General'),
+                          'homeworld')
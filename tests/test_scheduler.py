@@ -0,0 +1,40 @@
+import datetime
+import time
+import unittest
+
+from ogbot import scheduler
+
+
+def timestamp(*args):
+    return time.mktime(datetime.datetime(*args).timetuple())
+
+
+class TestScheduler(unittest.TestCase):
+    def test_parse_schedule(self):
+        self.assertEquals(scheduler.parse_schedule("90").seconds, 90)
+        self.assertEquals(scheduler.parse_schedule("10m").seconds, 600)
+        self.assertEquals(scheduler.parse_schedule("2h").seconds, 7200)
+        self.assertEquals(scheduler.parse_schedule("*/15 8-10 * * 1-5").hours, set([8, 9, 10]))
+        self.assertRaises(ValueError, scheduler.parse_schedule, "* * *")
+        self.assertRaises(ValueError, scheduler.parse_schedule, "61 * * * *")
+
+    def test_cron_next_time(self):
+        schedule = scheduler.CronSchedule("*/15 8-10 * * 1-5")
+        # Friday 10:50, the next run is on monday
+        self.assertEquals(schedule.get_next_time(timestamp(2016, 4, 1, 10, 50)), timestamp(2016, 4, 4, 8, 0))
+        self.assertEquals(schedule.get_next_time(timestamp(2016, 4, 4, 8, 0)), timestamp(2016, 4, 4, 8, 15))
+
+    def test_skip_overlapping_runs(self):
+        now = [1000.0]
+        runs = []
+
+        def slow_job():
+            runs.append(now[0])
+            now[0] += 250
+
+        job_scheduler = scheduler.Scheduler(clock=lambda: now[0])
+        job = job_scheduler.add_job('slow', slow_job, scheduler.IntervalSchedule(100))
+        job_scheduler.run_pending()
+        self.assertEquals((job.next_time, job.skipped_runs), (1300.0, 2))
+        job_scheduler.run_pending()
+        self.assertEquals(runs, [1000.0])